@@ -3,45 +3,114 @@ import json
 import os
 import sys
 from nagent_rag.chunking import ChunkingProcessor
+from nagent_rag.doc_io import is_jsonl, iter_documents, write_documents, write_jsonl
+from nagent_rag.manifest import ChunkManifest
+
+
+def run_incremental(processor: ChunkingProcessor, args, jsonl: bool):
+    """
+    按清单增量分块：只重新切分变化的文件，并把变化合并进已有的 --output 文件。
+    返回 (合并后的分块迭代器, 清单)；已有输出为 JSONL 时逐行流式读取。
+    """
+    manifest = ChunkManifest(args.manifest)
+    output_exists = os.path.exists(args.output)
+    # 只有清单与已有输出都存在时才合并；否则全量重建 (如首次使用 --manifest、清单或输出被删除)
+    has_previous = output_exists and bool(manifest.files)
+    if not has_previous:
+        manifest.reset()
+
+    delta = processor.process_path_incremental(args.path, manifest, recursive=args.recursive)
+    if output_exists and not has_previous:
+        # 重建时已有输出中的分块全部作废，记入删除列表以便下游索引同步
+        delta.removed_ids.extend(str(doc["id"]) for doc in iter_documents(args.output, jsonl) if "id" in doc)
+    removed = set(delta.removed_ids)
+
+    def merged():
+        if has_previous:
+            for doc in iter_documents(args.output, jsonl):
+                if doc.get("id") not in removed:
+                    yield doc
+        yield from delta.added
+
+    if args.delta_output:
+        with open(args.delta_output, "w", encoding="utf-8") as f:
+            json.dump({"added": delta.added, "removed": delta.removed_ids}, f, ensure_ascii=False, indent=2)
+    print(f"增量分块: {delta.summary()}", file=sys.stderr)
+    return merged(), manifest
+
 
 def main():
     parser = argparse.ArgumentParser(description="nAgent RAG 文档分块 CLI")
     parser.add_argument("path", type=str, help="要处理的文件或目录路径")
     parser.add_argument("--chunk-size", type=int, default=1000, help="分块大小 (默认: 1000)")
     parser.add_argument("--chunk-overlap", type=int, default=200, help="重叠大小 (默认: 200)")
-    parser.add_argument("--output", type=str, help="输出 JSON 文件路径 (如果未指定，则输出到 stdout)")
+    parser.add_argument("--length-unit", type=str, choices=["char", "token"], default="char", help="分块大小的单位: char (字符) 或 token (按 token 计数，并按中文标点与 Markdown 标题切分)")
+    parser.add_argument("--tokenizer", type=str, help="--length-unit token 时使用的分词器: regex (默认，本地近似) 或 tiktoken 编码名 (如 cl100k_base)")
+    parser.add_argument("--output", type=str, help="输出文件路径 (如果未指定，则输出到 stdout)；.jsonl 输出为每行一个分块，.gz / .zst 后缀自动压缩")
+    parser.add_argument("--format", type=str, choices=["json", "jsonl"], help="输出格式 (默认按 --output 扩展名判断，否则为 json)；jsonl 边切分边写入")
     parser.add_argument("--recursive", action="store_true", help="是否递归处理目录")
+    parser.add_argument("--workers", type=int, help="切分使用的进程数 (默认: CPU 数，0 表示在当前进程中切分)")
+    parser.add_argument("--manifest", type=str, help="增量分块清单路径 (需同时指定 --output)：只重新切分变化的文件并合并进已有输出")
+    parser.add_argument("--delta-output", type=str, help="与 --manifest 一起使用，将本次新增的分块与删除的分块 ID 写入该 JSON 文件")
 
     args = parser.parse_args()
 
     if not os.path.exists(args.path):
         print(f"错误: 路径不存在: {args.path}", file=sys.stderr)
         sys.exit(1)
+    if args.manifest and not args.output:
+        print("错误: --manifest 需要同时指定 --output", file=sys.stderr)
+        sys.exit(1)
 
     # 初始化处理器
     processor = ChunkingProcessor(
         chunk_size=args.chunk_size,
-        chunk_overlap=args.chunk_overlap
+        chunk_overlap=args.chunk_overlap,
+        length_unit=args.length_unit,
+        tokenizer=args.tokenizer
     )
 
-    try:
-        # 处理路径
-        chunked_docs = processor.process_path(args.path, recursive=args.recursive)
-
-        if not chunked_docs:
-            print(f"警告: 在 {args.path} 中没有找到有效的文本文件或未生成分块。", file=sys.stderr)
-            sys.exit(0)
+    if args.format:
+        jsonl = args.format == "jsonl"
+    else:
+        jsonl = bool(args.output) and is_jsonl(args.output)
 
-        # 序列化为 JSON
-        output_json = json.dumps(chunked_docs, ensure_ascii=False, indent=2)
+    try:
+        manifest = None
+        if args.manifest:
+            chunked_docs, manifest = run_incremental(processor, args, jsonl)
+        else:
+            # 处理路径：并发读取文件，在进程池中按批切分
+            chunked_docs = (
+                doc
+                for batch in processor.iter_process_path(args.path, recursive=args.recursive, processes=args.workers)
+                for doc in batch
+            )
 
-        # 输出结果
-        if args.output:
-            with open(args.output, "w", encoding="utf-8") as f:
-                f.write(output_json)
-            print(f"成功将 {len(chunked_docs)} 个分块保存至: {args.output}", file=sys.stderr)
+        if jsonl:
+            # JSONL：每切出一批就写入，不在内存中保留全部分块
+            if args.output:
+                count = write_documents(args.output, chunked_docs, jsonl=True)
+            else:
+                count = write_jsonl(sys.stdout, chunked_docs)
         else:
-            print(output_json)
+            chunked_docs = list(chunked_docs)
+            if not chunked_docs and manifest is None:
+                print(f"警告: 在 {args.path} 中没有找到有效的文本文件或未生成分块。", file=sys.stderr)
+                sys.exit(0)
+            if args.output:
+                count = write_documents(args.output, chunked_docs, jsonl=False)
+            else:
+                print(json.dumps(chunked_docs, ensure_ascii=False, indent=2))
+                count = len(chunked_docs)
+
+        if count == 0 and manifest is None:
+            print(f"警告: 在 {args.path} 中没有找到有效的文本文件或未生成分块。", file=sys.stderr)
+        elif args.output:
+            print(f"成功将 {count} 个分块保存至: {args.output}", file=sys.stderr)
+        if manifest is not None:
+            # 输出写入成功后再保存清单
+            manifest.save()
 
     except Exception as e:
         print(f"处理过程中出错: {e}", file=sys.stderr)
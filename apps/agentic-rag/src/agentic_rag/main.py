@@ -1,13 +1,30 @@
 import os
 import argparse
-import json
+import asyncio
 from dotenv import load_dotenv
 from google import genai
-from nagent_rag.retrievers.keyword import SimpleKeywordRetriever
+from nagent_rag.doc_io import iter_batches, iter_documents, validate_documents
+from nagent_rag.retrievers.bm25 import BM25Retriever
 from nagent_rag.retrievers.chroma import ChromaRetriever
+from nagent_rag.retrievers.hybrid import HybridRetriever
 from nagent_rag.models import get_embeddings
 from agentic_rag.rags import AgenticRAG, SimpleRAG, VectorRAG
 
+async def _stream_query(rag_system, query: str):
+    """
+    流式打印生成的 token，返回与 query() 相同结构的最终结果。
+    """
+    result = {"answer": "", "trace": []}
+    async for event in rag_system.astream_query(query):
+        if event["type"] == "token":
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "action":
+            print(f"\n[调用工具] {event['tool']}({event['args']})", flush=True)
+        elif event["type"] == "final":
+            result = {"answer": event["answer"], "trace": event["trace"]}
+    print()
+    return result
+
 def main():
     load_dotenv()
 
@@ -17,9 +34,13 @@ def main():
     parser.add_argument("--model", type=str, default="gemini-2.0-flash", help="Gemini model name")
     parser.add_argument("--max-iterations", type=int, default=5, help="Max reasoning iterations")
     parser.add_argument("--index-path", type=str, help="Path to save or load the index file")
-    parser.add_argument("--add-docs", type=str, help="Path to a JSON file containing documents to add")
+    parser.add_argument("--add-docs", type=str, help="Path to a JSON or JSONL file (optionally .gz/.zst) containing documents to add")
+    parser.add_argument("--hybrid", action="store_true", help="Fuse keyword (BM25) and vector results with reciprocal-rank fusion")
     parser.add_argument("--rewrite", action="store_true", help="Enable query rewriting")
     parser.add_argument("--decompose", action="store_true", help="Enable query decomposition")
+    parser.add_argument("--prefetch-sub-queries", action="store_true", help="With --decompose, retrieve all sub-queries up front in one batch and inject the merged context")
+    parser.add_argument("--function-calling", action="store_true", help="Declare tools as native function declarations instead of parsing Thought/Action text")
+    parser.add_argument("--stream", action="store_true", help="Stream tokens as they are generated")
     parser.add_argument("--trace-dir", type=str, help="Directory to save reasoning traces")
 
     args = parser.parse_args()
@@ -35,12 +56,18 @@ def main():
 
     client = genai.Client(api_key=api_key)
 
-    if args.rag_type == "vector":
+    if args.hybrid:
+        # 关键字与向量检索并发执行，结果按 RRF 融合
+        retriever = HybridRetriever(
+            keyword_retriever=BM25Retriever(tokenizer="jieba"),
+            vector_retriever=ChromaRetriever(embedding_function=get_embeddings(client=client))
+        )
+    elif args.rag_type == "vector":
         embeddings = get_embeddings(client=client)
         retriever = ChromaRetriever(embedding_function=embeddings)
     else:
         # 使用 jieba 分词以支持中文关键字检索
-        retriever = SimpleKeywordRetriever(tokenizer="jieba")
+        retriever = BM25Retriever(tokenizer="jieba")
 
     if args.rag_type == "simple":
         rag_system = SimpleRAG(
@@ -65,21 +92,28 @@ def main():
             index_path=args.index_path,
             use_query_rewrite=args.rewrite,
             use_query_decompose=args.decompose,
-            trace_dir=args.trace_dir
+            trace_dir=args.trace_dir,
+            prefetch_sub_queries=args.prefetch_sub_queries,
+            function_calling=args.function_calling
         )
 
     # 如果指定了要添加的文档
     if args.add_docs:
         if os.path.exists(args.add_docs):
-            with open(args.add_docs, "r", encoding="utf-8") as f:
-                new_docs = json.load(f)
-                if isinstance(new_docs, list):
-                    rag_system.clear_index()
-                    rag_system.add_documents(new_docs)
-                    print(f"Added {len(new_docs)} documents.")
-                else:
-                    print("Error: Document file must contain a JSON list.")
-                    return
+            # 先流式校验整个文件，格式错误时不触碰已有索引
+            try:
+                validate_documents(args.add_docs)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return
+            # JSONL 逐行读取、分批加入索引，不需要把整个文件读入内存；
+            # 磁盘上的旧索引保留到新索引构建完成后由 save_index 覆盖
+            rag_system.clear_index(delete_file=False)
+            count = 0
+            for batch in iter_batches(iter_documents(args.add_docs)):
+                rag_system.add_documents(batch)
+                count += len(batch)
+            print(f"Added {count} documents.")
         else:
             print(f"Error: Document file not found: {args.add_docs}")
             return
@@ -92,7 +126,10 @@ def main():
     print(f"Querying: {args.query}")
     print("-" * 20)
 
-    result = rag_system.query(args.query)
+    if args.stream:
+        result = asyncio.run(_stream_query(rag_system, args.query))
+    else:
+        result = rag_system.query(args.query)
 
     # 提取并打印检索到的内容
     trace = result.get("trace", [])
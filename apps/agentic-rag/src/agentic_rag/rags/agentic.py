@@ -1,15 +1,22 @@
-from typing import Optional, Dict, Any
-from nagent_core.agent import ReActAgent
+import asyncio
+import json
+import re
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+from nagent_core.agent import ReActAgent, FunctionCallingAgent
 from nagent_core.tool import CalculatorTool, PythonInterpreterTool, WebSearchTool
 from nagent_rag.retrievers.base import BaseRetriever
 from nagent_rag.tools import RetrieverTool
-from nagent_rag.query_utils import QueryRewriter, QueryDecomposer
+from nagent_rag.query_utils import QueryRewriter, QueryDecomposer, merge_sub_query_results
 from .base import BaseRAG
 
 class AgenticRAG(BaseRAG):
     """
     Agentic RAG 系统。
     使用 ReActAgent 决定何时进行检索。
+
+    开启 prefetch_sub_queries (需同时开启 use_query_decompose) 时，所有子问题在 Agent 开始前
+    通过一次批量检索取回，合并去重后直接注入 Prompt，省去 Agent 逐个检索子问题的多轮迭代。
+    开启 function_calling 时使用 FunctionCallingAgent (工具以原生函数声明提供，不解析文本格式)。
     """
     def __init__(
         self,
@@ -21,6 +28,9 @@ class AgenticRAG(BaseRAG):
         use_query_rewrite: bool = False,
         use_query_decompose: bool = False,
         trace_dir: Optional[str] = None,
+        prefetch_sub_queries: bool = False,
+        sub_query_k: int = 3,
+        function_calling: bool = False,
     ):
         super().__init__(
             client=client,
@@ -32,6 +42,8 @@ class AgenticRAG(BaseRAG):
 
         self.use_query_rewrite = use_query_rewrite
         self.use_query_decompose = use_query_decompose
+        self.prefetch_sub_queries = prefetch_sub_queries
+        self.sub_query_k = sub_query_k
 
         # 初始化查询优化组件
         self.rewriter = QueryRewriter(client, model_name=model_name)
@@ -42,7 +54,8 @@ class AgenticRAG(BaseRAG):
         self.python_tool = PythonInterpreterTool()
         self.search_tool = WebSearchTool()
 
-        self.agent = ReActAgent(
+        agent_class = FunctionCallingAgent if function_calling else ReActAgent
+        self.agent = agent_class(
             client=client,
             tools=[
                 self.retriever_tool,
@@ -54,42 +67,79 @@ class AgenticRAG(BaseRAG):
             max_iterations=max_iterations,
         )
 
-    def query(self, user_input: str) -> Dict[str, Any]:
+    def _format_context(self, docs: List[Dict[str, Any]]) -> str:
         """
-        处理用户查询。
+        与检索工具的 Observation 格式一致。
         """
-        processed_input = user_input
+        return self.retriever_tool._format_results(docs)
 
-        # 可选：查询改写
-        if self.use_query_rewrite:
-            processed_input = self.rewriter.rewrite(user_input)
+    def _build_prompt(self, user_input: str, context: str) -> str:
+        """
+        Agent 自行检索，默认不使用单轮 Prompt；给定上下文时作为参考资料附在问题后。
+        """
+        if not context:
+            return user_input
+        return f"{user_input}\n\n【参考资料】\n{context}"
 
-        # 可选：查询拆分
-        if self.use_query_decompose:
-            sub_queries = self.decomposer.decompose(user_input)
-            if len(sub_queries) > 1:
-                processed_input = f"原始问题: {user_input}\n请参考以下分解后的子问题进行思考和解决：\n" + "\n".join([f"- {q}" for q in sub_queries])
+    async def _arewrite_and_decompose(self, user_input: str, blocking: bool = False) -> Tuple[str, List[str]]:
+        """
+        可选的查询改写与拆分；二者互不依赖，异步时并发执行。
+        """
+        if blocking:
+            rewritten = self.rewriter.rewrite(user_input) if self.use_query_rewrite else user_input
+            sub_queries = self.decomposer.decompose(user_input) if self.use_query_decompose else [user_input]
+            return rewritten, sub_queries
 
-        result = self.agent.query(processed_input)
-        self._save_trace(user_input, result)
-        return result
+        async def unchanged(value):
+            return value
 
-    async def aquery(self, user_input: str) -> Dict[str, Any]:
+        rewritten, sub_queries = await asyncio.gather(
+            self.rewriter.arewrite(user_input) if self.use_query_rewrite else unchanged(user_input),
+            self.decomposer.adecompose(user_input) if self.use_query_decompose else unchanged([user_input]),
+        )
+        return rewritten, sub_queries
+
+    async def _aprefetch_context(self, sub_queries: List[str], blocking: bool = False) -> Tuple[str, Dict[str, Any]]:
         """
-        处理用户查询 (异步)。
+        批量检索全部子问题，返回合并去重后的上下文及对应的 trace 步骤。
         """
-        processed_input = user_input
+        if blocking:
+            results = self.decomposer.retrieve_sub_queries(sub_queries, self.retriever, k=self.sub_query_k)
+        else:
+            results = await self.decomposer.aretrieve_sub_queries(sub_queries, self.retriever, k=self.sub_query_k)
+        context = self._format_context(merge_sub_query_results(results))
+        trace_step = {
+            "step": 0,
+            "thought": "预先批量检索全部子问题",
+            "action": (self.retriever_tool.name, json.dumps(sub_queries, ensure_ascii=False)),
+            "observation": re.sub(r"内容:.*?(?=\n\n---\n\n|\Z)", "内容: [Content Omitted]", context, flags=re.DOTALL),
+        }
+        return context, trace_step
 
-        # 可选：查询改写 (目前 rewriter 只有同步版本)
-        if self.use_query_rewrite:
-            processed_input = self.rewriter.rewrite(user_input)
+    async def apipeline(self, user_input: str, blocking: bool = False, stream: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        预处理查询后透传 ReActAgent.apipeline 的 token/action/observation/final 事件，并在结束时保存 trace。
+        子问题预检索作为额外的 action/observation 事件产出，并记录为 trace 的第 0 步。
+        """
+        processed_input, sub_queries = await self._arewrite_and_decompose(user_input, blocking)
 
-        # 可选：查询拆分 (目前 decomposer 只有同步版本)
-        if self.use_query_decompose:
-            sub_queries = self.decomposer.decompose(user_input)
-            if len(sub_queries) > 1:
-                processed_input = f"原始问题: {user_input}\n请参考以下分解后的子问题进行思考和解决：\n" + "\n".join([f"- {q}" for q in sub_queries])
+        prefetch_step = None
+        if self.use_query_decompose and self.prefetch_sub_queries:
+            yield {"type": "action", "tool": self.retriever_tool.name, "args": json.dumps(sub_queries, ensure_ascii=False)}
+            context, prefetch_step = await self._aprefetch_context(sub_queries, blocking)
+            yield {"type": "observation", "tool": self.retriever_tool.name, "text": context}
+            processed_input = (
+                f"原始问题: {user_input}\n以下是针对分解后的子问题预先检索到的参考资料 (已合并去重)，"
+                "请优先基于这些资料回答，资料不足时再使用工具检索。\n子问题：\n"
+                + "\n".join([f"- {q}" for q in sub_queries])
+                + f"\n\n【参考资料】\n{context}"
+            )
+        elif len(sub_queries) > 1:
+            processed_input = f"原始问题: {user_input}\n请参考以下分解后的子问题进行思考和解决：\n" + "\n".join([f"- {q}" for q in sub_queries])
 
-        result = await self.agent.aquery(processed_input)
-        self._save_trace(user_input, result)
-        return result
+        async for event in self.agent.apipeline(processed_input, blocking=blocking, stream=stream):
+            if event["type"] == "final":
+                if prefetch_step is not None:
+                    event["trace"].insert(0, prefetch_step)
+                self._save_trace(user_input, {"answer": event["answer"], "trace": event["trace"]})
+            yield event
@@ -2,8 +2,11 @@ import os
 import json
 from datetime import datetime
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
 
+from nagent_core.llm import LLMClient
+from nagent_core.tool import run_in_tool_executor
+from nagent_core.utils import run_sync
 from nagent_rag.retrievers.base import BaseRetriever
 
 
@@ -11,7 +14,14 @@ class BaseRAG(ABC):
     """
     RAG 基类。
     定义了通用的接口和 Trace 存储等通用逻辑。
+
+    query / aquery / astream_query 都由同一个异步流程 apipeline 驱动：
+    同步的 query 在私有事件循环中以 blocking=True 运行它 (使用同步 SDK 调用)，
+    异步路径中的检索与生成均不阻塞事件循环。
     """
+
+    # 单轮检索-生成流程在 trace 中记录的动作名
+    retrieval_action = "retrieve"
     def __init__(
         self,
         client,
@@ -25,6 +35,9 @@ class BaseRAG(ABC):
         self.model_name = model_name
         self.trace_dir = trace_dir
         self.index_path = index_path
+        self.llm_client = LLMClient(client)
+        # 批量预检索的结果: (query, k) -> docs
+        self._prefetched: Dict[tuple, List[Dict[str, Any]]] = {}
 
         if self.trace_dir and not os.path.exists(self.trace_dir):
             os.makedirs(self.trace_dir)
@@ -33,6 +46,56 @@ class BaseRAG(ABC):
         if self.index_path and os.path.exists(self.index_path):
             self.retriever.load_index(self.index_path)
 
+    def prefetch(self, queries: List[str], k: Optional[int] = None):
+        """
+        通过一次批量检索 (get_top_k_batch) 预取一组查询的结果，
+        后续 query/aquery 遇到相同查询时直接使用，无需再次检索。
+        """
+        k = k or getattr(self, "k", 3)
+        unique_queries = [q for q in dict.fromkeys(queries) if (q, k) not in self._prefetched]
+        if not unique_queries:
+            return
+        for query, docs in zip(unique_queries, self.retriever.get_top_k_batch(unique_queries, k)):
+            self._prefetched[(query, k)] = docs
+
+    async def aprefetch(self, queries: List[str], k: Optional[int] = None):
+        """
+        prefetch 的异步版本：批量检索在共享执行器中运行，不阻塞事件循环。
+        """
+        await run_in_tool_executor(self.prefetch, queries, k)
+
+    def _retrieve(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        检索上下文，优先使用预取结果。
+        """
+        docs = self._prefetched.pop((query, k), None)
+        if docs is None:
+            docs = self.retriever.get_top_k(query, k)
+        return docs
+
+    async def _aretrieve(self, query: str, k: int = 3, blocking: bool = False) -> List[Dict[str, Any]]:
+        """
+        _retrieve 的异步版本：非 blocking 时使用检索器的 aget_top_k。
+        """
+        if blocking:
+            return self._retrieve(query, k)
+        docs = self._prefetched.pop((query, k), None)
+        if docs is None:
+            docs = await self.retriever.aget_top_k(query, k)
+        return docs
+
+    async def _agenerate(self, prompt: str, blocking: bool = False, stream: bool = False) -> AsyncIterator[str]:
+        """
+        生成答案文本：流式时逐段产出，否则一次性产出完整文本。
+        """
+        if stream:
+            async for text in self.llm_client.astream_content(model=self.model_name, contents=prompt):
+                yield text
+        elif blocking:
+            yield self.llm_client.generate_content(model=self.model_name, contents=prompt).text
+        else:
+            yield (await self.llm_client.agenerate_content(model=self.model_name, contents=prompt)).text
+
     def _save_trace(self, user_input: str, response: Dict[str, Any]):
         """
         持久化保存推理轨迹。
@@ -59,18 +122,74 @@ class BaseRAG(ABC):
             print(f"Failed to save trace: {e}")
 
     @abstractmethod
+    def _build_prompt(self, user_input: str, context: str) -> str:
+        pass
+
+    @abstractmethod
+    def _format_context(self, docs: List[Dict[str, Any]]) -> str:
+        pass
+
+    async def apipeline(self, user_input: str, blocking: bool = False, stream: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        查询流程 (检索 → 组装上下文 → 生成 → 记录 trace)，产出 {"type": "token", "text": ...} 事件 (仅 stream=True)，
+        最后产出 {"type": "final", "answer": ..., "trace": [...]}。
+        默认实现为单轮检索-生成 (子类提供 _build_prompt 与 _format_context)，Agent 类实现可整体覆盖。
+        """
+        docs = await self._aretrieve(user_input, getattr(self, "k", 3), blocking)
+        context = self._format_context(docs)
+
+        prompt = self._build_prompt(user_input, context)
+        chunks = []
+        try:
+            async for text in self._agenerate(prompt, blocking, stream):
+                chunks.append(text)
+                if stream:
+                    yield {"type": "token", "text": text}
+            answer = "".join(chunks)
+        except Exception as e:
+            answer = f"生成答案时发生错误: {str(e)}"
+
+        # 构造 Trace (模拟 Agent 的步骤)
+        trace = [
+            {
+                "step": 1,
+                "action": self.retrieval_action,
+                "action_input": user_input,
+                "observation": context,
+            }
+        ]
+
+        result = {
+            "answer": answer,
+            "trace": trace,
+        }
+
+        self._save_trace(user_input, result)
+        yield {"type": "final", **result}
+
+    async def _acollect(self, user_input: str, blocking: bool = False) -> Dict[str, Any]:
+        async for event in self.apipeline(user_input, blocking=blocking):
+            if event["type"] == "final":
+                return {key: value for key, value in event.items() if key != "type"}
+
     def query(self, user_input: str) -> Dict[str, Any]:
         """
-        处理用户查询，需返回形如 {"answer": "...", "trace": [...]} 的字典。
+        处理用户查询，返回形如 {"answer": "...", "trace": [...]} 的字典。
         """
-        pass
+        return run_sync(self._acollect(user_input, blocking=True))
 
-    @abstractmethod
     async def aquery(self, user_input: str) -> Dict[str, Any]:
         """
-        处理用户查询 (异步)，需返回形如 {"answer": "...", "trace": [...]} 的字典。
+        处理用户查询 (异步)，返回形如 {"answer": "...", "trace": [...]} 的字典。
         """
-        pass
+        return await self._acollect(user_input)
+
+    async def astream_query(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式处理用户查询，产出 token 事件，最后产出 {"type": "final", "answer": ..., "trace": [...]}。
+        """
+        async for event in self.apipeline(user_input, stream=True):
+            yield event
 
     def save_index(self, path: Optional[str] = None):
         """
@@ -81,19 +200,32 @@ class BaseRAG(ABC):
             raise ValueError("未指定保存路径。")
         self.retriever.save_index(target_path)
 
-    def clear_index(self):
+    def clear_index(self, delete_file: bool = True):
         """
-        清空现有索引和文档。
+        清空现有索引和文档。delete_file 为 False 时保留磁盘上的索引文件 (随后由 save_index 覆盖)。
         """
         self.retriever.clear()
-        if self.index_path and os.path.exists(self.index_path):
+        self._prefetched.clear()
+        if delete_file and self.index_path and os.path.exists(self.index_path):
             os.remove(self.index_path)
 
     def add_documents(self, documents: List[Dict[str, Any]]):
         """
-        添加新文档。
+        添加新文档 (增量索引，仅处理新增部分)。
+        """
+        self._prefetched.clear()
+        self.retriever.add_documents(documents)
+
+    def delete_documents(self, ids: List[Any]):
+        """
+        按 ID 删除文档。
+        """
+        self._prefetched.clear()
+        self.retriever.delete_documents(ids)
+
+    def update_documents(self, documents: List[Dict[str, Any]]):
+        """
+        按 ID 更新文档，不存在的 ID 将被新增。
         """
-        # 合并现有文档
-        existing_docs = self.retriever.documents
-        existing_docs.extend(documents)
-        self.retriever.fit(existing_docs)
+        self._prefetched.clear()
+        self.retriever.update_documents(documents)
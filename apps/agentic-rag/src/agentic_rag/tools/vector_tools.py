@@ -1,18 +1,27 @@
-from typing import Any, Dict
-from nagent_core.tool import BaseTool
+from typing import Any, Dict, List
+from nagent_core.tool import BaseTool, string_parameters
 from nagent_rag.retrievers.base import BaseRetriever
 
 class VectorSearchTool(BaseTool):
     """
     基于向量相似度的检索工具。
     """
+    parameters = string_parameters(query="检索查询")
+
     def __init__(self, retriever: BaseRetriever, name: str = "vector_search", description: str = "使用向量检索技术（如语义相似度匹配）从文档库中查找与查询最相关的内容"):
         super().__init__(name, description)
         self.retriever = retriever
 
     def run(self, query: str) -> str:
-        top_k_docs = self.retriever.get_top_k(query)
+        return self._format_results(self.retriever.get_top_k(query))
 
+    async def arun(self, query: str) -> str:
+        """
+        异步检索：查询向量在事件循环中等待，不阻塞其他并发会话。
+        """
+        return self._format_results(await self.retriever.aget_top_k(query))
+
+    def _format_results(self, top_k_docs: List[Dict[str, Any]]) -> str:
         if not top_k_docs:
             return "没有找到相关的语义匹配结果。"
 
@@ -36,6 +45,15 @@ class VectorStoreTool(BaseTool):
     """
     向量存储工具，允许 Agent 在运行时将新的内容写入向量库。
     """
+    parameters = {
+        "type": "object",
+        "properties": {
+            "content": {"type": "string", "description": "要保存的内容"},
+            "doc_id": {"type": "string", "description": "可选的文档 ID"},
+        },
+        "required": ["content"],
+    }
+
     def __init__(self, retriever: BaseRetriever, name: str = "vector_store", description: str = "将新的文档或内容保存到向量数据库中以供后续检索"):
         super().__init__(name, description)
         self.retriever = retriever
@@ -49,7 +67,7 @@ class VectorStoreTool(BaseTool):
             doc["id"] = doc_id
         
         try:
-            self.retriever.fit([doc])
+            self.retriever.add_documents([doc])
             return f"成功将内容保存到向量库 (ID: {doc.get('id', 'N/A')})。"
         except Exception as e:
             return f"保存内容到向量库失败: {str(e)}"
@@ -15,6 +15,7 @@ import os
 import argparse
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 from google import genai
@@ -36,7 +37,10 @@ logger = logging.getLogger(__name__)
 
 # 导入项目模块
 from agentic_rag.rags import AgenticRAG, SimpleRAG, VectorRAG
-from nagent_rag.retrievers.keyword import SimpleKeywordRetriever
+from nagent_core.cache import ResponseCache, set_default_response_cache
+from nagent_core.rate_limit import configure_rate_limits
+from nagent_core.tool import set_tool_executor
+from nagent_rag.retrievers.bm25 import BM25Retriever
 from nagent_rag.retrievers.chroma import ChromaRetriever
 from nagent_rag.models import get_embeddings
 from nagent_rag.validation import ValidationConfig, ValidationRunner, MetricScore, MetricType, ValidationResult
@@ -89,7 +93,7 @@ class AgenticRAGValidationRunner(ValidationRunner):
             embeddings = get_embeddings(client=self.client)
             retriever = ChromaRetriever(embedding_function=embeddings)
         else:
-            retriever = SimpleKeywordRetriever()
+            retriever = BM25Retriever()
         retriever.fit(self.all_docs)
 
         # 初始化 RAG
@@ -122,6 +126,14 @@ class AgenticRAGValidationRunner(ValidationRunner):
                 trace_dir=str(trace_dir),
             )
 
+    async def prepare(self):
+        """初始化 RAG，并对直接检索型 RAG 批量预检索全部测试问题"""
+        await self._init_rag()
+        if self.rag_type.lower() in ("simple", "vector"):
+            queries = [tc.user_input for tc in self.config.test_cases]
+            print(f"🔍 正在批量预检索 {len(queries)} 个测试问题...")
+            await self.rag.aprefetch(queries)
+
     async def run_test_case(self, test_case):
         """执行单个测试用例"""
         if not self.rag:
@@ -273,7 +285,7 @@ async def main():
         "--docs",
         type=str,
         default=None,
-        help="独立文档库文件路径（若提供则优先使用，否则使用 config 中的 rag_data）",
+        help="独立文档库文件路径，JSON 或 JSONL（若提供则优先使用，否则使用 config 中的 rag_data）",
     )
     parser.add_argument(
         "--output",
@@ -294,6 +306,36 @@ async def main():
         choices=["agentic", "simple", "vector"],
         help="RAG 实现类型 (agentic, simple 或 vector)，若指定则覆盖配置文件中的设定",
     )
+    parser.add_argument(
+        "--llm_cache_dir",
+        type=str,
+        default=None,
+        help="LLM 响应缓存目录；指定后相同请求 (含裁判评分) 在重复运行时直接命中缓存",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=None,
+        help="每个模型每分钟最大请求数 (客户端限流)",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=float,
+        default=None,
+        help="每个模型每分钟最大 token 数 (客户端限流)",
+    )
+    parser.add_argument(
+        "--max_in_flight",
+        type=int,
+        default=None,
+        help="每个模型同时在途的最大请求数",
+    )
+    parser.add_argument(
+        "--tool_workers",
+        type=int,
+        default=None,
+        help="工具/检索共享线程池的大小 (异步 Agent 中同步工具在此线程池中执行)",
+    )
     args = parser.parse_args()
 
     # 确定路径
@@ -349,12 +391,13 @@ async def main():
             return
 
         import json
+        from nagent_rag.doc_io import read_documents
         try:
-            with open(docs_path, 'r', encoding='utf-8') as f:
-                all_docs = json.load(f)
+            # 支持 JSON 列表与 JSONL (可为 .gz / .zst 压缩)，JSONL 逐行解析
+            all_docs = read_documents(str(docs_path))
             print(f"✓ 已加载 {len(all_docs)} 个文档 (路径: {docs_path})")
-        except json.JSONDecodeError as e:
-            print(f"❌ 错误：文档文件格式错误 (非 JSON): {e}")
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"❌ 错误：文档文件格式错误: {e}")
             return
         except Exception as e:
             print(f"❌ 错误：加载文档文件失败: {e}")
@@ -414,6 +457,20 @@ async def main():
     print("🔑 正在初始化 Gemini 客户端...")
     client = genai.Client(api_key=api_key)
 
+    if args.rpm or args.tpm or args.max_in_flight:
+        configure_rate_limits(rpm=args.rpm, tpm=args.tpm, max_in_flight=args.max_in_flight)
+        print(f"✓ 已启用客户端限流: rpm={args.rpm}, tpm={args.tpm}, max_in_flight={args.max_in_flight}")
+
+    if args.tool_workers:
+        set_tool_executor(ThreadPoolExecutor(max_workers=args.tool_workers, thread_name_prefix="nagent-tool"))
+        print(f"✓ 工具线程池大小: {args.tool_workers}")
+
+    llm_cache = None
+    if args.llm_cache_dir:
+        llm_cache = ResponseCache(cache_dir=args.llm_cache_dir)
+        set_default_response_cache(llm_cache)
+        print(f"✓ 已启用 LLM 响应缓存: {args.llm_cache_dir}")
+
     # 创建验证运行器
     output_dir = Path(args.output)
     runner = AgenticRAGValidationRunner(
@@ -429,6 +486,10 @@ async def main():
     # 打印总结
     runner.print_summary(summary)
 
+    if llm_cache is not None:
+        stats = llm_cache.stats()
+        print(f"\n🗃️ LLM 缓存: 命中 {stats['hits']} / 未命中 {stats['misses']} (命中率 {stats['hit_rate']:.1%})")
+
     # 保存结果
     print("\n💾 正在保存结果...")
     runner.save_results_json()
@@ -35,3 +35,27 @@ def test_agentic_rag_integration():
     # 5. 验证
     assert "Anthropic" in result["answer"]
     assert mock_llm.models.generate_content.call_count == 2
+
+def test_clear_index_can_keep_the_saved_index(tmp_path):
+    index_path = str(tmp_path / "index.pkl")
+    retriever = SimpleKeywordRetriever()
+    retriever.fit([{"id": "1", "content": "old"}])
+    retriever.save_index(index_path)
+    rag = AgenticRAG(client=MagicMock(), retriever=SimpleKeywordRetriever(), index_path=index_path)
+    assert len(rag.retriever.documents) == 1
+
+    rag.clear_index(delete_file=False)
+    assert rag.retriever.documents == []
+    assert (tmp_path / "index.pkl").exists()
+
+    rag.clear_index()
+    assert not (tmp_path / "index.pkl").exists()
+
+def test_base_rag_requires_prompt_methods():
+    from agentic_rag.rags.base import BaseRAG
+
+    class Incomplete(BaseRAG):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(client=MagicMock(), retriever=SimpleKeywordRetriever())
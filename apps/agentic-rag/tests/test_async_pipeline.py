@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from agentic_rag.rags import AgenticRAG, SimpleRAG
+from nagent_rag.retrievers.keyword import SimpleKeywordRetriever
+
+DOCS = [{"id": "1", "content": "Paris is the capital of France"}]
+
+def make_retriever():
+    retriever = SimpleKeywordRetriever()
+    retriever.fit(DOCS)
+    return retriever
+
+def make_client(text):
+    client = MagicMock()
+    client.models.generate_content.return_value = MagicMock(text=text)
+    client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text=text))
+    return client
+
+@pytest.mark.asyncio
+async def test_sync_and_async_share_one_pipeline():
+    client = make_client("Paris")
+    rag = SimpleRAG(client=client, retriever=make_retriever())
+
+    sync_result = rag.query("capital of France")
+    async_result = await rag.aquery("capital of France")
+
+    assert sync_result == async_result
+    assert client.models.generate_content.call_count == 1
+    assert client.aio.models.generate_content.await_count == 1
+
+@pytest.mark.asyncio
+async def test_sync_query_works_inside_a_running_loop():
+    rag = SimpleRAG(client=make_client("Paris"), retriever=make_retriever())
+    assert rag.query("capital of France")["answer"] == "Paris"
+
+@pytest.mark.asyncio
+async def test_agentic_aquery_rewrites_and_decomposes_concurrently():
+    client = make_client("Thought: done.\nFinal Answer: Paris")
+    rag = AgenticRAG(client=client, retriever=make_retriever(), use_query_rewrite=True, use_query_decompose=True)
+    both_started = asyncio.Event()
+    started = []
+
+    async def wait_for_other(result, query):
+        started.append(query)
+        if len(started) == 2:
+            both_started.set()
+        # Times out unless rewrite and decompose run at the same time
+        await asyncio.wait_for(both_started.wait(), timeout=5)
+        return result
+
+    rag.rewriter.arewrite = lambda q: wait_for_other(q, q)
+    rag.decomposer.adecompose = lambda q: wait_for_other(["capital", "France"], q)
+    rag.rewriter.rewrite = MagicMock()
+
+    result = await rag.aquery("capital of France")
+
+    assert result["answer"] == "Paris"
+    rag.rewriter.rewrite.assert_not_called()
+    prompt = client.aio.models.generate_content.call_args.kwargs["contents"][0].parts[0].text
+    assert "- capital\n- France" in prompt
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_agentic_prefetches_sub_queries_in_one_batch(use_async):
+    retriever = SimpleKeywordRetriever()
+    retriever.fit([
+        {"id": "1", "content": "Paris is the capital of France"},
+        {"id": "2", "content": "Berlin is the capital of Germany"},
+    ])
+    retriever.get_top_k_batch = MagicMock(wraps=retriever.get_top_k_batch)
+    client = make_client("Thought: done.\nFinal Answer: Paris and Berlin")
+    rag = AgenticRAG(client=client, retriever=retriever, use_query_decompose=True, prefetch_sub_queries=True)
+    rag.decomposer.decompose = MagicMock(return_value=["capital France", "capital Germany"])
+    rag.decomposer.adecompose = AsyncMock(return_value=["capital France", "capital Germany"])
+
+    result = asyncio.run(rag.aquery("q")) if use_async else rag.query("q")
+
+    retriever.get_top_k_batch.assert_called_once_with(["capital France", "capital Germany"], k=3)
+    # Merged context is de-duplicated and injected into the question
+    if use_async:
+        prompt = client.aio.models.generate_content.call_args.kwargs["contents"][0].parts[0].text
+    else:
+        prompt = client.models.generate_content.call_args.kwargs["contents"][0].parts[0].text
+    assert prompt.count("(ID: 1)") == 1 and prompt.count("(ID: 2)") == 1
+    step0 = result["trace"][0]
+    assert step0["step"] == 0
+    assert step0["action"] == ("retrieve", '["capital France", "capital Germany"]')
+    assert "Content Omitted" in step0["observation"]
+    assert result["answer"] == "Paris and Berlin"
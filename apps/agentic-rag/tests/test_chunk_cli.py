@@ -0,0 +1,40 @@
+import json
+import sys
+from agentic_rag import chunk_cli
+
+def run_cli(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["chunk_cli", *argv])
+    chunk_cli.main()
+
+def read_ids(path):
+    with open(path, encoding="utf-8") as f:
+        return sorted(doc["id"] for doc in json.load(f))
+
+def test_first_manifest_run_replaces_output_written_without_manifest(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("alpha " * 100, encoding="utf-8")
+    (docs / "b.md").write_text("beta", encoding="utf-8")
+    output = str(tmp_path / "out.json")
+    manifest = str(tmp_path / "manifest.json")
+    delta_output = str(tmp_path / "delta.json")
+    common = ["--chunk-size", "200", "--chunk-overlap", "20", "--workers", "0", "--output", output]
+
+    run_cli(monkeypatch, str(docs), *common)
+    old_ids = read_ids(output)
+    assert old_ids[0] == "0"
+
+    run_cli(monkeypatch, str(docs), *common, "--manifest", manifest, "--delta-output", delta_output)
+    ids = read_ids(output)
+    assert all("_" in doc_id for doc_id in ids)
+    with open(delta_output, encoding="utf-8") as f:
+        assert set(json.load(f)["removed"]) == set(old_ids)
+
+    # 后续运行保持稳定
+    run_cli(monkeypatch, str(docs), *common, "--manifest", manifest)
+    assert read_ids(output) == ids
+
+    # 删除清单后全量重建，不会重复
+    (tmp_path / "manifest.json").unlink()
+    run_cli(monkeypatch, str(docs), *common, "--manifest", manifest)
+    assert read_ids(output) == ids
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+from agentic_rag.rags import SimpleRAG
+from nagent_rag.retrievers.keyword import SimpleKeywordRetriever
+
+def test_simple_rag_uses_prefetched_results():
+    retriever = SimpleKeywordRetriever()
+    retriever.fit([{"id": "1", "content": "Paris is the capital of France"}])
+    retriever.get_top_k_batch = MagicMock(wraps=retriever.get_top_k_batch)
+    retriever.get_top_k = MagicMock(wraps=retriever.get_top_k)
+
+    mock_llm = MagicMock()
+    mock_llm.models.generate_content.return_value = MagicMock(text="Paris")
+    rag = SimpleRAG(client=mock_llm, retriever=retriever, k=2)
+
+    rag.prefetch(["capital of France", "capital of France"])
+    retriever.get_top_k_batch.assert_called_once_with(["capital of France"], 2)
+
+    result = rag.query("capital of France")
+    assert "(ID: 1)" in result["trace"][0]["observation"]
+    retriever.get_top_k.assert_not_called()
+
+    # Prefetched results are consumed once
+    rag.query("capital of France")
+    retriever.get_top_k.assert_called_once()
+
+def test_aprefetch_runs_off_the_event_loop():
+    retriever = SimpleKeywordRetriever()
+    retriever.fit([{"id": "1", "content": "Paris is the capital of France"}])
+    threads = []
+
+    def get_top_k_batch(queries, k=3):
+        threads.append(threading.current_thread())
+        return [[{"id": "1", "content": "Paris"}] for _ in queries]
+
+    retriever.get_top_k_batch = get_top_k_batch
+    rag = SimpleRAG(client=MagicMock(), retriever=retriever, k=2)
+
+    asyncio.run(rag.aprefetch(["capital of France"]))
+    assert threads and threads[0] is not threading.main_thread()
+    assert rag._prefetched[("capital of France", 2)] == [{"id": "1", "content": "Paris"}]
@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from agentic_rag.rags import SimpleRAG, VectorRAG
+
+def make_stream(chunks):
+    async def gen():
+        for text in chunks:
+            chunk = MagicMock()
+            chunk.text = text
+            yield chunk
+    return gen()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rag_cls, action", [(SimpleRAG, "retrieve"), (VectorRAG, "vector_search")])
+async def test_rag_astream_query(rag_cls, action):
+    client = MagicMock()
+    client.aio.models.generate_content_stream = AsyncMock(return_value=make_stream(["Par", "is"]))
+    retriever = MagicMock()
+    retriever.aget_top_k = AsyncMock(return_value=[{"id": "1", "content": "Paris is the capital of France."}])
+
+    rag = rag_cls(client=client, retriever=retriever)
+    events = [event async for event in rag.astream_query("Capital of France?")]
+
+    assert [e["text"] for e in events if e["type"] == "token"] == ["Par", "is"]
+    final = events[-1]
+    assert final["type"] == "final"
+    assert final["answer"] == "Paris"
+    assert final["trace"][0]["action"] == action
+    assert "(ID: 1" in final["trace"][0]["observation"]
+    # The async path never calls the blocking retrieval API
+    retriever.get_top_k.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_rag_astream_query_reports_errors():
+    client = MagicMock()
+    client.aio.models.generate_content_stream = AsyncMock(side_effect=KeyError("boom"))
+    retriever = MagicMock()
+    retriever.aget_top_k = AsyncMock(return_value=[])
+
+    events = [event async for event in SimpleRAG(client=client, retriever=retriever).astream_query("q")]
+    assert events[-1]["type"] == "final"
+    assert "生成答案时发生错误" in events[-1]["answer"]
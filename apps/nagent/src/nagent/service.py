@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from nagent_core import SimpleAgent, is_retryable_error, robust_json_parse
+from nagent_core.utils import run_sync
 from nagent_core.llm import LLMClient
 from nagent_rag.retrievers.base import BaseRetriever
 from nagent_rag.retrievers.keyword import SimpleKeywordRetriever
@@ -53,8 +54,8 @@ class SimpleRAG:
     def add_documents(self, documents: List[str]):
         """Add documents to the knowledge base"""
         self.documents.extend(documents)
-        # Refit retriever with all documents
-        self.retriever.fit(self.documents)
+        # Index only the new documents
+        self.retriever.add_documents(documents)
         self.is_fitted = True
 
     def set_documents(self, documents: List[str]):
@@ -63,24 +64,14 @@ class SimpleRAG:
         self.retriever.fit(self.documents)
         self.is_fitted = True
 
-    def retrieve_documents(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
-        """
-        Retrieve top-k most relevant documents for the query
-
-        Args:
-            query: Search query
-            top_k: Number of documents to retrieve
-
-        Returns:
-            List of dictionaries containing document info
-        """
+    def _check_fitted(self):
         if not self.is_fitted:
             raise ValueError(
                 "No documents have been added. Call add_documents() or set_documents() first."
             )
 
-        top_docs = self.retriever.get_top_k(query, k=top_k)
-
+    @staticmethod
+    def _to_retrieved_docs(top_docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         retrieved_docs = []
         for doc in top_docs:
             score = doc.get("_score", 0)
@@ -92,30 +83,44 @@ class SimpleRAG:
                         "document_id": doc.get("id", ""),
                     }
                 )
-
         return retrieved_docs
 
-    def generate_response(
-        self, query: str, top_k: int = 3, model_name: Optional[str] = None
-    ) -> Dict[str, Any]:
+    def retrieve_documents(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """
-        Generate response to query using retrieved documents
+        Retrieve top-k most relevant documents for the query
 
         Args:
-            query: User query
+            query: Search query
             top_k: Number of documents to retrieve
-            model_name: Optional model to use for this specific request
 
         Returns:
-            Dictionary containing 'answer' and 'retrieved_docs'
+            List of dictionaries containing document info
         """
-        if not self.is_fitted:
-            raise ValueError(
-                "No documents have been added. Call add_documents() or set_documents() first."
-            )
+        self._check_fitted()
+        return self._to_retrieved_docs(self.retriever.get_top_k(query, k=top_k))
+
+    async def aretrieve_documents(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Async version of retrieve_documents (does not block the event loop)
+        """
+        self._check_fitted()
+        return self._to_retrieved_docs(await self.retriever.aget_top_k(query, k=top_k))
+
+    async def _agenerate_pipeline(
+        self, query: str, top_k: int, model_name: Optional[str], blocking: bool
+    ) -> Dict[str, Any]:
+        """
+        The single RAG pipeline (retrieve -> build context -> generate) behind
+        generate_response and agenerate_response. With blocking=True it uses
+        the synchronous retriever and SDK calls.
+        """
+        self._check_fitted()
 
         # Retrieve relevant documents
-        retrieved_docs = self.retrieve_documents(query, top_k)
+        if blocking:
+            retrieved_docs = self.retrieve_documents(query, top_k)
+        else:
+            retrieved_docs = await self.aretrieve_documents(query, top_k)
 
         if not retrieved_docs:
             return {
@@ -134,9 +139,14 @@ class SimpleRAG:
         prompt = self.system_prompt.format(query=query, context=context)
 
         try:
-            response = self.llm_client.generate_content(
-                model=model_name or self.model_name, contents=prompt
-            )
+            if blocking:
+                response = self.llm_client.generate_content(
+                    model=model_name or self.model_name, contents=prompt
+                )
+            else:
+                response = await self.llm_client.agenerate_content(
+                    model=model_name or self.model_name, contents=prompt
+                )
             return {
                 "answer": response.text.strip(),
                 "retrieved_docs": retrieved_docs
@@ -148,49 +158,53 @@ class SimpleRAG:
                 "retrieved_docs": retrieved_docs
             }
 
-    async def agenerate_response(
+    def generate_response(
         self, query: str, top_k: int = 3, model_name: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Async version of generate_response
-        """
-        if not self.is_fitted:
-            raise ValueError(
-                "No documents have been added. Call add_documents() or set_documents() first."
-            )
-
-        # Retrieve relevant documents
-        retrieved_docs = self.retrieve_documents(query, top_k)
+        Generate response to query using retrieved documents
 
-        if not retrieved_docs:
-            return {
-                "answer": "I couldn't find any relevant documents to answer your question.",
-                "retrieved_docs": []
-            }
+        Args:
+            query: User query
+            top_k: Number of documents to retrieve
+            model_name: Optional model to use for this specific request
 
-        # Build context from retrieved documents
-        context_parts = []
-        for i, doc in enumerate(retrieved_docs, 1):
-            context_parts.append(f"Document {i}:\n{doc['content']}")
+        Returns:
+            Dictionary containing 'answer' and 'retrieved_docs'
+        """
+        return run_sync(self._agenerate_pipeline(query, top_k, model_name, blocking=True))
 
-        context = "\n\n".join(context_parts)
+    async def agenerate_response(
+        self, query: str, top_k: int = 3, model_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Async version of generate_response
+        """
+        return await self._agenerate_pipeline(query, top_k, model_name, blocking=False)
 
-        # Generate response using LLM client
-        prompt = self.system_prompt.format(query=query, context=context)
+    async def _aquery_pipeline(
+        self, question: str, top_k: int, run_id: Optional[str], model_name: Optional[str], blocking: bool
+    ) -> Dict[str, Any]:
+        # Generate run_id if not provided
+        if run_id is None:
+            run_id = (
+                f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(question) % 10000:04d}"
+            )
 
         try:
-            response = await self.llm_client.agenerate_content(
-                model=model_name or self.model_name, contents=prompt
-            )
+            result = await self._agenerate_pipeline(question, top_k, model_name, blocking)
             return {
-                "answer": response.text.strip(),
-                "retrieved_docs": retrieved_docs
+                "answer": result["answer"],
+                "retrieved_docs": result["retrieved_docs"],
+                "run_id": run_id
             }
 
         except Exception as e:
+            # Return error result
             return {
-                "answer": f"Error generating response: {str(e)}",
-                "retrieved_docs": retrieved_docs
+                "answer": f"Error processing query: {str(e)}",
+                "retrieved_docs": [],
+                "run_id": run_id,
             }
 
     def query(
@@ -212,27 +226,7 @@ class SimpleRAG:
         Returns:
             Dictionary containing response, retrieved_docs and run_id
         """
-        # Generate run_id if not provided
-        if run_id is None:
-            run_id = (
-                f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(question) % 10000:04d}"
-            )
-
-        try:
-            result = self.generate_response(question, top_k, model_name=model_name)
-            return {
-                "answer": result["answer"],
-                "retrieved_docs": result["retrieved_docs"],
-                "run_id": run_id
-            }
-
-        except Exception as e:
-            # Return error result
-            return {
-                "answer": f"Error processing query: {str(e)}",
-                "retrieved_docs": [],
-                "run_id": run_id,
-            }
+        return run_sync(self._aquery_pipeline(question, top_k, run_id, model_name, blocking=True))
 
     async def aquery(
         self,
@@ -244,29 +238,7 @@ class SimpleRAG:
         """
         Async version of query
         """
-        # Generate run_id if not provided
-        if run_id is None:
-            run_id = (
-                f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(question) % 10000:04d}"
-            )
-
-        try:
-            result = await self.agenerate_response(
-                question, top_k, model_name=model_name
-            )
-            return {
-                "answer": result["answer"],
-                "retrieved_docs": result["retrieved_docs"],
-                "run_id": run_id
-            }
-
-        except Exception as e:
-            # Return error result
-            return {
-                "answer": f"Error processing query: {str(e)}",
-                "retrieved_docs": [],
-                "run_id": run_id,
-            }
+        return await self._aquery_pipeline(question, top_k, run_id, model_name, blocking=False)
 
 
 def default_rag_client(
@@ -45,3 +45,17 @@ def test_retriever_ranking():
 
     assert "melodic frameworks" in top_docs[0]["content"]
     assert top_docs[0]["_score"] >= 2
+
+@pytest.mark.asyncio
+async def test_rag_aquery_uses_async_clients():
+    from unittest.mock import AsyncMock
+    mock_llm = MagicMock()
+    mock_llm.aio.models.generate_content = AsyncMock(return_value=MagicMock(text=" Ragas are frameworks. "))
+
+    rag_client = SimpleRAG(llm_client=mock_llm, retriever=SimpleKeywordRetriever())
+    rag_client.add_documents(DOCUMENTS)
+    response = await rag_client.aquery("What is Ragas", top_k=2)
+
+    assert response["answer"] == "Ragas are frameworks."
+    assert len(response["retrieved_docs"]) == 2
+    mock_llm.models.generate_content.assert_not_called()
@@ -1,5 +1,10 @@
-from .agent import SimpleAgent, ReActAgent
+from .agent import SimpleAgent, ReActAgent, FunctionCallingAgent
 from .utils import is_retryable_error, robust_json_parse
 from .llm import LLMClient
+from .cache import ResponseCache, set_default_response_cache
+from .rate_limit import RateLimiter, configure_rate_limits
+from .context_cache import ContextCache, LocalContextCache
+from .tool import set_tool_executor, get_tool_executor
+from .sandbox import SandboxPool, set_default_sandbox_pool, get_default_sandbox_pool
 
-__all__ = ["SimpleAgent", "ReActAgent", "is_retryable_error", "robust_json_parse", "LLMClient"]
+__all__ = ["SimpleAgent", "ReActAgent", "FunctionCallingAgent", "is_retryable_error", "robust_json_parse", "LLMClient", "ResponseCache", "set_default_response_cache", "RateLimiter", "configure_rate_limits", "ContextCache", "LocalContextCache", "set_tool_executor", "get_tool_executor", "SandboxPool", "set_default_sandbox_pool", "get_default_sandbox_pool"]
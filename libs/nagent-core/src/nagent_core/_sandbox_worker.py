@@ -0,0 +1,118 @@
+"""
+沙箱工作进程 - 由 SandboxPool 以独立解释器运行 (不导入 nagent_core)
+
+协议：stdin / stdout 上的长度前缀 JSON 消息 (4 字节大端长度 + UTF-8 JSON)。
+- 启动后发送 {"ready": true}
+- 收到 {"code": ..., "cpu_seconds": ...} 后执行代码，回复 {"status": "ok" | "error" | "cpu_timeout", "output": ..., "error": ...}
+"""
+import contextlib
+import io
+import json
+import math
+import os
+import signal
+import struct
+import sys
+
+try:
+    import resource
+except ImportError:  # 非 POSIX 平台：没有 rlimit
+    resource = None
+
+
+class CpuTimeExceeded(BaseException):
+    """BaseException, so `except Exception` in user code cannot swallow it."""
+
+
+def _on_sigxcpu(signum, frame):
+    raise CpuTimeExceeded()
+
+
+def _read_message(stream):
+    header = stream.read(4)
+    if len(header) < 4:
+        return None
+    (length,) = struct.unpack(">I", header)
+    return json.loads(stream.read(length).decode("utf-8"))
+
+
+def _write_message(stream, message):
+    data = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    stream.write(struct.pack(">I", len(data)) + data)
+    stream.flush()
+
+
+def _set_cpu_limit(seconds):
+    """Per-call CPU budget: RLIMIT_CPU is cumulative, so the soft limit is set relative to the time used so far."""
+    if resource is None or not hasattr(resource, "RLIMIT_CPU"):
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime + seconds)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _execute(code, max_output_chars):
+    output = io.StringIO()
+    status, error = "ok", None
+    try:
+        with contextlib.redirect_stdout(output):
+            exec(compile(code, "<sandbox>", "exec"), {"__name__": "__main__"})
+    except CpuTimeExceeded:
+        status = "cpu_timeout"
+    except MemoryError:
+        status, error = "error", "MemoryError: 超出内存限制"
+    except BaseException as e:
+        # SystemExit / KeyboardInterrupt 也只结束本次执行，不结束工作进程
+        status, error = "error", str(e) or type(e).__name__
+    return {"status": status, "output": output.getvalue()[:max_output_chars], "error": error}
+
+
+def main():
+    config = json.loads(sys.argv[1])
+    # 以脚本方式运行时脚本目录位于 sys.path[0]，移除以免 nagent_core 的模块遮蔽用户导入
+    if sys.path and os.path.abspath(sys.path[0] or ".") == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+
+    proto_in = sys.stdin.buffer
+    proto_out = os.fdopen(os.dup(1), "wb")
+    # 用户代码 (包括 C 扩展) 直接写 fd 1/0 时不会破坏协议
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 1)
+    sys.stdin = io.StringIO()
+
+    # 预热：提前导入常用模块，用户代码中的 import 直接命中 sys.modules
+    for name in config.get("preload", []):
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+    memory_mb = config.get("memory_mb")
+    if resource is not None and memory_mb and hasattr(resource, "RLIMIT_AS"):
+        limit = int(memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+
+    max_output_chars = config.get("max_output_chars", 10000)
+    _write_message(proto_out, {"ready": True})
+    while True:
+        message = _read_message(proto_in)
+        if message is None:
+            break
+        _set_cpu_limit(message.get("cpu_seconds"))
+        try:
+            result = _execute(message["code"], max_output_chars)
+        finally:
+            _set_cpu_limit(None)
+        _write_message(proto_out, result)
+
+
+if __name__ == "__main__":
+    main()
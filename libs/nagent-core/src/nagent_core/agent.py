@@ -1,13 +1,27 @@
+import asyncio
+import json
 import logging
 import re
-from typing import List, Dict, Any, Optional
-from .utils import is_retryable_error, robust_json_parse
+from typing import List, Dict, Any, Optional, AsyncIterator
+from .utils import is_retryable_error, robust_json_parse, run_sync
 from .tool import BaseTool
-from .prompt_utils import REACT_PROMPT_TEMPLATE, format_tools_description
+from google.genai import types
+from .prompt_utils import REACT_SYSTEM_PROMPT_TEMPLATE, REACT_QUESTION_TEMPLATE, FUNCTION_CALLING_SYSTEM_PROMPT, format_tools_description
 from .llm import LLMClient
+from .context_cache import BaseContextCache, LocalContextCache
+from .rate_limit import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_STOP_SEQUENCES = ["\nObservation:"]
+
+# Action: tool_name(args)，或 JSON 形式的行动列表 Actions: [...]
+_ACTION_RE = re.compile(r"Action:\s*(\w+)\((.*)\)|Actions:\s*(?=\[)")
+# 一行完整的 Action / Actions (以换行结束)，流式输出时据此提前停止生成
+_ACTION_LINE_RE = re.compile(r"(?:Action:\s*(\w+)\((.*)\)|Actions:\s*\[.*\])[ \t]*\r?\n")
+_WHITESPACE_RE = re.compile(r"\s*")
+_json_decoder = json.JSONDecoder()
+
 class SimpleAgent:
     def __init__(self, client, system_prompt: str = None, model_name: str = "gemini-2.0-flash"):
         self.client = client
@@ -61,194 +75,553 @@ answer：
             return {"answer": f"Error during aquery: {str(e)}"}
 
 class ReActAgent:
+    """
+    ReAct (Reasoning + Acting) Agent。
+
+    对话以结构化的多轮 contents 发送：静态前缀 (系统提示 + 工具描述) 通过上下文缓存提供，
+    每轮只追加模型输出 (model) 与 Observation (user)。每个 trace 步骤记录本轮的
+    input_tokens (未命中缓存的输入) 与 cached_tokens。
+    """
+    # 输出既无 Action 也无 Final Answer 时追加的提示
+    continue_prompt = "Thought: I need to clarify my next step or provide a Final Answer."
+
     def __init__(
         self,
         client,
         tools: List[BaseTool],
         model_name: str = "gemini-2.0-flash",
         max_iterations: int = 5,
+        stop_sequences: Optional[List[str]] = None,
+        context_cache: Optional[BaseContextCache] = None,
     ):
         self.client = client
         self.llm_client = LLMClient(client)
         self.tools = {tool.name: tool for tool in tools}
         self.model_name = model_name
         self.max_iterations = max_iterations
-        self.system_prompt = REACT_PROMPT_TEMPLATE.format(
-            tools_description=format_tools_description(tools),
-            user_input="{user_input}"
+        # 模型在 Action 之后常会臆造 Observation，遇到这些序列即停止生成
+        self.stop_sequences = DEFAULT_STOP_SEQUENCES if stop_sequences is None else stop_sequences
+        # 累计统计：steps (LLM 调用次数)、action_stops (在 Action 处结束的步骤)、
+        # truncated_chars / tokens_saved (截断丢弃、不再回填进后续 Prompt 的输出)、output_tokens
+        self.stop_stats = {"steps": 0, "action_stops": 0, "truncated_chars": 0, "tokens_saved": 0, "output_tokens": 0}
+        self.system_prompt = REACT_SYSTEM_PROMPT_TEMPLATE.format(
+            tools_description=format_tools_description(tools)
         )
+        # 服务端上下文缓存会产生费用，需显式传入 ContextCache；默认直接发送 system_instruction
+        self.context_cache = context_cache if context_cache is not None else LocalContextCache()
+
+    @staticmethod
+    def _json_actions(items: Any) -> List[tuple[str, str]]:
+        """
+        解析 JSON 行动列表，元素可以是 {"tool": ..., "args": ...} 或 [tool, args]；
+        非字符串参数按 JSON 字符串传给工具。
+        """
+        actions = []
+        if not isinstance(items, list):
+            return actions
+        for item in items:
+            if isinstance(item, dict):
+                name = item.get("tool") or item.get("name")
+                args = item.get("args", item.get("input", ""))
+            elif isinstance(item, list) and len(item) == 2:
+                name, args = item
+            else:
+                continue
+            if not isinstance(name, str):
+                continue
+            if not isinstance(args, str):
+                args = json.dumps(args, ensure_ascii=False)
+            actions.append((name, args))
+        return actions
+
+    def _scan_actions(self, text: str) -> tuple[List[tuple[str, str]], int]:
+        """
+        收集第一个 Action 之后、Observation / Final Answer 之前的所有 Action，返回 (actions, 最后一个 Action 的结束位置)。
+        """
+        first = _ACTION_RE.search(text)
+        final_idx = text.find("Final Answer:")
+        if not first or (final_idx != -1 and final_idx < first.start()):
+            return [], 0
+        boundaries = [idx for idx in (text.find("Observation:", first.start()), text.find("Final Answer:", first.start())) if idx != -1]
+        boundary = min(boundaries) if boundaries else len(text)
+        actions = []
+        end = 0
+        pos = first.start()
+        while True:
+            match = _ACTION_RE.search(text, pos)
+            if not match or match.start() >= boundary:
+                break
+            if match.group(1):
+                actions.append((match.group(1), match.group(2)))
+                pos = match.end()
+            else:
+                try:
+                    items, pos = _json_decoder.raw_decode(text, match.end())
+                except ValueError:
+                    pos = match.end()
+                    continue
+                actions.extend(self._json_actions(items))
+            end = pos
+        return actions, end
+
+    def _parse_actions(self, text: str) -> List[tuple[str, str]]:
+        """
+        解析本步的全部 Action (多行 Action: tool_name(args) 或 Actions: [...])，它们将被并行执行
+        """
+        return self._scan_actions(text)[0]
 
     def _parse_action(self, text: str) -> Optional[tuple[str, str]]:
         """
-        解析 Action: tool_name(args) 格式
+        解析 Action: tool_name(args) 格式 (只返回第一个)
         """
-        match = re.search(r"Action:\s*(\w+)\((.*)\)", text)
-        if match:
-            return match.group(1), match.group(2)
-        return None
+        actions = self._parse_actions(text)
+        return actions[0] if actions else None
 
-    def query(self, user_input: str):
-        prompt = self.system_prompt.format(user_input=user_input)
-        full_history = prompt
-        trace = []
+    @staticmethod
+    def _turn(role: str, text: str) -> types.Content:
+        return types.Content(role=role, parts=[types.Part(text=text)])
 
-        for i in range(self.max_iterations):
-            logger.info(f"Iteration {i+1}/{self.max_iterations}")
+    def _initial_contents(self, user_input: str) -> List[types.Content]:
+        return [self._turn("user", REACT_QUESTION_TEMPLATE.format(user_input=user_input))]
 
-            response = self.llm_client.generate_content(
-                model=self.model_name,
-                contents=full_history,
-            )
+    def _generation_config(self, prefix_config: Dict[str, Any]) -> Dict[str, Any]:
+        config = dict(prefix_config)
+        if self.stop_sequences:
+            config["stop_sequences"] = list(self.stop_sequences)
+        return config
 
-            generated_text = response.text
-            logger.debug(f"LLM Output:\n{generated_text}")
-            full_history += generated_text
-
-            # 提取 Thought
-            thought_match = re.search(r"Thought:\s*(.*?)(?=\n(Action|Final Answer)|$)", generated_text, re.DOTALL)
-            thought = thought_match.group(1).strip() if thought_match else ""
-
-            # 检查是否有最终答案
-            if "Final Answer:" in generated_text:
-                answer = generated_text.split("Final Answer:")[-1].strip()
-                trace.append({
-                    "step": i + 1,
-                    "thought": thought,
-                    "action": None,
-                    "observation": None,
-                    "final_answer": answer
-                })
-                return {"answer": answer, "trace": trace}
-
-            # 解析动作
-            action_info = self._parse_action(generated_text)
-            if action_info:
-                tool_name, tool_args = action_info
-                if tool_name in self.tools:
-                    logger.info(f"Calling tool: {tool_name} with args: {tool_args}")
-                    try:
-                        # 简单处理参数，这里假设参数是字符串
-                        observation = self.tools[tool_name].run(tool_args)
-                    except Exception as e:
-                        observation = f"Error executing tool: {e}"
-                else:
-                    observation = f"Unknown tool: {tool_name}"
-
-                observation_str_for_trace = str(observation)
-                if tool_name == "retrieve":
-                    observation_str_for_trace = re.sub(r"内容:.*?(?=\n\n---\n\n|\Z)", "内容: [Content Omitted]", observation_str_for_trace, flags=re.DOTALL)
-
-                trace.append({
-                    "step": i + 1,
-                    "thought": thought,
-                    "action": (tool_name, tool_args),
-                    "observation": observation_str_for_trace
-                })
-
-                observation_str = f"\nObservation: {observation}\n"
-                logger.debug(f"Tool Output: \nObservation: {observation_str_for_trace}\n")
-                full_history += observation_str
-            else:
-                # 如果既没有 Final Answer 也没有 Action，可能模型迷茫了
-                logger.warning("LLM output did not contain Action or Final Answer")
-
-                trace.append({
-                    "step": i + 1,
-                    "thought": thought,
-                    "action": None,
-                    "observation": "LLM output did not contain Action or Final Answer"
-                })
-
-                if i == self.max_iterations - 1:
-                    return {
-                        "answer": "I'm sorry, I couldn't find an answer within the iteration limit.",
-                        "trace": trace
-                    }
-                full_history += "\nThought: I need to clarify my next step or provide a Final Answer.\n"
+    def _input_usage(self, contents: List[types.Content], prefix_config: Dict[str, Any], response: Any = None) -> Dict[str, int]:
+        """
+        本轮输入 token：优先使用 usage_metadata (扣除缓存命中部分)，否则本地估算。
+        """
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None)
+        if isinstance(prompt_tokens, int):
+            cached = getattr(usage, "cached_content_token_count", None)
+            cached = cached if isinstance(cached, int) else 0
+            return {"input_tokens": prompt_tokens - cached, "cached_tokens": cached}
+
+        history_tokens = estimate_tokens("".join(part.text or "" for content in contents for part in content.parts))
+        prefix_tokens = estimate_tokens(self.system_prompt)
+        if "cached_content" in prefix_config:
+            return {"input_tokens": history_tokens, "cached_tokens": prefix_tokens}
+        return {"input_tokens": history_tokens + prefix_tokens, "cached_tokens": 0}
+
+    def _truncate_at_action(self, text: str) -> str:
+        """
+        截断到本步最后一个 Action 为止 (这些 Action 出现在 Observation / Final Answer 之前时)，
+        丢弃模型臆造的 Observation 及后续步骤。
+        """
+        actions, end = self._scan_actions(text)
+        if not actions:
+            return text
+        return text[:end]
 
+    def _record_step(self, raw_text: str, kept_text: str, response: Any = None):
+        """
+        更新 stop_stats。tokens_saved 按本次输出的 token/字符比例估算 (无 usage 时按 4 字符/token)。
+        """
+        stats = self.stop_stats
+        stats["steps"] += 1
+        if "Final Answer:" not in kept_text and self._parse_actions(kept_text):
+            stats["action_stops"] += 1
+
+        usage = getattr(response, "usage_metadata", None)
+        output_tokens = getattr(usage, "candidates_token_count", None)
+        if not isinstance(output_tokens, int):
+            output_tokens = None
+        if output_tokens:
+            stats["output_tokens"] += output_tokens
+
+        dropped = len(raw_text) - len(kept_text)
+        if dropped > 0:
+            stats["truncated_chars"] += dropped
+            ratio = output_tokens / len(raw_text) if output_tokens and raw_text else 0.25
+            stats["tokens_saved"] += round(dropped * ratio)
+
+    @staticmethod
+    def _extract_thought(text: str) -> str:
+        thought_match = re.search(r"Thought:\s*(.*?)(?=\n(Action|Final Answer)|$)", text, re.DOTALL)
+        return thought_match.group(1).strip() if thought_match else ""
+
+    def _final_answer(self, step: int, text: str, thought: str, usage: Dict[str, int], trace: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        若输出包含最终答案，记录 trace 并返回结果。
+        """
+        if "Final Answer:" not in text:
+            return None
+        return self._finish(step, text.split("Final Answer:")[-1].strip(), thought, usage, trace)
+
+    @staticmethod
+    def _finish(step: int, answer: str, thought: str, usage: Dict[str, int], trace: List[Dict[str, Any]]) -> Dict[str, Any]:
+        trace.append({
+            "step": step,
+            "thought": thought,
+            "action": None,
+            "observation": None,
+            "final_answer": answer,
+            **usage
+        })
+        return {"answer": answer, "trace": trace}
+
+    def _observe(self, step: int, thought: str, actions: List[tuple], observations: List[Any], usage: Dict[str, int],
+                 contents: List[types.Content], trace: List[Dict[str, Any]]):
+        """
+        记录本步所有工具调用的结果 (每个 Action 一条 trace)，并合并为一个 user 轮次追加到对话中。
+        """
+        self._record_observations(step, thought, actions, observations, usage, trace)
+        if len(actions) == 1:
+            contents.append(self._turn("user", f"Observation: {observations[0]}"))
+            return
+        numbered = "\n\n".join(
+            f"[{k}] {name}({args}):\n{observation}"
+            for k, ((name, args), observation) in enumerate(zip(actions, observations), 1)
+        )
+        contents.append(self._turn("user", f"Observation:\n{numbered}"))
+
+    @staticmethod
+    def _record_observations(step: int, thought: str, actions: List[tuple], observations: List[Any],
+                             usage: Dict[str, int], trace: List[Dict[str, Any]]):
+        for action, observation in zip(actions, observations):
+            observation_str_for_trace = str(observation)
+            if action[0] == "retrieve":
+                observation_str_for_trace = re.sub(r"内容:.*?(?=\n\n---\n\n|\Z)", "内容: [Content Omitted]", observation_str_for_trace, flags=re.DOTALL)
+
+            trace.append({
+                "step": step,
+                "thought": thought,
+                "action": action,
+                "observation": observation_str_for_trace,
+                **usage
+            })
+            logger.debug(f"Tool Output: \nObservation: {observation_str_for_trace}\n")
+
+    def _no_action(self, step: int, thought: str, usage: Dict[str, int],
+                   contents: List[types.Content], trace: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        输出既无 Action 也无 Final Answer：最后一轮时返回结果，否则提示模型继续。
+        """
+        logger.warning("LLM output did not contain Action or Final Answer")
+        trace.append({
+            "step": step,
+            "thought": thought,
+            "action": None,
+            "observation": "LLM output did not contain Action or Final Answer",
+            **usage
+        })
+        if step == self.max_iterations:
+            return {
+                "answer": "I'm sorry, I couldn't find an answer within the iteration limit.",
+                "trace": trace
+            }
+        contents.append(self._turn("user", self.continue_prompt))
+        return None
+
+    async def _arun_tool(self, tool_name: str, tool_args: Any) -> Any:
+        if tool_name not in self.tools:
+            return f"Unknown tool: {tool_name}"
+        logger.info(f"Calling tool: {tool_name} with args: {tool_args}")
+        try:
+            # 文本模式下参数是字符串；函数调用模式下多参数工具以关键字参数传入
+            if isinstance(tool_args, dict):
+                return await self.tools[tool_name].arun(**tool_args)
+            return await self.tools[tool_name].arun(tool_args)
+        except Exception as e:
+            return f"Error executing tool: {e}"
+
+    async def _arun_tools(self, actions: List[tuple[str, str]]) -> List[Any]:
+        """
+        并行执行本步的全部 Action，结果按原顺序返回。
+        """
+        return list(await asyncio.gather(*(self._arun_tool(*action) for action in actions)))
+
+    def _max_iterations_result(self, trace: List[Dict[str, Any]]) -> Dict[str, Any]:
         return {
             "answer": "Reached max iterations without a final answer.",
             "trace": trace
         }
 
-    async def aquery(self, user_input: str):
-        prompt = self.system_prompt.format(user_input=user_input)
-        full_history = prompt
+    async def _aprefix_config(self, blocking: bool) -> Dict[str, Any]:
+        if blocking:
+            return self.context_cache.config_for(self.model_name, self.system_prompt)
+        return await self.context_cache.aconfig_for(self.model_name, self.system_prompt)
+
+    async def _agenerate_step(self, contents: List[types.Content], prefix_config: Dict[str, Any],
+                              blocking: bool, stream: bool) -> AsyncIterator[Dict[str, Any]]:
+        """
+        生成一步输出：流式时逐段产出 token 事件并在 Action 行完整后停止生成；
+        最后产出 {"type": "step", "text": ..., "usage": ...} (仅供 apipeline 内部使用)。
+        """
+        kwargs = {
+            "model": self.model_name,
+            "contents": list(contents),
+            "config": self._generation_config(prefix_config),
+        }
+        if not stream:
+            if blocking:
+                response = self.llm_client.generate_content(**kwargs)
+            else:
+                response = await self.llm_client.agenerate_content(**kwargs)
+            raw_text = response.text
+            generated_text = self._truncate_at_action(raw_text)
+            self._record_step(raw_text, generated_text, response)
+            yield {"type": "step", "text": generated_text, "usage": self._input_usage(contents, prefix_config, response)}
+            return
+
+        generated_text = ""
+        raw_text = ""
+        stream_iter = self.llm_client.astream_content(**kwargs)
+        try:
+            async for chunk in stream_iter:
+                text = generated_text + chunk
+                raw_text = text
+                cut = self._find_action_end(text)
+                if cut is not None:
+                    # Action 行已完整：丢弃其后的内容 (通常是模型臆造的 Observation)
+                    if cut > len(generated_text):
+                        yield {"type": "token", "text": text[len(generated_text):cut]}
+                    generated_text = text[:cut]
+                    break
+                generated_text = text
+                yield {"type": "token", "text": chunk}
+        finally:
+            await stream_iter.aclose()
+        self._record_step(raw_text, generated_text)
+        yield {"type": "step", "text": generated_text, "usage": self._input_usage(contents, prefix_config)}
+
+    async def apipeline(self, user_input: str, blocking: bool = False, stream: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        ReAct 循环的唯一实现，query / aquery / astream_query 都由它驱动，依次产出事件:
+        - {"type": "token", "text": ...}: 模型输出的文本片段 (仅 stream=True)
+        - {"type": "action", "tool": ..., "args": ...}: 本步每个 Action 一个事件
+        - {"type": "observation", "tool": ..., "text": ...}: 工具返回结果 (本步的 Action 并行执行，按原顺序产出)
+        - {"type": "final", "answer": ..., "trace": [...]}: 最后一个事件
+
+        blocking=True 时使用同步的 SDK 调用 (供在私有事件循环中运行的同步封装使用)。
+        """
+        contents = self._initial_contents(user_input)
+        prefix_config = await self._aprefix_config(blocking)
         trace = []
 
         for i in range(self.max_iterations):
-            logger.info(f"Async Iteration {i+1}/{self.max_iterations}")
-
-            response = await self.llm_client.agenerate_content(
-                model=self.model_name,
-                contents=full_history,
-            )
+            logger.info(f"Iteration {i+1}/{self.max_iterations}")
 
-            generated_text = response.text
-            logger.debug(f"LLM Output:\n{generated_text}")
-            full_history += generated_text
-
-            # 提取 Thought
-            thought_match = re.search(r"Thought:\s*(.*?)(?=\n(Action|Final Answer)|$)", generated_text, re.DOTALL)
-            thought = thought_match.group(1).strip() if thought_match else ""
-
-            # 检查是否有最终答案
-            if "Final Answer:" in generated_text:
-                answer = generated_text.split("Final Answer:")[-1].strip()
-                trace.append({
-                    "step": i + 1,
-                    "thought": thought,
-                    "action": None,
-                    "observation": None,
-                    "final_answer": answer
-                })
-                return {"answer": answer, "trace": trace}
-
-            # 解析动作
-            action_info = self._parse_action(generated_text)
-            if action_info:
-                tool_name, tool_args = action_info
-                if tool_name in self.tools:
-                    logger.info(f"Calling tool (async): {tool_name} with args: {tool_args}")
-                    try:
-                        observation = await self.tools[tool_name].arun(tool_args)
-                    except Exception as e:
-                        observation = f"Error executing tool: {e}"
+            async for event in self._agenerate_step(contents, prefix_config, blocking, stream):
+                if event["type"] == "step":
+                    generated_text, usage = event["text"], event["usage"]
                 else:
-                    observation = f"Unknown tool: {tool_name}"
-
-                observation_str_for_trace = str(observation)
-                if tool_name == "retrieve":
-                    observation_str_for_trace = re.sub(r"内容:.*?(?=\n\n---\n\n|\Z)", "内容: [Content Omitted]", observation_str_for_trace, flags=re.DOTALL)
-
-                trace.append({
-                    "step": i + 1,
-                    "thought": thought,
-                    "action": (tool_name, tool_args),
-                    "observation": observation_str_for_trace
-                })
-
-                observation_str = f"\nObservation: {observation}\n"
-                logger.debug(f"Tool Output: \nObservation: {observation_str_for_trace}\n")
-                full_history += observation_str
+                    yield event
+            logger.debug(f"LLM Output:\n{generated_text}")
+            contents.append(self._turn("model", generated_text))
+
+            thought = self._extract_thought(generated_text)
+            result = self._final_answer(i + 1, generated_text, thought, usage, trace)
+            if result:
+                yield {"type": "final", **result}
+                return
+
+            actions = self._parse_actions(generated_text)
+            if actions:
+                for tool_name, tool_args in actions:
+                    yield {"type": "action", "tool": tool_name, "args": tool_args}
+                observations = await self._arun_tools(actions)
+                self._observe(i + 1, thought, actions, observations, usage, contents, trace)
+                for (tool_name, _), observation in zip(actions, observations):
+                    yield {"type": "observation", "tool": tool_name, "text": str(observation)}
             else:
-                logger.warning("LLM output did not contain Action or Final Answer")
-
-                trace.append({
-                    "step": i + 1,
-                    "thought": thought,
-                    "action": None,
-                    "observation": "LLM output did not contain Action or Final Answer"
-                })
-
-                if i == self.max_iterations - 1:
-                    return {
-                        "answer": "I'm sorry, I couldn't find an answer within the iteration limit.",
-                        "trace": trace
-                    }
-                full_history += "\nThought: I need to clarify my next step or provide a Final Answer.\n"
+                result = self._no_action(i + 1, thought, usage, contents, trace)
+                if result:
+                    yield {"type": "final", **result}
+                    return
 
-        return {
-            "answer": "Reached max iterations without a final answer.",
-            "trace": trace
-        }
\ No newline at end of file
+        yield {"type": "final", **self._max_iterations_result(trace)}
+
+    async def _acollect(self, user_input: str, blocking: bool = False) -> Dict[str, Any]:
+        async for event in self.apipeline(user_input, blocking=blocking):
+            if event["type"] == "final":
+                return {key: value for key, value in event.items() if key != "type"}
+
+    def query(self, user_input: str):
+        return run_sync(self._acollect(user_input, blocking=True))
+
+    async def aquery(self, user_input: str):
+        return await self._acollect(user_input)
+
+    @staticmethod
+    def _find_action_end(text: str) -> Optional[int]:
+        """
+        返回第一组连续的完整 Action 行的结束位置；其后尚无内容或可能还有 Action 时继续等待，
+        已出现 Final Answer 时不再截断。
+        """
+        if "Final Answer:" in text:
+            return None
+        match = _ACTION_LINE_RE.search(text)
+        if not match:
+            return None
+        end = match.end()
+        while True:
+            rest_start = _WHITESPACE_RE.match(text, end).end()
+            match = _ACTION_LINE_RE.match(text, rest_start)
+            if not match:
+                break
+            end = match.end()
+        rest = text[rest_start:]
+        if not rest or rest.startswith("Action") or "Actions:".startswith(rest):
+            return None
+        return end
+
+    async def astream_query(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式版本的 aquery：产出 apipeline 的全部事件 (包括 token)，一旦出现完整的 Action 行即停止生成并调用工具；
+        最后的 final 事件内容与 aquery 的返回值一致。
+        """
+        async for event in self.apipeline(user_input, stream=True):
+            yield event
+
+class FunctionCallingAgent(ReActAgent):
+    """
+    ReActAgent 的函数调用模式。
+
+    工具以原生函数声明 (BaseTool.function_declaration 的 JSON Schema) 提供给模型，
+    行动直接取自响应中的 function_call 部分，不再依赖 Thought/Action 文本格式与正则解析，
+    系统提示也不再包含工具列表与格式说明。同一轮的多个函数调用并行执行，
+    结果以 function_response 部分回传；不含函数调用的文本回复即为最终答案。
+    trace 与事件格式与 ReActAgent 相同。
+    """
+    continue_prompt = "请调用工具获取所需信息，或直接给出最终答案。"
+
+    def __init__(
+        self,
+        client,
+        tools: List[BaseTool],
+        model_name: str = "gemini-2.0-flash",
+        max_iterations: int = 5,
+        context_cache: Optional[BaseContextCache] = None,
+        system_prompt: Optional[str] = None,
+    ):
+        super().__init__(client, tools, model_name=model_name, max_iterations=max_iterations,
+                         stop_sequences=[], context_cache=context_cache)
+        self.system_prompt = system_prompt or FUNCTION_CALLING_SYSTEM_PROMPT
+        self.tool_declarations = [{"function_declarations": [tool.function_declaration() for tool in tools]}]
+
+    def _initial_contents(self, user_input: str) -> List[types.Content]:
+        return [self._turn("user", user_input)]
+
+    async def _aprefix_config(self, blocking: bool) -> Dict[str, Any]:
+        # 工具声明与系统提示一起作为静态前缀缓存
+        if blocking:
+            return self.context_cache.config_for(self.model_name, self.system_prompt, self.tool_declarations)
+        return await self.context_cache.aconfig_for(self.model_name, self.system_prompt, self.tool_declarations)
+
+    @staticmethod
+    def _response_parts(response: Any) -> List[types.Part]:
+        candidates = getattr(response, "candidates", None)
+        if not candidates or candidates[0].content is None:
+            return []
+        return list(candidates[0].content.parts or [])
+
+    @staticmethod
+    def _parts_text(parts: List[types.Part]) -> str:
+        return "".join(part.text for part in parts if part.text and not part.thought)
+
+    def _record_response(self, parts: List[types.Part], response: Any = None):
+        stats = self.stop_stats
+        stats["steps"] += 1
+        if any(part.function_call for part in parts):
+            stats["action_stops"] += 1
+        usage = getattr(response, "usage_metadata", None)
+        output_tokens = getattr(usage, "candidates_token_count", None)
+        if isinstance(output_tokens, int):
+            stats["output_tokens"] += output_tokens
+
+    def _to_action(self, call: types.FunctionCall) -> tuple[str, Any]:
+        """
+        单参数工具：参数值作为字符串传入；多参数工具：参数字典按关键字参数传入。
+        """
+        args = dict(call.args or {})
+        tool = self.tools.get(call.name)
+        properties = list(tool.parameters.get("properties", {})) if tool else []
+        if len(properties) != 1:
+            return call.name, args
+        value = args.get(properties[0], next(iter(args.values()), ""))
+        return call.name, value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+    async def _agenerate_step(self, contents: List[types.Content], prefix_config: Dict[str, Any],
+                              blocking: bool, stream: bool) -> AsyncIterator[Dict[str, Any]]:
+        """
+        生成一步输出，最后产出 {"type": "step", "content": 模型轮次, "usage": ...}；
+        流式时文本部分以 token 事件逐段产出，函数调用部分随流累积。
+        """
+        kwargs = {"model": self.model_name, "contents": list(contents), "config": dict(prefix_config)}
+        if not stream:
+            if blocking:
+                response = self.llm_client.generate_content(**kwargs)
+            else:
+                response = await self.llm_client.agenerate_content(**kwargs)
+            parts = self._response_parts(response)
+        else:
+            parts = []
+            response = None
+            responses = self.llm_client.astream_responses(**kwargs)
+            try:
+                async for chunk in responses:
+                    response = chunk
+                    for part in self._response_parts(chunk):
+                        if part.text and not part.thought:
+                            yield {"type": "token", "text": part.text}
+                        parts.append(part)
+            finally:
+                await responses.aclose()
+        self._record_response(parts, response)
+        yield {
+            "type": "step",
+            "content": types.Content(role="model", parts=parts),
+            "usage": self._input_usage(contents, prefix_config, response),
+        }
+
+    async def apipeline(self, user_input: str, blocking: bool = False, stream: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        函数调用版的循环，事件格式与 ReActAgent.apipeline 相同。
+        """
+        contents = self._initial_contents(user_input)
+        prefix_config = await self._aprefix_config(blocking)
+        trace = []
+
+        for i in range(self.max_iterations):
+            logger.info(f"Iteration {i+1}/{self.max_iterations}")
+
+            async for event in self._agenerate_step(contents, prefix_config, blocking, stream):
+                if event["type"] == "step":
+                    content, usage = event["content"], event["usage"]
+                else:
+                    yield event
+            text = self._parts_text(content.parts).strip()
+            calls = [part.function_call for part in content.parts if part.function_call]
+
+            if not calls:
+                if text:
+                    yield {"type": "final", **self._finish(i + 1, text, "", usage, trace)}
+                    return
+                # 保留空的模型轮次，使历史保持 user/model 交替 (没有 parts 时补一个空文本)
+                contents.append(content if content.parts else self._turn("model", ""))
+                result = self._no_action(i + 1, "", usage, contents, trace)
+                if result:
+                    yield {"type": "final", **result}
+                    return
+                continue
+
+            # 原样保留模型轮次 (包括 thought_signature 等字段)
+            contents.append(content)
+            actions = [self._to_action(call) for call in calls]
+            for tool_name, tool_args in actions:
+                yield {"type": "action", "tool": tool_name, "args": tool_args}
+            observations = await self._arun_tools(actions)
+            self._record_observations(i + 1, text, actions, observations, usage, trace)
+            contents.append(types.Content(role="user", parts=[
+                types.Part(function_response=types.FunctionResponse(id=call.id, name=call.name, response={"result": str(observation)}))
+                for call, observation in zip(calls, observations)
+            ]))
+            for (tool_name, _), observation in zip(actions, observations):
+                yield {"type": "observation", "tool": tool_name, "text": str(observation)}
+
+        yield {"type": "final", **self._max_iterations_result(trace)}
@@ -0,0 +1,213 @@
+"""
+LLM 响应缓存 - 按 (模型, contents, config) 缓存 generate_content 的结果
+
+两级存储：
+- 内存 LRU 层，按条目数淘汰
+- 可选的 SQLite 持久层，按总字节数淘汰最久未访问的条目，可跨进程/跨运行复用
+两层都支持 TTL；过期条目视为未命中。
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from google.genai import types
+
+_default_cache: Optional["ResponseCache"] = None
+
+
+def _to_jsonable(value: Any) -> Any:
+    """Convert SDK objects (pydantic models), dicts and lists into a stable JSON form."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def make_cache_key(model: str, contents: Any, config: Dict[str, Any]) -> str:
+    """sha256 over the canonical JSON form of a request."""
+    payload = json.dumps(
+        {"model": model, "contents": _to_jsonable(contents), "config": _to_jsonable(config)},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Response cache with an in-memory LRU tier and an optional SQLite tier.
+    Pass cache_dir=None for a memory-only cache. Thread-safe; hit/miss
+    counters are exposed via stats().
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = ".llm_cache",
+        max_memory_items: int = 1000,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        ttl: Optional[float] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+
+        self._memory: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.db_path = os.path.join(cache_dir, "responses.sqlite3")
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._conn.commit()
+            self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key: str, response: Any, created_at: float):
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _delete_disk(self, key: str):
+        row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._disk_bytes -= row[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response, or None on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return response
+                del self._memory[key]
+                self.expired += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    text, created_at = row
+                    if self._is_expired(created_at, now):
+                        self._delete_disk(key)
+                        self._conn.commit()
+                        self.expired += 1
+                    else:
+                        response = types.GenerateContentResponse.model_validate_json(text)
+                        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        self._remember(key, response, created_at)
+                        self.disk_hits += 1
+                        return response
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: Any):
+        """Store a response. Only SDK (pydantic) responses are written to disk."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._conn is None or not hasattr(response, "model_dump_json"):
+                return
+
+            text = response.model_dump_json(exclude_none=True)
+            size = len(text.encode("utf-8"))
+            if size > self.max_disk_bytes:
+                return
+            self._delete_disk(key)
+            self._conn.execute(
+                "INSERT INTO responses (key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, text, size, now, now),
+            )
+            self._disk_bytes += size
+            self._evict_disk()
+            self._conn.commit()
+
+    def _evict_disk(self):
+        """Drop least recently accessed rows until the disk tier fits max_disk_bytes."""
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at, rowid LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                return
+            for key, size in rows:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._disk_bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and hit rate."""
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_items": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+                self._disk_bytes = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def set_default_response_cache(cache: Optional[ResponseCache]):
+    """
+    Set the cache used by every LLMClient created without an explicit cache
+    (QueryRewriter, QueryDecomposer, metric judges, RAG pipelines...). None disables it.
+    """
+    global _default_cache
+    _default_cache = cache
+
+
+def get_default_response_cache() -> Optional[ResponseCache]:
+    return _default_cache
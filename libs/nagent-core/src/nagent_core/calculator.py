@@ -0,0 +1,180 @@
+"""
+安全计算器 - CalculatorTool 使用的表达式求值器
+
+- 解析：ast.parse 后只接受白名单节点 (数字、+ - * / // % **、常用数学函数与常量)，
+  并编译为嵌套闭包；编译结果按表达式文本做 LRU 缓存，重复表达式不再解析
+- 限制：整数结果位数上限 (在计算前估算，防止 9**9**9 之类的表达式耗尽 CPU/内存)、
+  单个表达式的时间上限、表达式长度上限
+- 批量：evaluate_many 一次计算多个表达式，每个表达式单独返回结果或错误
+"""
+import ast
+import functools
+import math
+import operator
+import time
+from typing import Any, Callable, List, Sequence, Union
+
+Number = Union[int, float]
+
+DEFAULT_MAX_INT_BITS = 10000
+DEFAULT_TIMEOUT = 1.0
+MAX_EXPRESSION_LENGTH = 1000
+
+
+class CalculatorError(ValueError):
+    pass
+
+
+class _Limits:
+    __slots__ = ("max_int_bits", "deadline")
+
+    def __init__(self, max_int_bits: int, timeout: float):
+        self.max_int_bits = max_int_bits
+        self.deadline = time.monotonic() + timeout
+
+    def check_time(self):
+        if time.monotonic() > self.deadline:
+            raise CalculatorError("超过计算时间限制")
+
+    def check_bits(self, bits: float):
+        if bits > self.max_int_bits:
+            raise CalculatorError(f"结果过大 (超过 {self.max_int_bits} 位整数)")
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int)
+
+
+def _mul(a: Number, b: Number, limits: _Limits) -> Number:
+    if _is_int(a) and _is_int(b):
+        limits.check_bits(a.bit_length() + b.bit_length())
+    return a * b
+
+
+def _pow(a: Number, b: Number, limits: _Limits) -> Number:
+    if _is_int(a) and _is_int(b) and b > 0 and abs(a) > 1:
+        limits.check_bits(b * math.log2(abs(a)))
+    return a ** b
+
+
+def _factorial(n: Number, limits: _Limits) -> int:
+    if _is_int(n) and n > 1:
+        limits.check_bits(math.lgamma(n + 1) / math.log(2))
+    return math.factorial(n)
+
+
+_BINARY_OPS = {
+    ast.Add: lambda a, b, limits: a + b,
+    ast.Sub: lambda a, b, limits: a - b,
+    ast.Mult: _mul,
+    ast.Div: lambda a, b, limits: a / b,
+    ast.FloorDiv: lambda a, b, limits: a // b,
+    ast.Mod: lambda a, b, limits: a % b,
+    ast.Pow: _pow,
+}
+
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+_CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf}
+
+# 需要 limits 的函数单独包装，其余直接调用
+_FUNCTIONS: dict = {
+    name: getattr(math, name)
+    for name in (
+        "sqrt", "exp", "log", "log2", "log10", "sin", "cos", "tan", "asin", "acos", "atan", "atan2",
+        "sinh", "cosh", "tanh", "hypot", "floor", "ceil", "gcd", "degrees", "radians",
+    )
+}
+_FUNCTIONS.update({"abs": abs, "round": round, "min": min, "max": max})
+_LIMITED_FUNCTIONS = {"factorial": _factorial}
+
+Compiled = Callable[[_Limits], Number]
+
+
+def _compile(node: ast.AST) -> Compiled:
+    if isinstance(node, ast.Expression):
+        return _compile(node.body)
+    if isinstance(node, ast.Constant):
+        # bool 是 int 的子类，这里按类型精确匹配
+        if type(node.value) not in (int, float):
+            raise CalculatorError(f"不支持的常量: {node.value!r}")
+        value = node.value
+        return lambda limits: value
+    if isinstance(node, ast.Name):
+        if node.id not in _CONSTANTS:
+            raise CalculatorError(f"未知名称: {node.id}")
+        value = _CONSTANTS[node.id]
+        return lambda limits: value
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        op, operand = _UNARY_OPS[type(node.op)], _compile(node.operand)
+        return lambda limits: op(operand(limits))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op, left, right = _BINARY_OPS[type(node.op)], _compile(node.left), _compile(node.right)
+
+        def binary(limits: _Limits) -> Number:
+            a, b = left(limits), right(limits)
+            limits.check_time()
+            result = op(a, b, limits)
+            if isinstance(result, complex):
+                raise CalculatorError("结果不是实数")
+            return result
+
+        return binary
+    if isinstance(node, ast.Call):
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name not in _FUNCTIONS and name not in _LIMITED_FUNCTIONS:
+            raise CalculatorError(f"不支持的函数: {name or ast.unparse(node.func)}")
+        if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise CalculatorError(f"函数 {name} 只接受位置参数")
+        args = [_compile(arg) for arg in node.args]
+        if name in _LIMITED_FUNCTIONS:
+            limited = _LIMITED_FUNCTIONS[name]
+
+            def call_limited(limits: _Limits) -> Number:
+                values = [arg(limits) for arg in args]
+                limits.check_time()
+                return limited(*values, limits)
+
+            return call_limited
+        func = _FUNCTIONS[name]
+
+        def call(limits: _Limits) -> Number:
+            values = [arg(limits) for arg in args]
+            limits.check_time()
+            return func(*values)
+
+        return call
+    raise CalculatorError(f"不支持的语法: {type(node).__name__}")
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> Compiled:
+    """Parse and validate an expression once; the compiled closure is cached by expression text."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalculatorError(f"表达式过长 (超过 {MAX_EXPRESSION_LENGTH} 个字符)")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except (SyntaxError, RecursionError, MemoryError) as e:
+        raise CalculatorError(f"表达式语法错误: {expression}") from e
+    return _compile(tree)
+
+
+def evaluate(expression: str, max_int_bits: int = DEFAULT_MAX_INT_BITS, timeout: float = DEFAULT_TIMEOUT) -> Number:
+    """Evaluate one expression; raises CalculatorError (or the arithmetic error) on failure."""
+    return compile_expression(expression)(_Limits(max_int_bits, timeout))
+
+
+def evaluate_many(
+    expressions: Sequence[str], max_int_bits: int = DEFAULT_MAX_INT_BITS, timeout: float = DEFAULT_TIMEOUT
+) -> List[Union[Number, Exception]]:
+    """Evaluate a batch of expressions; each entry is the result or the exception it raised."""
+    results: List[Union[Number, Exception]] = []
+    for expression in expressions:
+        try:
+            results.append(evaluate(expression, max_int_bits, timeout))
+        except Exception as e:
+            results.append(e)
+    return results
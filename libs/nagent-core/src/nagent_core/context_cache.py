@@ -0,0 +1,190 @@
+"""
+上下文缓存 - 为静态 Prompt 前缀 (系统提示 + 工具描述) 复用服务端缓存
+
+- ContextCache: 使用 Gemini 显式上下文缓存 (client.caches，按存储时长计费，需显式传入)，
+  每个 (模型, 前缀) 只创建一次 (并发请求等待同一次创建)，过期前复用；
+  前缀过短或创建失败时退化为 system_instruction
+- LocalContextCache: 本地替身，不调用任何 API，行为与退化路径一致；Agent 的默认值
+函数调用模式下工具声明 (tools) 也属于静态前缀：Gemini 要求它与 cached_content 一起放进缓存。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from .rate_limit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 缓存快过期时提前重建，避免请求途中失效
+_EXPIRY_MARGIN_SECONDS = 60
+
+
+def _tools_text(tools: Optional[List[Any]]) -> str:
+    return json.dumps(tools, sort_keys=True, ensure_ascii=False, default=str) if tools else ""
+
+
+def _prefix_key(model: str, prefix: str, tools: Optional[List[Any]] = None) -> Tuple[str, str]:
+    return model, hashlib.sha256((prefix + _tools_text(tools)).encode("utf-8")).hexdigest()
+
+
+def _uncached_config(prefix: str, tools: Optional[List[Any]]) -> Dict[str, Any]:
+    config: Dict[str, Any] = {"system_instruction": prefix}
+    if tools:
+        config["tools"] = tools
+    return config
+
+
+class BaseContextCache:
+    """
+    Maps a static prompt prefix (and optional tool declarations) to the
+    generation config that supplies it: {"cached_content": name} when the
+    provider caches it, otherwise {"system_instruction": prefix, "tools": tools}.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.hits = 0
+        self.fallbacks = 0
+
+    def config_for(self, model: str, prefix: str, tools: Optional[List[Any]] = None) -> Dict[str, Any]:
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    async def aconfig_for(self, model: str, prefix: str, tools: Optional[List[Any]] = None) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.config_for, model, prefix, tools)
+
+    def stats(self) -> Dict[str, int]:
+        return {"created": self.created, "hits": self.hits, "fallbacks": self.fallbacks}
+
+
+class LocalContextCache(BaseContextCache):
+    """
+    Local stand-in for provider context caching: remembers prefixes and
+    counts creations/hits, but always sends the prefix as system_instruction.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.prefixes: Dict[Tuple[str, str], str] = {}
+
+    def config_for(self, model: str, prefix: str, tools: Optional[List[Any]] = None) -> Dict[str, Any]:
+        key = _prefix_key(model, prefix, tools)
+        with self._lock:
+            if key in self.prefixes:
+                self.hits += 1
+            else:
+                self.prefixes[key] = prefix
+                self.created += 1
+        return _uncached_config(prefix, tools)
+
+    async def aconfig_for(self, model: str, prefix: str, tools: Optional[List[Any]] = None) -> Dict[str, Any]:
+        return self.config_for(model, prefix, tools)
+
+
+class ContextCache(BaseContextCache):
+    """
+    Gemini explicit context caching for a static prefix.
+    Prefixes estimated below `min_tokens` (the provider's minimum cacheable
+    size) are not cached, and a failed creation is not retried for that prefix.
+    """
+
+    def __init__(self, client, ttl_seconds: int = 3600, min_tokens: int = 1024):
+        super().__init__()
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        # (model, prefix hash) -> (cache name, expires_at)，创建失败时为 None
+        self._entries: Dict[Tuple[str, str], Optional[Tuple[str, float]]] = {}
+        # 正在创建的 key -> 创建完成时 set 的事件
+        self._pending: Dict[Tuple[str, str], threading.Event] = {}
+
+    def _cached(self, key: Tuple[str, str], prefix: str, tools: Optional[List[Any]]) -> Optional[Dict[str, Any]]:
+        """Return the config for a live or known-uncacheable prefix, or None if a cache must be created."""
+        with self._lock:
+            if key in self._entries and self._entries[key] is None:
+                self.fallbacks += 1
+                return _uncached_config(prefix, tools)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] - _EXPIRY_MARGIN_SECONDS > time.time():
+                self.hits += 1
+                return {"cached_content": entry[0]}
+            if estimate_tokens(prefix + _tools_text(tools)) < self.min_tokens:
+                self._entries[key] = None
+                self.fallbacks += 1
+                return _uncached_config(prefix, tools)
+        return None
+
+    def _claim(self, key: Tuple[str, str]) -> Optional[threading.Event]:
+        """Become the creator for key (returns None), or get the event of the creation already in flight."""
+        with self._lock:
+            event = self._pending.get(key)
+            if event is None:
+                self._pending[key] = threading.Event()
+            return event
+
+    def _release(self, key: Tuple[str, str]):
+        with self._lock:
+            self._pending.pop(key).set()
+
+    def _create_config(self, prefix: str, tools: Optional[List[Any]]) -> Dict[str, Any]:
+        return {
+            **_uncached_config(prefix, tools),
+            "ttl": f"{self.ttl_seconds}s",
+            "display_name": "nagent-prompt-prefix",
+        }
+
+    def _remember(self, key: Tuple[str, str], prefix: str, tools: Optional[List[Any]], cache: Any = None, error: Optional[Exception] = None) -> Dict[str, Any]:
+        with self._lock:
+            if error is not None:
+                logger.warning(f"Context cache creation failed, sending prefix as system_instruction: {error}")
+                self._entries[key] = None
+                self.fallbacks += 1
+                return _uncached_config(prefix, tools)
+            self._entries[key] = (cache.name, time.time() + self.ttl_seconds)
+            self.created += 1
+            return {"cached_content": cache.name}
+
+    def config_for(self, model: str, prefix: str, tools: Optional[List[Any]] = None) -> Dict[str, Any]:
+        key = _prefix_key(model, prefix, tools)
+        while True:
+            config = self._cached(key, prefix, tools)
+            if config is not None:
+                return config
+            event = self._claim(key)
+            if event is None:
+                break
+            event.wait()
+        try:
+            cache = self.client.caches.create(model=model, config=self._create_config(prefix, tools))
+        except Exception as e:
+            config = self._remember(key, prefix, tools, error=e)
+        else:
+            config = self._remember(key, prefix, tools, cache=cache)
+        finally:
+            # 记录结果后再唤醒等待者
+            self._release(key)
+        return config
+
+    async def aconfig_for(self, model: str, prefix: str, tools: Optional[List[Any]] = None) -> Dict[str, Any]:
+        key = _prefix_key(model, prefix, tools)
+        while True:
+            config = self._cached(key, prefix, tools)
+            if config is not None:
+                return config
+            event = self._claim(key)
+            if event is None:
+                break
+            await asyncio.to_thread(event.wait)
+        try:
+            cache = await self.client.aio.caches.create(model=model, config=self._create_config(prefix, tools))
+        except Exception as e:
+            config = self._remember(key, prefix, tools, error=e)
+        else:
+            config = self._remember(key, prefix, tools, cache=cache)
+        finally:
+            # 记录结果后再唤醒等待者
+            self._release(key)
+        return config
@@ -1,5 +1,8 @@
 import logging
+from typing import Any, AsyncIterator, Optional
 import tenacity
+from .cache import ResponseCache, get_default_response_cache, make_cache_key
+from .rate_limit import RateLimiter, estimate_tokens, get_rate_limiter
 from .utils import is_retryable_error
 
 logger = logging.getLogger(__name__)
@@ -9,15 +12,70 @@ class LLMClient:
     A unified LLM client wrapper that provides a retry mechanism for all LLM API requests.
     This enhances the system's robustness against network fluctuations, rate limits (429),
     and temporary service unavailability (503).
+
+    With a ResponseCache (explicit, or the process default set via
+    set_default_response_cache), identical (model, contents, config) requests
+    are answered from the cache; pass use_cache=False to bypass it per call.
+
+    Each API attempt goes through the model's RateLimiter (explicit, or the one
+    shared per model via configure_rate_limits), so concurrent callers wait for
+    RPM/TPM budget and in-flight slots instead of running into 429s.
     """
-    def __init__(self, client):
+    def __init__(self, client, cache: Optional[ResponseCache] = None, rate_limiter: Optional[RateLimiter] = None):
         """
         Initialize the LLMClient with the underlying google.genai Client.
 
         Args:
             client: The google.genai Client instance.
+            cache: Optional response cache; defaults to the process-wide default cache.
+            rate_limiter: Optional limiter; defaults to the limiter shared per model.
         """
         self.client = client
+        self._cache = cache
+        self._rate_limiter = rate_limiter
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        return self._cache if self._cache is not None else get_default_response_cache()
+
+    def _limiter(self, model: str) -> Optional[RateLimiter]:
+        return self._rate_limiter if self._rate_limiter is not None else get_rate_limiter(model)
+
+    def _lookup(self, model: str, contents: Any, kwargs: dict, use_cache: bool):
+        """Return (cache, key, cached_response); cache and key are None when caching is off."""
+        cache = self.cache
+        if not use_cache or cache is None:
+            return None, None, None
+        key = make_cache_key(model, contents, kwargs)
+        return cache, key, cache.get(key)
+
+    @staticmethod
+    def _store(cache: Optional[ResponseCache], key: Optional[str], response: Any):
+        # Responses without candidates (blocked, empty) are not worth replaying
+        if cache is not None and getattr(response, "candidates", None):
+            cache.put(key, response)
+
+    def generate_content(self, model: str, contents: Any, use_cache: bool = True, **kwargs):
+        """
+        Synchronously generate content, served from the response cache when possible.
+        """
+        cache, key, cached = self._lookup(model, contents, kwargs, use_cache)
+        if cached is not None:
+            return cached
+        response = self._generate_content(model=model, contents=contents, **kwargs)
+        self._store(cache, key, response)
+        return response
+
+    async def agenerate_content(self, model: str, contents: Any, use_cache: bool = True, **kwargs):
+        """
+        Asynchronously generate content, served from the response cache when possible.
+        """
+        cache, key, cached = self._lookup(model, contents, kwargs, use_cache)
+        if cached is not None:
+            return cached
+        response = await self._agenerate_content(model=model, contents=contents, **kwargs)
+        self._store(cache, key, response)
+        return response
 
     @tenacity.retry(
         wait=tenacity.wait_exponential(multiplier=1, min=2, max=30),
@@ -26,15 +84,23 @@ class LLMClient:
         before_sleep=tenacity.before_sleep_log(logger, logging.INFO),
         reraise=True,
     )
-    def generate_content(self, model: str, contents: str, **kwargs):
+    def _generate_content(self, model: str, contents: Any, **kwargs):
         """
         Synchronously generate content with retry mechanism.
         """
-        return self.client.models.generate_content(
-            model=model,
-            contents=contents,
-            **kwargs
-        )
+        limiter = self._limiter(model)
+        if limiter is None:
+            return self.client.models.generate_content(model=model, contents=contents, **kwargs)
+
+        estimate = estimate_tokens(contents, kwargs.get("config"))
+        limiter.acquire(estimate)
+        try:
+            response = self.client.models.generate_content(model=model, contents=contents, **kwargs)
+        except Exception as e:
+            limiter.release(estimate, error=e)
+            raise
+        limiter.release(estimate, response=response)
+        return response
 
     @tenacity.retry(
         wait=tenacity.wait_exponential(multiplier=1, min=2, max=30),
@@ -43,12 +109,86 @@ class LLMClient:
         before_sleep=tenacity.before_sleep_log(logger, logging.INFO),
         reraise=True,
     )
-    async def agenerate_content(self, model: str, contents: str, **kwargs):
+    async def _agenerate_content(self, model: str, contents: Any, **kwargs):
         """
         Asynchronously generate content with retry mechanism.
         """
-        return await self.client.aio.models.generate_content(
-            model=model,
-            contents=contents,
-            **kwargs
-        )
+        limiter = self._limiter(model)
+        if limiter is None:
+            return await self.client.aio.models.generate_content(model=model, contents=contents, **kwargs)
+
+        estimate = estimate_tokens(contents, kwargs.get("config"))
+        await limiter.aacquire(estimate)
+        try:
+            response = await self.client.aio.models.generate_content(model=model, contents=contents, **kwargs)
+        except BaseException as e:
+            limiter.release(estimate, error=e if isinstance(e, Exception) else None)
+            raise
+        limiter.release(estimate, response=response)
+        return response
+
+    @tenacity.retry(
+        wait=tenacity.wait_exponential(multiplier=1, min=2, max=30),
+        stop=tenacity.stop_after_attempt(5),
+        retry=tenacity.retry_if_exception(is_retryable_error),
+        before_sleep=tenacity.before_sleep_log(logger, logging.INFO),
+        reraise=True,
+    )
+    async def _aopen_stream(self, limiter: Optional[RateLimiter], estimate: int, model: str, contents: Any, **kwargs):
+        """
+        Open a streaming request with retry mechanism (only the request itself is retried, not a partial stream).
+        Like the non-stream path, every attempt goes through the limiter; after a
+        successful open the slot stays held until the caller releases it.
+        """
+        if limiter is None:
+            return await self.client.aio.models.generate_content_stream(model=model, contents=contents, **kwargs)
+
+        await limiter.aacquire(estimate)
+        try:
+            return await self.client.aio.models.generate_content_stream(model=model, contents=contents, **kwargs)
+        except BaseException as e:
+            limiter.release(estimate, error=e if isinstance(e, Exception) else None)
+            raise
+
+    async def astream_content(self, model: str, contents: Any, **kwargs) -> AsyncIterator[str]:
+        """
+        Asynchronously stream generated text chunks as they arrive.
+        The consumer may stop early: closing this generator (aclose) closes the
+        underlying stream so no further tokens are generated. Streams bypass the
+        response cache but go through the rate limiter.
+        """
+        responses = self.astream_responses(model=model, contents=contents, **kwargs)
+        try:
+            async for chunk in responses:
+                text = getattr(chunk, "text", None)
+                if text:
+                    yield text
+        finally:
+            await responses.aclose()
+
+    async def astream_responses(self, model: str, contents: Any, **kwargs) -> AsyncIterator[Any]:
+        """
+        Like astream_content, but yields the raw response chunks (needed for
+        function-call parts and per-chunk usage metadata).
+        """
+        limiter = self._limiter(model)
+        estimate = estimate_tokens(contents, kwargs.get("config"))
+        stream = await self._aopen_stream(limiter, estimate, model=model, contents=contents, **kwargs)
+
+        last_chunk = None
+        error = None
+        try:
+            async for chunk in stream:
+                last_chunk = chunk
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            try:
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            finally:
+                if limiter is not None:
+                    limiter.release(estimate, response=last_chunk, error=error)
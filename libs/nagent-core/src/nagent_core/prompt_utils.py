@@ -1,4 +1,4 @@
-REACT_PROMPT_TEMPLATE = """你是一个智能助手。你可以通过一系列的思考 (Thought)、行动 (Action) 和观察 (Observation) 来回答问题。
+REACT_SYSTEM_PROMPT_TEMPLATE = """你是一个智能助手。你可以通过一系列的思考 (Thought)、行动 (Action) 和观察 (Observation) 来回答问题。
 
 **严重警告：禁止直接回答任何问题。在给出任何最终答案（Final Answer）之前，你必须首先使用 retrieve 工具检索资料！不准依赖你的内部知识库！**
 
@@ -10,13 +10,26 @@ Question: 需要回答的问题
 Thought: 你应该思考目前该做什么
 Action: 采取的行动，必须是工具列表中的一个。格式为: tool_name(args)
 Observation: 行动的结果
+(如果需要多个互不依赖的行动，可以连续写多行 Action，每行一个，或写成 Actions: [{{"tool": "tool_name", "args": "args"}}, ...]；它们会被并行执行，结果按序号合并在同一个 Observation 中)
 ... (这个 Thought/Action/Observation 过程可以重复多次)
 Thought: 我现在知道最终答案了
 Final Answer: 对原始问题的最终回答
 
 开始!
+"""
+
+# 每次对话的首个 user 轮次；静态的系统提示部分可被上下文缓存复用
+REACT_QUESTION_TEMPLATE = """Question: {user_input}
+"""
+
+REACT_PROMPT_TEMPLATE = REACT_SYSTEM_PROMPT_TEMPLATE + "\n" + REACT_QUESTION_TEMPLATE
+
+# 函数调用模式：工具以函数声明提供，不需要工具列表与 Thought/Action 格式说明
+FUNCTION_CALLING_SYSTEM_PROMPT = """你是一个智能助手。你可以调用提供的工具获取信息来回答问题。
+
+**严重警告：禁止直接回答任何问题。在给出最终答案之前，你必须首先调用检索工具检索资料！不准依赖你的内部知识库！**
 
-Question: {user_input}
+多个互不依赖的工具调用可以在同一轮中同时发出。信息足够时，不再调用工具，直接给出对原始问题的最终回答。
 """
 
 def format_tools_description(tools):
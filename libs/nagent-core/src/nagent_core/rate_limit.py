@@ -0,0 +1,267 @@
+"""
+客户端限流 - 按模型共享的 RPM/TPM 令牌桶与并发上限
+
+- 令牌桶：请求前预留 (预估) token，响应后按 usage_metadata 校正
+- 并发闸门：同步线程与 asyncio 协程共用同一个 in-flight 计数，FIFO 交接
+- 自适应退避：收到 429 后整个模型进入冷却期 (优先使用服务端返回的 retryDelay)，
+  冷却时间随连续 429 指数增长，成功后逐步回落
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from .utils import is_rate_limit_error
+
+_registry_lock = threading.Lock()
+_limiters: Dict[str, "RateLimiter"] = {}
+_limits: Dict[str, Dict[str, Any]] = {}
+
+_RETRY_DELAY_PATTERNS = [
+    re.compile(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s"),
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+]
+
+
+def estimate_tokens(contents: Any, config: Any = None) -> int:
+    """Rough token estimate (~4 characters per token) plus the requested output budget."""
+    if isinstance(contents, str):
+        text = contents
+    else:
+        text = json.dumps(contents, ensure_ascii=False, default=str)
+    estimate = len(text) // 4 + 1
+    if isinstance(config, dict):
+        estimate += int(config.get("max_output_tokens") or 0)
+    else:
+        estimate += int(getattr(config, "max_output_tokens", None) or 0)
+    return estimate
+
+
+def parse_retry_delay(exception: Exception) -> Optional[float]:
+    """Extract the server-suggested retry delay (seconds) from a 429 error, if any."""
+    msg = str(exception)
+    for pattern in _RETRY_DELAY_PATTERNS:
+        match = pattern.search(msg)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` tokens per minute.
+    reserve() always succeeds and returns how long the caller must wait, so
+    concurrent callers are queued in arrival order instead of polling.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens (capped at capacity) and return the wait in seconds."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= min(amount, self.capacity)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def adjust(self, delta: float):
+        """Consume (delta > 0) or refund (delta < 0) tokens after the fact."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - delta)
+
+
+class _InFlightGate:
+    """Concurrency limit usable from both threads and event loops (FIFO hand-over)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+        self._waiters: deque = deque()
+
+    def acquire(self):
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    # The slot was already handed over; _hand_over releases it
+                    pass
+            raise
+
+    def _hand_over(self, future: asyncio.Future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                # The slot passes directly to the next waiter; `active` is unchanged
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                else:
+                    loop, future = waiter
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                return
+            self.active -= 1
+
+
+class RateLimiter:
+    """
+    Requests-per-minute / tokens-per-minute limiter with a max-in-flight cap.
+    Every limit is optional. Use acquire()/aacquire() before a request and
+    release() after it, passing the response or the exception.
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        min_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self._requests = TokenBucket(rpm) if rpm else None
+        self._tokens = TokenBucket(tpm) if tpm else None
+        self._gate = _InFlightGate(max_in_flight) if max_in_flight else None
+
+        self._lock = threading.Lock()
+        self._cooldown_until = 0.0
+        self._backoff = min_backoff
+        self.rate_limited = 0
+        self.waited_seconds = 0.0
+
+    def _delay(self, estimated_tokens: int) -> float:
+        with self._lock:
+            delay = max(0.0, self._cooldown_until - time.monotonic())
+        if self._requests is not None:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.reserve(estimated_tokens))
+        return delay
+
+    def acquire(self, estimated_tokens: int = 0):
+        """Block until the request may be sent."""
+        delay = self._delay(estimated_tokens)
+        if delay > 0:
+            self.waited_seconds += delay
+            time.sleep(delay)
+        if self._gate is not None:
+            self._gate.acquire()
+
+    async def aacquire(self, estimated_tokens: int = 0):
+        """Async variant of acquire(); waits without blocking the event loop."""
+        delay = self._delay(estimated_tokens)
+        if delay > 0:
+            self.waited_seconds += delay
+            await asyncio.sleep(delay)
+        if self._gate is not None:
+            await self._gate.aacquire()
+
+    def release(self, estimated_tokens: int = 0, response: Any = None, error: Optional[Exception] = None):
+        """Free the in-flight slot, reconcile the token estimate and update the backoff state."""
+        if self._gate is not None:
+            self._gate.release()
+
+        if error is not None:
+            if is_rate_limit_error(error):
+                self.on_rate_limited(parse_retry_delay(error))
+            return
+        if response is None:
+            return
+
+        usage = getattr(response, "usage_metadata", None)
+        total = getattr(usage, "total_token_count", None)
+        if self._tokens is not None and isinstance(total, int):
+            self._tokens.adjust(total - estimated_tokens)
+        with self._lock:
+            self._backoff = max(self.min_backoff, self._backoff / 2)
+
+    def on_rate_limited(self, retry_delay: Optional[float] = None):
+        """Pause every caller of this limiter after a 429."""
+        with self._lock:
+            self.rate_limited += 1
+            pause = retry_delay if retry_delay is not None else self._backoff
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + pause)
+            self._backoff = min(self.max_backoff, self._backoff * 2)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_limited": self.rate_limited,
+            "waited_seconds": self.waited_seconds,
+            "in_flight": self._gate.active if self._gate is not None else None,
+            "backoff": self._backoff,
+        }
+
+
+def configure_rate_limits(model: str = "*", **limits: Any):
+    """
+    Set the limits (rpm, tpm, max_in_flight, ...) for a model; "*" applies to
+    every model without its own entry. Each model still gets its own limiter.
+    """
+    with _registry_lock:
+        _limits[model] = limits
+        if model == "*":
+            for name in [name for name in _limiters if name not in _limits]:
+                del _limiters[name]
+        else:
+            _limiters.pop(model, None)
+
+
+def reset_rate_limits():
+    """Remove all configured limits and limiters."""
+    with _registry_lock:
+        _limits.clear()
+        _limiters.clear()
+
+
+def get_rate_limiter(model: str) -> Optional[RateLimiter]:
+    """Return the limiter shared by all LLMClient instances for the model, or None if unlimited."""
+    with _registry_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limits = _limits.get(model, _limits.get("*"))
+            if not limits:
+                return None
+            limiter = RateLimiter(**limits)
+            _limiters[model] = limiter
+        return limiter
@@ -0,0 +1,246 @@
+"""
+代码沙箱 - 预启动的独立工作进程池，供 PythonInterpreterTool 执行代码
+
+- 隔离：每段代码在独立的 Python 进程中执行，输出捕获互不干扰，崩溃不影响服务进程
+- 限制：每次调用的墙钟超时 (超时即杀掉进程并补充新进程)、CPU 时间 (RLIMIT_CPU) 与内存 (RLIMIT_AS) 上限
+- 预热：工作进程启动时预先导入 math / numpy 等模块；执行一定次数后自动回收，避免内存泄漏累积
+依赖 POSIX (select / resource)。
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import select
+import signal
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+from .tool import run_in_tool_executor
+
+logger = logging.getLogger(__name__)
+
+_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_sandbox_worker.py")
+_STARTUP_TIMEOUT = 30.0
+
+_default_pool: Optional["SandboxPool"] = None
+_default_pool_lock = threading.Lock()
+
+
+class SandboxError(Exception):
+    """The worker died or stopped responding."""
+
+
+class SandboxTimeout(SandboxError):
+    pass
+
+
+def _read_exact(fd: int, size: int, deadline: Optional[float]) -> bytes:
+    chunks = []
+    while size > 0:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        readable, _, _ = select.select([fd], [], [], timeout)
+        if not readable:
+            raise SandboxTimeout()
+        chunk = os.read(fd, size)
+        if not chunk:
+            raise SandboxError("sandbox worker exited")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class _Worker:
+    def __init__(self, config: Dict[str, Any]):
+        env = dict(os.environ)
+        # 单线程 BLAS：避免线程池占用内存配额，也让 CPU 限制更可预期
+        env.setdefault("OPENBLAS_NUM_THREADS", "1")
+        env.setdefault("OMP_NUM_THREADS", "1")
+        env.setdefault("MKL_NUM_THREADS", "1")
+        self.process = subprocess.Popen(
+            [sys.executable, _WORKER_SCRIPT, json.dumps(config)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            start_new_session=True,
+        )
+        self.tasks = 0
+        self.ready = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _send(self, message: Dict[str, Any]):
+        data = json.dumps(message, ensure_ascii=False).encode("utf-8")
+        self.process.stdin.write(struct.pack(">I", len(data)) + data)
+        self.process.stdin.flush()
+
+    def _receive(self, deadline: Optional[float]) -> Dict[str, Any]:
+        fd = self.process.stdout.fileno()
+        (length,) = struct.unpack(">I", _read_exact(fd, 4, deadline))
+        return json.loads(_read_exact(fd, length, deadline).decode("utf-8"))
+
+    def execute(self, code: str, timeout: Optional[float], cpu_seconds: Optional[float]) -> Dict[str, Any]:
+        try:
+            if not self.ready:
+                self._receive(time.monotonic() + _STARTUP_TIMEOUT)
+                self.ready = True
+            self._send({"code": code, "cpu_seconds": cpu_seconds})
+            self.tasks += 1
+            return self._receive(None if timeout is None else time.monotonic() + timeout)
+        except (BrokenPipeError, OSError, ValueError, struct.error) as e:
+            if isinstance(e, SandboxError):
+                raise
+            raise SandboxError(str(e)) from e
+
+    def kill(self):
+        if self.process.poll() is None:
+            try:
+                # 整个进程组：包括用户代码启动的子进程
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class SandboxPool:
+    """
+    Pool of pre-started sandbox worker processes.
+
+    Each call gets a wall-clock `timeout` (the worker is killed and replaced
+    when it expires) and a `cpu_seconds` budget (defaults to the timeout);
+    `memory_mb` caps each worker's address space. Workers are recycled after
+    `max_tasks_per_worker` calls. Thread-safe; calls beyond `size` wait for a
+    free worker.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        timeout: Optional[float] = 10.0,
+        cpu_seconds: Optional[float] = None,
+        memory_mb: Optional[int] = 1024,
+        preload: Sequence[str] = ("math", "numpy"),
+        max_tasks_per_worker: int = 100,
+        max_output_chars: int = 10000,
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds if cpu_seconds is not None else timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._config = {"memory_mb": memory_mb, "preload": list(preload), "max_output_chars": max_output_chars}
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self.timeouts = 0
+        self.crashes = 0
+
+    def start(self):
+        """Start the workers (done lazily on first use)."""
+        with self._lock:
+            if self._started:
+                return
+            if self._closed:
+                raise RuntimeError("SandboxPool is closed")
+            for _ in range(self.size):
+                self._idle.put(self._spawn())
+            self._started = True
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._config)
+        self._workers.append(worker)
+        return worker
+
+    def _refill(self):
+        """Respawn workers dropped after a failed replacement."""
+        with self._lock:
+            while not self._closed and len(self._workers) < self.size:
+                self._idle.put(self._spawn())
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        """Kill worker and start a new one; if the spawn fails, worker is dropped and the error re-raised."""
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            return self._spawn()
+
+    def execute(self, code: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run code in a worker. Returns {"status": "ok" | "error" | "timeout" | "cpu_timeout" | "crashed",
+        "output": ..., "error": ...}.
+        """
+        self.start()
+        timeout = self.timeout if timeout is None else timeout
+        cpu_seconds = self.cpu_seconds
+        if cpu_seconds is not None and timeout is not None:
+            cpu_seconds = min(cpu_seconds, timeout)
+        self._refill()
+        worker = self._idle.get()
+        try:
+            try:
+                result = worker.execute(code, timeout, cpu_seconds)
+            except SandboxTimeout:
+                self.timeouts += 1
+                worker = self._replace(worker)
+                return {"status": "timeout", "output": "", "error": None}
+            except SandboxError as e:
+                logger.warning(f"Sandbox worker crashed: {e}")
+                self.crashes += 1
+                worker = self._replace(worker)
+                return {"status": "crashed", "output": "", "error": None}
+            if worker.tasks >= self.max_tasks_per_worker:
+                worker = self._replace(worker)
+            return result
+        finally:
+            # 只归还仍存活的进程：_replace 中补充新进程失败时，旧进程已被杀掉，不能再放回空闲队列
+            if self._closed or not worker.alive:
+                worker.kill()
+                with self._lock:
+                    if worker in self._workers:
+                        self._workers.remove(worker)
+            else:
+                self._idle.put(worker)
+
+    async def aexecute(self, code: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Async variant of execute(); waits in the shared tool executor, not on the event loop."""
+        return await run_in_tool_executor(self.execute, code, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": len(self._workers), "idle": self._idle.qsize(), "timeouts": self.timeouts, "crashes": self.crashes}
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.kill()
+
+
+def set_default_sandbox_pool(pool: Optional[SandboxPool]):
+    """Set the pool used by PythonInterpreterTool instances created without one."""
+    global _default_pool
+    with _default_pool_lock:
+        _default_pool = pool
+
+
+def get_default_sandbox_pool() -> SandboxPool:
+    """Return the shared pool, creating one with default limits on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SandboxPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
@@ -1,15 +1,72 @@
+import asyncio
+import contextvars
+import functools
+import json
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from .calculator import DEFAULT_MAX_INT_BITS, DEFAULT_TIMEOUT, evaluate_many
+
+DEFAULT_TOOL_WORKERS = 32
+
+_executor_lock = threading.Lock()
+_tool_executor: Optional[Executor] = None
+
+def set_tool_executor(executor: Optional[Executor]):
+    """
+    设置 BaseTool.arun (以及检索器的异步接口) 共用的执行器；None 表示恢复为默认线程池。
+    """
+    global _tool_executor
+    with _executor_lock:
+        _tool_executor = executor
+
+def get_tool_executor() -> Executor:
+    """返回共享执行器，首次使用时创建 DEFAULT_TOOL_WORKERS 个线程的线程池。"""
+    global _tool_executor
+    with _executor_lock:
+        if _tool_executor is None:
+            _tool_executor = ThreadPoolExecutor(max_workers=DEFAULT_TOOL_WORKERS, thread_name_prefix="nagent-tool")
+        return _tool_executor
+
+async def run_in_tool_executor(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    在共享执行器中运行阻塞函数，不阻塞事件循环 (保留当前 contextvars)。
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_tool_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+def string_parameters(**descriptions: str) -> Dict[str, Any]:
+    """
+    构造函数调用模式的参数 JSON Schema：每个关键字参数是一个必填的字符串参数，值为其描述。
+    """
+    return {
+        "type": "object",
+        "properties": {name: {"type": "string", "description": description} for name, description in descriptions.items()},
+        "required": list(descriptions),
+    }
 
 class BaseTool(ABC):
     """
     Agent 工具的基类。
+
+    parameters 是函数调用模式 (FunctionCallingAgent) 下声明给模型的参数 JSON Schema：
+    只有一个参数时其值作为唯一的位置参数传给 run，多个参数时按关键字参数传入。
     """
 
+    parameters: Dict[str, Any] = string_parameters(input="工具输入")
+
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
 
+    def function_declaration(self) -> Dict[str, Any]:
+        """
+        返回函数声明 (name / description / parameters)。
+        """
+        return {"name": self.name, "description": self.description, "parameters": self.parameters}
+
     @abstractmethod
     def run(self, *args: Any, **kwargs: Any) -> Any:
         """
@@ -19,53 +76,74 @@ class BaseTool(ABC):
 
     async def arun(self, *args: Any, **kwargs: Any) -> Any:
         """
-        异步运行工具。默认调用同步版本。
+        异步运行工具。默认在共享执行器中运行同步版本，避免阻塞事件循环；
+        有原生异步实现的工具应重写此方法。
         """
-        return self.run(*args, **kwargs)
+        return await run_in_tool_executor(self.run, *args, **kwargs)
 
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         return self.run(*args, **kwargs)
 
 class CalculatorTool(BaseTool):
     """
-    A simple calculator tool that can evaluate mathematical expressions.
+    A calculator tool backed by a safe AST evaluator (see nagent_core.calculator).
+    Supports + - * / // % **, common math functions and constants; a JSON list
+    of expressions is evaluated in one call and answered with a JSON list.
     """
-    def __init__(self, name: str = "calculator", description: str = "执行数学计算。输入应该是一个数学表达式，例如 '2 + 2' 或 '10 / 2 * 5'"):
+    parameters = string_parameters(expression="数学表达式，例如 '2 + 2' 或 'sqrt(2) ** 3'")
+
+    def __init__(self, name: str = "calculator", description: str = "执行数学计算。输入应该是一个数学表达式，例如 '2 + 2'、'10 / 2 * 5' 或 'sqrt(2) ** 3'；也可以输入 JSON 字符串列表一次计算多个表达式。", max_int_bits: int = DEFAULT_MAX_INT_BITS, timeout: float = DEFAULT_TIMEOUT):
         super().__init__(name, description)
+        self.max_int_bits = max_int_bits
+        self.timeout = timeout
+
+    @staticmethod
+    def _format(result: Any) -> str:
+        if not isinstance(result, Exception):
+            try:
+                return str(result)
+            except ValueError as e:
+                # 整数位数超过解释器的 int -> str 转换上限 (sys.get_int_max_str_digits)
+                result = e
+        return f"错误: 无法计算表达式。{str(result)}"
+
+    def run_batch(self, expressions: List[str]) -> List[str]:
+        """
+        Evaluate several expressions in one call; each entry is the result or an error message.
+        """
+        return [self._format(result) for result in evaluate_many(expressions, self.max_int_bits, self.timeout)]
 
     def run(self, expression: str) -> str:
         """
-        Evaluate the mathematical expression.
+        Evaluate the mathematical expression (or a JSON list of expressions).
         """
-        try:
-            # Basic safety: only allow numbers and basic operators
-            import re
-            # Remove whitespace
-            expression = expression.replace(" ", "")
-            if not re.match(r"^[0-9+\-*/().]+$", expression):
-                return "错误: 表达式包含非法字符。仅允许数字和运算符 (+, -, *, /, (, ), .)。"
-
-            # Using eval with limited globals and locals for some safety
-            result = eval(expression, {"__builtins__": None}, {})
-            return str(result)
-        except Exception as e:
-            return f"错误: 无法计算表达式。{str(e)}"
+        expression = expression.strip()
+        if expression.startswith("["):
+            try:
+                expressions = json.loads(expression)
+            except json.JSONDecodeError:
+                expressions = None
+            if isinstance(expressions, list) and all(isinstance(item, str) for item in expressions):
+                return json.dumps(self.run_batch(expressions), ensure_ascii=False)
+        return self.run_batch([expression])[0]
 
 class PythonInterpreterTool(BaseTool):
     """
-    A tool that can execute Python code and return the output.
+    A tool that executes Python code in a sandbox worker process and returns the printed output.
+    Uses `pool` if given, otherwise the shared default SandboxPool (see nagent_core.sandbox).
     """
-    def __init__(self, name: str = "python_interpreter", description: str = "执行 Python 代码。输入应该是合法的 Python 代码字符串。代码应该使用 print() 输出结果。"):
+    parameters = string_parameters(code="要执行的 Python 代码，使用 print() 输出结果")
+
+    def __init__(self, name: str = "python_interpreter", description: str = "执行 Python 代码。输入应该是合法的 Python 代码字符串。代码应该使用 print() 输出结果。", pool=None):
         super().__init__(name, description)
+        self.pool = pool
 
-    def run(self, code: str) -> str:
-        """
-        Execute the Python code and capture the output.
-        """
-        import sys
-        import io
-        import contextlib
+    def _get_pool(self):
+        from .sandbox import get_default_sandbox_pool
+        return self.pool or get_default_sandbox_pool()
 
+    @staticmethod
+    def _clean_code(code: str) -> str:
         # Remove potential markdown code blocks
         if code.startswith("```python"):
             code = code[9:]
@@ -73,24 +151,35 @@ class PythonInterpreterTool(BaseTool):
             code = code[3:]
         if code.endswith("```"):
             code = code[:-3]
+        return code.strip()
 
-        code = code.strip()
+    def _format_result(self, result: Dict[str, Any]) -> str:
+        status = result["status"]
+        if status == "ok":
+            return result["output"] if result["output"] else "代码执行成功，但没有输出。"
+        if status == "timeout":
+            return f"执行出错: 超过 {self._get_pool().timeout} 秒的时间限制"
+        if status == "cpu_timeout":
+            return f"执行出错: 超过 {self._get_pool().cpu_seconds} 秒的 CPU 时间限制"
+        if status == "crashed":
+            return "执行出错: 沙箱进程异常退出 (可能超出内存限制)"
+        return f"执行出错: {result['error']}"
 
-        output = io.StringIO()
-        with contextlib.redirect_stdout(output):
-            try:
-                # Use a shared dictionary for globals and locals to allow multiline code and side effects
-                exec_globals = {}
-                exec(code, exec_globals)
-                result = output.getvalue()
-                return result if result else "代码执行成功，但没有输出。"
-            except Exception as e:
-                return f"执行出错: {str(e)}"
+    def run(self, code: str) -> str:
+        """
+        Execute the Python code in the sandbox and capture the output.
+        """
+        return self._format_result(self._get_pool().execute(self._clean_code(code)))
+
+    async def arun(self, code: str) -> str:
+        return self._format_result(await self._get_pool().aexecute(self._clean_code(code)))
 
 class WebSearchTool(BaseTool):
     """
     A mock web search tool.
     """
+    parameters = string_parameters(query="搜索关键词")
+
     def __init__(self, name: str = "web_search", description: str = "在互联网上搜索信息。"):
         super().__init__(name, description)
 
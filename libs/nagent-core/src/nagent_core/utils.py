@@ -1,3 +1,5 @@
+import asyncio
+import concurrent.futures
 import json
 import re
 import logging
@@ -23,6 +25,28 @@ def is_retryable_error(exception):
     return False
 
 
+def is_rate_limit_error(exception):
+    """
+    判断异常是否为速率限制 (429 / 配额耗尽)，用于驱动客户端限流的自适应退避。
+    """
+    if getattr(exception, "code", None) == 429:
+        return True
+    msg = str(exception).lower()
+    return "429" in msg or "resource_exhausted" in msg or "quota" in msg or "rate limit" in msg
+
+
+def run_sync(coro):
+    """
+    在同步代码中运行协程并返回结果；若当前线程已有运行中的事件循环，则在独立线程中运行。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
 def robust_json_parse(text: str):
     """
     鲁棒地解析 LLM 返回的 JSON 字符串，处理常见的 Markdown 标记。
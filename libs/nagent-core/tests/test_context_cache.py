@@ -0,0 +1,151 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from nagent_core.agent import ReActAgent
+from nagent_core.context_cache import ContextCache, LocalContextCache
+from nagent_core.tool import BaseTool
+
+class MockTool(BaseTool):
+    def run(self, query: str) -> str:
+        return f"Results for {query}"
+
+def make_response(text, prompt_tokens=None, cached_tokens=None):
+    response = MagicMock()
+    response.text = text
+    response.usage_metadata.prompt_token_count = prompt_tokens
+    response.usage_metadata.cached_content_token_count = cached_tokens
+    return response
+
+def test_context_cache_creates_once_and_reuses():
+    client = MagicMock()
+    client.caches.create.return_value.name = "cachedContents/abc"
+    cache = ContextCache(client, min_tokens=1)
+
+    assert cache.config_for("m", "static prefix") == {"cached_content": "cachedContents/abc"}
+    assert cache.config_for("m", "static prefix") == {"cached_content": "cachedContents/abc"}
+    client.caches.create.assert_called_once()
+    assert client.caches.create.call_args.kwargs["config"]["system_instruction"] == "static prefix"
+    assert cache.stats() == {"created": 1, "hits": 1, "fallbacks": 0}
+
+def test_context_cache_falls_back_for_short_or_failing_prefixes():
+    client = MagicMock()
+    assert ContextCache(client).config_for("m", "short") == {"system_instruction": "short"}
+    client.caches.create.assert_not_called()
+
+    client.caches.create.side_effect = RuntimeError("not supported")
+    cache = ContextCache(client, min_tokens=1)
+    assert cache.config_for("m", "prefix") == {"system_instruction": "prefix"}
+    assert cache.config_for("m", "prefix") == {"system_instruction": "prefix"}
+    # A failed creation is not retried
+    client.caches.create.assert_called_once()
+
+def test_context_cache_recreates_after_expiry(monkeypatch):
+    import nagent_core.context_cache as module
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    client = MagicMock()
+    cache = ContextCache(client, ttl_seconds=600, min_tokens=1)
+
+    cache.config_for("m", "prefix")
+    now[0] += 590
+    cache.config_for("m", "prefix")
+    assert client.caches.create.call_count == 2
+
+def test_context_cache_async():
+    client = MagicMock()
+    client.aio.caches.create = AsyncMock(return_value=MagicMock())
+    client.aio.caches.create.return_value.name = "cachedContents/xyz"
+    cache = ContextCache(client, min_tokens=1)
+    assert asyncio.run(cache.aconfig_for("m", "prefix")) == {"cached_content": "cachedContents/xyz"}
+    client.caches.create.assert_not_called()
+
+def test_react_agent_sends_structured_turns_without_prefix():
+    client = MagicMock()
+    client.models.generate_content.side_effect = [
+        make_response("Thought: a\nAction: retrieve(x)"),
+        make_response("Thought: b\nAction: retrieve(y)"),
+        make_response("Final Answer: done"),
+    ]
+    local_cache = LocalContextCache()
+    agent = ReActAgent(client=client, tools=[MockTool(name="retrieve", description="Search")],
+                       max_iterations=3, context_cache=local_cache)
+
+    result = agent.query("question")
+    assert result["answer"] == "done"
+
+    for call in client.models.generate_content.call_args_list:
+        contents = call.kwargs["contents"]
+        assert contents[0].role == "user" and contents[0].parts[0].text == "Question: question\n"
+        # The static prefix travels via the config, never inside the growing history
+        assert all(agent.system_prompt not in part.text for c in contents for part in c.parts)
+    last_contents = client.models.generate_content.call_args_list[-1].kwargs["contents"]
+    assert [c.role for c in last_contents] == ["user", "model", "user", "model", "user"]
+
+    tokens = [step["input_tokens"] for step in result["trace"]]
+    assert tokens[0] < tokens[1] < tokens[2]
+
+    client.models.generate_content.side_effect = [make_response("Final Answer: again")]
+    agent.query("another question")
+    assert local_cache.stats() == {"created": 1, "hits": 1, "fallbacks": 0}
+
+def test_react_agent_uses_provider_cache_and_reports_usage():
+    client = MagicMock()
+    client.caches.create.return_value.name = "cachedContents/react"
+    client.models.generate_content.side_effect = [
+        make_response("Action: retrieve(x)", prompt_tokens=1200, cached_tokens=1100),
+        make_response("Final Answer: ok", prompt_tokens=1250, cached_tokens=1100),
+    ]
+    agent = ReActAgent(client=client, tools=[MockTool(name="retrieve", description="Search")],
+                       context_cache=ContextCache(client, min_tokens=1))
+
+    result = agent.query("q")
+    config = client.models.generate_content.call_args.kwargs["config"]
+    assert config["cached_content"] == "cachedContents/react"
+    assert "system_instruction" not in config
+    assert [(s["input_tokens"], s["cached_tokens"]) for s in result["trace"]] == [(100, 1100), (150, 1100)]
+
+def test_context_cache_stores_tool_declarations_with_the_prefix():
+    client = MagicMock()
+    client.caches.create.return_value.name = "cachedContents/tools"
+    cache = ContextCache(client, min_tokens=1)
+    tools = [{"function_declarations": [{"name": "retrieve", "description": "Search"}]}]
+
+    assert cache.config_for("m", "prefix", tools) == {"cached_content": "cachedContents/tools"}
+    assert client.caches.create.call_args.kwargs["config"]["tools"] == tools
+    # The same prompt without tools is a different prefix
+    cache.config_for("m", "prefix")
+    assert client.caches.create.call_count == 2
+    assert "tools" not in client.caches.create.call_args.kwargs["config"]
+
+def test_agent_does_not_create_server_caches_by_default():
+    client = MagicMock()
+    agent = ReActAgent(client=client, tools=[MockTool("search", "Search")])
+    assert isinstance(agent.context_cache, LocalContextCache)
+    assert asyncio.run(agent._aprefix_config(blocking=True)) == {"system_instruction": agent.system_prompt}
+    client.caches.create.assert_not_called()
+
+def test_concurrent_requests_share_one_cache_creation():
+    import threading
+    started, release = threading.Event(), threading.Event()
+    client = MagicMock()
+
+    def create(**kwargs):
+        started.set()
+        release.wait(5)
+        created = MagicMock()
+        created.name = "cachedContents/shared"
+        return created
+
+    client.caches.create.side_effect = create
+    cache = ContextCache(client, min_tokens=1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.config_for("m", "prefix"))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    client.caches.create.assert_called_once()
+    assert results == [{"cached_content": "cachedContents/shared"}] * 4
@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from google.genai import types
+from nagent_core.agent import FunctionCallingAgent
+from nagent_core.context_cache import LocalContextCache
+from nagent_core.tool import BaseTool, string_parameters
+
+class SearchTool(BaseTool):
+    parameters = string_parameters(query="检索查询")
+
+    def run(self, query: str) -> str:
+        return f"Results for {query}"
+
+class SaveTool(BaseTool):
+    parameters = {
+        "type": "object",
+        "properties": {"content": {"type": "string"}, "doc_id": {"type": "string"}},
+        "required": ["content"],
+    }
+
+    def run(self, content: str, doc_id: str = None) -> str:
+        return f"saved {doc_id}: {content}"
+
+def make_response(*parts):
+    return types.GenerateContentResponse(candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))])
+
+def call(name, args, call_id=None):
+    return types.Part(function_call=types.FunctionCall(id=call_id, name=name, args=args))
+
+def make_agent(client, **kwargs):
+    tools = [SearchTool("retrieve", "Search documents"), SaveTool("save", "Save a note")]
+    return FunctionCallingAgent(client=client, tools=tools, context_cache=LocalContextCache(), **kwargs)
+
+def test_query_runs_structured_calls_and_returns_text_answer():
+    client = MagicMock()
+    client.models.generate_content.side_effect = [
+        make_response(
+            types.Part(text="Need both."),
+            call("retrieve", {"query": "巴黎 (法国)"}, "c1"),
+            call("save", {"content": "multi\nline", "doc_id": "7"}, "c2"),
+        ),
+        make_response(types.Part(text="Paris")),
+    ]
+    agent = make_agent(client)
+
+    result = agent.query("Capital of France?")
+
+    assert result["answer"] == "Paris"
+    assert [(step["action"], step["observation"]) for step in result["trace"][:2]] == [
+        (("retrieve", "巴黎 (法国)"), "Results for 巴黎 (法国)"),
+        (("save", {"content": "multi\nline", "doc_id": "7"}), "saved 7: multi\nline"),
+    ]
+    assert result["trace"][0]["thought"] == "Need both."
+    assert result["trace"][-1]["final_answer"] == "Paris"
+
+    first = client.models.generate_content.call_args_list[0].kwargs
+    declarations = first["config"]["tools"][0]["function_declarations"]
+    assert [d["name"] for d in declarations] == ["retrieve", "save"]
+    assert "Action" not in first["config"]["system_instruction"]
+    assert first["contents"][0].parts[0].text == "Capital of France?"
+
+    second = client.models.generate_content.call_args_list[1].kwargs["contents"]
+    assert [c.role for c in second] == ["user", "model", "user"]
+    responses = [part.function_response for part in second[-1].parts]
+    assert [(r.id, r.name, r.response) for r in responses] == [
+        ("c1", "retrieve", {"result": "Results for 巴黎 (法国)"}),
+        ("c2", "save", {"result": "saved 7: multi\nline"}),
+    ]
+    assert agent.stop_stats["steps"] == 2
+    assert agent.stop_stats["action_stops"] == 1
+
+@pytest.mark.asyncio
+async def test_astream_query_streams_text_and_calls():
+    async def stream(*chunks):
+        for chunk in chunks:
+            yield chunk
+
+    client = MagicMock()
+    client.aio.models.generate_content_stream = AsyncMock(side_effect=[
+        stream(make_response(types.Part(text="Looking")), make_response(call("retrieve", {"query": "France"}))),
+        stream(make_response(types.Part(text="Par")), make_response(types.Part(text="is"))),
+    ])
+    agent = make_agent(client)
+
+    events = [event async for event in agent.astream_query("q")]
+
+    assert [e["text"] for e in events if e["type"] == "token"] == ["Looking", "Par", "is"]
+    assert {"type": "action", "tool": "retrieve", "args": "France"} in events
+    assert events[-1]["answer"] == "Paris"
+
+def test_empty_response_prompts_to_continue():
+    client = MagicMock()
+    client.models.generate_content.side_effect = [make_response(), make_response(types.Part(text="done"))]
+    agent = make_agent(client, max_iterations=2)
+
+    result = agent.query("q")
+
+    assert result["answer"] == "done"
+    second = client.models.generate_content.call_args_list[1].kwargs["contents"]
+    assert [c.role for c in second] == ["user", "model", "user"]
+    assert second[-1].parts[0].text == FunctionCallingAgent.continue_prompt
+
+def test_tool_declarations_are_part_of_the_cached_prefix():
+    cache = LocalContextCache()
+    tools = [{"function_declarations": [SearchTool("retrieve", "Search").function_declaration()]}]
+    assert cache.config_for("m", "prefix", tools) == {"system_instruction": "prefix", "tools": tools}
+    cache.config_for("m", "prefix", tools)
+    cache.config_for("m", "prefix")
+    assert cache.stats()["created"] == 2
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,111 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from google.genai import types
+from nagent_core.cache import ResponseCache, make_cache_key, set_default_response_cache
+from nagent_core.llm import LLMClient
+
+def make_response(text):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part(text=text)]))]
+    )
+
+def make_client(text="answer"):
+    client = MagicMock()
+    client.models.generate_content.return_value = make_response(text)
+    client.aio.models.generate_content = AsyncMock(return_value=make_response(text))
+    return client
+
+def test_identical_requests_hit_cache(tmp_path):
+    client = make_client()
+    llm = LLMClient(client, cache=ResponseCache(cache_dir=str(tmp_path)))
+
+    first = llm.generate_content(model="m", contents="hello", config={"temperature": 0})
+    second = llm.generate_content(model="m", contents="hello", config={"temperature": 0})
+    assert first.text == second.text == "answer"
+    client.models.generate_content.assert_called_once()
+
+    # A different config or model is a different key
+    llm.generate_content(model="m", contents="hello", config={"temperature": 1})
+    llm.generate_content(model="m2", contents="hello", config={"temperature": 0})
+    assert client.models.generate_content.call_count == 3
+
+    stats = llm.cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["hit_rate"] == 0.25
+
+def test_per_call_bypass(tmp_path):
+    client = make_client()
+    llm = LLMClient(client, cache=ResponseCache(cache_dir=None))
+    llm.generate_content(model="m", contents="x")
+    llm.generate_content(model="m", contents="x", use_cache=False)
+    assert client.models.generate_content.call_count == 2
+    # use_cache is not forwarded to the SDK
+    assert "use_cache" not in client.models.generate_content.call_args.kwargs
+
+def test_async_requests_share_cache(tmp_path):
+    client = make_client()
+    llm = LLMClient(client, cache=ResponseCache(cache_dir=str(tmp_path)))
+    llm.generate_content(model="m", contents="q")
+    response = asyncio.run(llm.agenerate_content(model="m", contents="q"))
+    assert response.text == "answer"
+    client.aio.models.generate_content.assert_not_called()
+
+def test_disk_tier_survives_restart(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path))
+    LLMClient(make_client("persisted"), cache=cache).generate_content(model="m", contents="q")
+    cache.close()
+
+    client = make_client("fresh")
+    reopened = ResponseCache(cache_dir=str(tmp_path))
+    response = LLMClient(client, cache=reopened).generate_content(model="m", contents="q")
+    assert response.text == "persisted"
+    client.models.generate_content.assert_not_called()
+    assert reopened.stats()["disk_hits"] == 1
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    import nagent_core.cache as cache_module
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=60)
+    key = make_cache_key("m", "q", {})
+    cache.put(key, make_response("old"))
+    assert cache.get(key).text == "old"
+
+    now[0] += 61
+    assert cache.get(key) is None
+    assert cache.stats()["expired"] >= 1
+
+def test_size_based_eviction(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), max_memory_items=2, max_disk_bytes=200)
+    keys = [make_cache_key("m", f"q{i}", {}) for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.put(key, make_response(f"answer {i}"))
+
+    stats = cache.stats()
+    assert stats["memory_items"] == 2
+    assert 0 < stats["disk_bytes"] <= 200
+    cache._memory.clear()
+    # Oldest entries are evicted from disk, the newest survives
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[-1]).text == "answer 4"
+
+def test_empty_responses_are_not_cached():
+    client = MagicMock()
+    client.models.generate_content.return_value = types.GenerateContentResponse(candidates=[])
+    llm = LLMClient(client, cache=ResponseCache(cache_dir=None))
+    llm.generate_content(model="m", contents="q")
+    llm.generate_content(model="m", contents="q")
+    assert client.models.generate_content.call_count == 2
+
+def test_default_cache_is_used_by_new_clients():
+    cache = ResponseCache(cache_dir=None)
+    set_default_response_cache(cache)
+    try:
+        client = make_client()
+        LLMClient(client).generate_content(model="m", contents="q")
+        LLMClient(client).generate_content(model="m", contents="q")
+        client.models.generate_content.assert_called_once()
+    finally:
+        set_default_response_cache(None)
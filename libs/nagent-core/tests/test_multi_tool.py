@@ -21,3 +21,35 @@ def test_agent_with_calculator():
     assert len(agent.tools) == 1
     assert agent.tools["calculator"] == calc
     assert "calculator" in agent.system_prompt
+
+def test_calculator_operators_functions_and_limits():
+    calc = CalculatorTool()
+    assert calc.run("2 ** 10 % 1000") == "24"
+    assert calc.run("sqrt(16) + factorial(5)") == "124.0"
+    assert calc.run("log(8, 2)") == "3.0"
+    assert calc.run("round(pi, 2)") == "3.14"
+    assert len(calc.run("10 ** 3000")) == 3001
+    for expression in ["9 ** 9 ** 9", "factorial(100000)", "__import__('os')", "(1).real", "(-8) ** 0.5", "1 / 0"]:
+        assert calc.run(expression).startswith("错误")
+
+def test_calculator_batch_mode():
+    calc = CalculatorTool()
+    assert calc.run_batch(["1 + 1", "x"]) == ["2", "错误: 无法计算表达式。未知名称: x"]
+    assert calc.run('["2 * 3", "7 // 2"]') == '["6", "3"]'
+
+def test_compiled_expressions_are_cached():
+    from nagent_core.calculator import compile_expression
+    compile_expression.cache_clear()
+    calc = CalculatorTool()
+    calc.run_batch(["1 + 2"] * 5)
+    info = compile_expression.cache_info()
+    assert (info.misses, info.hits) == (1, 4)
+
+def test_calculator_timeout():
+    calc = CalculatorTool(timeout=-1.0)
+    assert "时间限制" in calc.run("1 + 2")
+
+def test_calculator_result_beyond_int_str_limit():
+    calc = CalculatorTool(max_int_bits=100000)
+    assert calc.run("10 ** 5000").startswith("错误")
+    assert calc.run('["10 ** 5000", "1 + 1"]').endswith('"2"]')
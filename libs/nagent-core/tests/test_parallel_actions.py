@@ -0,0 +1,80 @@
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from nagent_core.agent import ReActAgent
+from nagent_core.tool import BaseTool
+
+class BarrierTool(BaseTool):
+    """Only returns when `parties` calls are running at the same time."""
+    def __init__(self, name: str, barrier: threading.Barrier):
+        super().__init__(name, "Search tool")
+        self.barrier = barrier
+
+    def run(self, query: str) -> str:
+        self.barrier.wait(timeout=5)
+        return f"{self.name}: {query}"
+
+def make_response(text):
+    response = MagicMock()
+    response.text = text
+    return response
+
+def test_parse_multiple_actions_and_json_list():
+    agent = ReActAgent(client=MagicMock(), tools=[])
+    text = "Thought: two lookups.\nAction: retrieve(France)\nAction: calculator(2 + 2)\nObservation: fake\nAction: retrieve(Lyon)"
+    assert agent._parse_actions(text) == [("retrieve", "France"), ("calculator", "2 + 2")]
+    assert agent._truncate_at_action(text) == "Thought: two lookups.\nAction: retrieve(France)\nAction: calculator(2 + 2)"
+
+    text = 'Thought: x\nActions: [{"tool": "retrieve", "args": "巴黎"}, ["lookup", {"id": 3}]]\nObservation: fake'
+    assert agent._parse_actions(text) == [("retrieve", "巴黎"), ("lookup", '{"id": 3}')]
+    assert agent._parse_action(text) == ("retrieve", "巴黎")
+
+    # A Final Answer before any action is not an action step
+    assert agent._parse_actions("Final Answer: 1\nAction: retrieve(x)") == []
+
+def test_query_runs_actions_in_parallel_and_combines_observations():
+    barrier = threading.Barrier(2)
+    mock_llm = MagicMock()
+    mock_llm.models.generate_content.side_effect = [
+        make_response("Thought: both.\nAction: retrieve(France)\nAction: lookup(Germany)"),
+        make_response("Final Answer: done"),
+    ]
+    agent = ReActAgent(client=mock_llm, tools=[BarrierTool("retrieve", barrier), BarrierTool("lookup", barrier)])
+
+    result = agent.query("q")
+
+    assert result["answer"] == "done"
+    assert [(step["step"], step["action"]) for step in result["trace"][:2]] == [
+        (1, ("retrieve", "France")),
+        (1, ("lookup", "Germany")),
+    ]
+    second_contents = mock_llm.models.generate_content.call_args_list[1].kwargs["contents"]
+    assert len(second_contents) == 3
+    assert second_contents[-1].role == "user"
+    assert second_contents[-1].parts[0].text == (
+        "Observation:\n[1] retrieve(France):\nretrieve: France\n\n[2] lookup(Germany):\nlookup: Germany"
+    )
+
+@pytest.mark.asyncio
+async def test_aquery_gathers_sync_tools_in_threads():
+    barrier = threading.Barrier(3)
+    mock_llm = MagicMock()
+    mock_llm.aio.models.generate_content = AsyncMock(side_effect=[
+        make_response('Actions: [{"tool": "retrieve", "args": "a"}, {"tool": "retrieve", "args": "b"}, {"tool": "lookup", "args": "c"}]'),
+        make_response("Final Answer: ok"),
+    ])
+    agent = ReActAgent(client=mock_llm, tools=[BarrierTool("retrieve", barrier), BarrierTool("lookup", barrier)])
+
+    result = await agent.aquery("q")
+
+    assert result["answer"] == "ok"
+    assert [step["observation"] for step in result["trace"][:3]] == ["retrieve: a", "retrieve: b", "lookup: c"]
+    assert mock_llm.aio.models.generate_content.call_count == 2
+
+def test_find_action_end_waits_for_the_whole_action_block():
+    find = ReActAgent._find_action_end
+    assert find("Action: a(1)\n") is None
+    assert find("Action: a(1)\nAct") is None
+    assert find("Action: a(1)\nAction: b(2)\n") is None
+    text = "Action: a(1)\nAction: b(2)\nObservation: x"
+    assert find(text) == len("Action: a(1)\nAction: b(2)\n")
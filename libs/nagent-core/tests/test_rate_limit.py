@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from nagent_core.llm import LLMClient
+from nagent_core.rate_limit import (
+    RateLimiter,
+    TokenBucket,
+    configure_rate_limits,
+    get_rate_limiter,
+    parse_retry_delay,
+    reset_rate_limits,
+)
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    reset_rate_limits()
+    yield
+    reset_rate_limits()
+
+def test_token_bucket_reserves_in_order():
+    bucket = TokenBucket(per_minute=60)  # 1 token per second
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2.0, abs=0.05)
+    # Refunds shorten the queue
+    bucket.adjust(-2)
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+def test_max_in_flight_across_threads():
+    limiter = RateLimiter(max_in_flight=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        limiter.acquire()
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        limiter.release(response=MagicMock())
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+def test_max_in_flight_async_and_cancellation():
+    limiter = RateLimiter(max_in_flight=1)
+
+    async def scenario():
+        await limiter.aacquire()
+        waiter = asyncio.create_task(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release(response=MagicMock())
+        # The cancelled waiter must not have kept the slot
+        await asyncio.wait_for(limiter.aacquire(), timeout=1)
+        limiter.release(response=MagicMock())
+
+    asyncio.run(scenario())
+    assert limiter.stats()["in_flight"] == 0
+
+def test_rate_limit_error_starts_shared_cooldown():
+    limiter = RateLimiter(min_backoff=0.5)
+    limiter.release(error=Exception("429 RESOURCE_EXHAUSTED"))
+    assert limiter.rate_limited == 1
+    assert limiter._delay(0) == pytest.approx(0.5, abs=0.05)
+    # Consecutive 429s back off further
+    limiter.release(error=Exception("429 RESOURCE_EXHAUSTED"))
+    assert limiter._delay(0) == pytest.approx(1.0, abs=0.05)
+    # Non rate-limit errors do not
+    limiter.release(error=ValueError("bad json"))
+    assert limiter.rate_limited == 2
+
+def test_parse_retry_delay():
+    err = Exception("429 RESOURCE_EXHAUSTED. {'retryDelay': '7s'}")
+    assert parse_retry_delay(err) == 7.0
+    assert parse_retry_delay(Exception("Please retry in 2.5s.")) == 2.5
+    assert parse_retry_delay(Exception("boom")) is None
+
+def test_tpm_is_reconciled_with_usage():
+    limiter = RateLimiter(tpm=6000)
+    limiter.acquire(estimated_tokens=100)
+    response = MagicMock()
+    response.usage_metadata.total_token_count = 40
+    limiter.release(100, response=response)
+    assert limiter._tokens._tokens == pytest.approx(6000 - 40, abs=5)
+
+def test_registry_shares_limiter_per_model():
+    assert get_rate_limiter("m") is None
+    configure_rate_limits(rpm=100)
+    assert get_rate_limiter("m") is get_rate_limiter("m")
+    assert get_rate_limiter("m") is not get_rate_limiter("other")
+
+    configure_rate_limits("m", max_in_flight=1)
+    assert get_rate_limiter("m").max_in_flight == 1
+    assert get_rate_limiter("other").rpm == 100
+
+def test_llm_client_goes_through_limiter():
+    configure_rate_limits(max_in_flight=1)
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=MagicMock())
+    llm = LLMClient(client)
+
+    llm.generate_content(model="m", contents="hi", use_cache=False)
+    asyncio.run(llm.agenerate_content(model="m", contents="hi", use_cache=False))
+    assert get_rate_limiter("m").stats()["in_flight"] == 0
+
+    limiter = RateLimiter()
+    limiter.release = MagicMock(wraps=limiter.release)
+    failing = LLMClient(MagicMock(), rate_limiter=limiter)
+    failing.client.models.generate_content.side_effect = KeyError("boom")
+    with pytest.raises(KeyError):
+        failing.generate_content(model="m", contents="hi")
+    assert isinstance(limiter.release.call_args.kwargs["error"], KeyError)
+
+def test_stream_open_retries_go_through_limiter(monkeypatch):
+    monkeypatch.setattr(LLMClient._aopen_stream.retry, "sleep", AsyncMock())
+    limiter = RateLimiter(max_in_flight=1, min_backoff=0.01)
+    cooldowns = []
+    original_aacquire = limiter.aacquire
+
+    async def aacquire(estimated_tokens=0):
+        cooldowns.append(limiter.rate_limited)
+        await original_aacquire(estimated_tokens)
+
+    limiter.aacquire = aacquire
+
+    async def chunks():
+        chunk = MagicMock()
+        chunk.text = "ok"
+        yield chunk
+
+    client = MagicMock()
+    client.aio.models.generate_content_stream = AsyncMock(
+        side_effect=[Exception("429 RESOURCE_EXHAUSTED"), chunks()]
+    )
+    llm = LLMClient(client, rate_limiter=limiter)
+
+    async def consume():
+        return [text async for text in llm.astream_content(model="m", contents="hi")]
+
+    assert asyncio.run(consume()) == ["ok"]
+    # The 429 on the first open started the cooldown before the retry acquired again
+    assert cooldowns == [0, 1]
+    assert limiter.stats()["in_flight"] == 0
@@ -72,3 +72,40 @@ async def test_react_agent_aquery():
     assert len(result["trace"]) == 2
     assert result["trace"][0]["action"][0] == "retrieve"
     assert mock_llm.aio.models.generate_content.call_count == 2
+
+def test_react_agent_stop_sequences_and_truncation():
+    mock_llm = MagicMock()
+    response1 = MagicMock()
+    # The model ignores the stop sequence and hallucinates the rest of the loop
+    response1.text = "Thought: search.\nAction: retrieve(France)\nObservation: fake\nFinal Answer: Lyon"
+    response1.usage_metadata.candidates_token_count = 20
+    response2 = MagicMock()
+    response2.text = "Thought: done.\nFinal Answer: Paris"
+    mock_llm.models.generate_content.side_effect = [response1, response2]
+
+    agent = ReActAgent(client=mock_llm, tools=[MockTool(name="retrieve", description="Search tool")], max_iterations=3)
+    result = agent.query("What is the capital of France?")
+
+    # The hallucinated Final Answer after the action is discarded
+    assert result["answer"] == "Paris"
+    first_call = mock_llm.models.generate_content.call_args_list[0].kwargs
+    assert first_call["config"] == {"system_instruction": agent.system_prompt, "stop_sequences": ["\nObservation:"]}
+    second_contents = mock_llm.models.generate_content.call_args_list[1].kwargs["contents"]
+    assert all("fake" not in part.text for content in second_contents for part in content.parts)
+
+    stats = agent.stop_stats
+    assert stats["steps"] == 2
+    assert stats["action_stops"] == 1
+    assert stats["truncated_chars"] == len("\nObservation: fake\nFinal Answer: Lyon")
+    assert stats["tokens_saved"] > 0
+    assert stats["output_tokens"] == 20
+
+def test_react_agent_stop_sequences_can_be_disabled():
+    mock_llm = MagicMock()
+    response = MagicMock()
+    response.text = "Final Answer: 42"
+    mock_llm.models.generate_content.return_value = response
+
+    agent = ReActAgent(client=mock_llm, tools=[], stop_sequences=[])
+    assert agent.query("q")["answer"] == "42"
+    assert mock_llm.models.generate_content.call_args.kwargs["config"] == {"system_instruction": agent.system_prompt}
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from nagent_core.sandbox import SandboxPool
+from nagent_core.tool import PythonInterpreterTool
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool(size=2, timeout=3.0, cpu_seconds=1, memory_mb=256, preload=("math",))
+    yield pool
+    pool.close()
+
+def test_output_and_errors(pool):
+    tool = PythonInterpreterTool(pool=pool)
+    assert tool.run("```python\nimport math\nprint(math.sqrt(16))\n```") == "4.0\n"
+    assert tool.run("x = 1") == "代码执行成功，但没有输出。"
+    assert tool.run("1 / 0") == "执行出错: division by zero"
+    # SystemExit only ends the snippet, not the worker
+    assert tool.run("raise SystemExit") == "执行出错: SystemExit"
+    assert tool.run("print('still alive')") == "still alive\n"
+
+def test_wall_clock_timeout_replaces_worker(pool):
+    tool = PythonInterpreterTool(pool=pool)
+    assert tool.run("import time\ntime.sleep(10)") == "执行出错: 超过 3.0 秒的时间限制"
+    assert pool.timeouts == 1
+    assert tool.run("print(1 + 1)") == "2\n"
+    assert pool.stats()["workers"] == 2
+
+def test_cpu_and_memory_limits(pool):
+    tool = PythonInterpreterTool(pool=pool)
+    assert tool.run("while True:\n    pass") == "执行出错: 超过 1 秒的 CPU 时间限制"
+    assert tool.run("x = bytearray(512 * 1024 * 1024)") == "执行出错: MemoryError: 超出内存限制"
+    assert tool.run("print('ok')") == "ok\n"
+
+def test_crash_is_recovered(pool):
+    tool = PythonInterpreterTool(pool=pool)
+    assert tool.run("import os\nos._exit(1)") == "执行出错: 沙箱进程异常退出 (可能超出内存限制)"
+    assert pool.crashes == 1
+    assert tool.run("print(3)") == "3\n"
+
+def test_concurrent_calls_are_isolated(pool):
+    tool = PythonInterpreterTool(pool=pool)
+
+    async def main():
+        return await asyncio.gather(*(tool.arun(f"import time\ntime.sleep(0.2)\nprint({i})") for i in range(4)))
+
+    assert asyncio.run(main()) == [f"{i}\n" for i in range(4)]
+
+def test_workers_are_recycled():
+    pool = SandboxPool(size=1, preload=(), max_tasks_per_worker=2)
+    try:
+        pids = []
+        for _ in range(3):
+            pids.append(pool.execute("import os\nprint(os.getpid())")["output"])
+        assert pids[0] == pids[1] != pids[2]
+    finally:
+        pool.close()
+
+def test_failed_replacement_is_not_requeued(monkeypatch):
+    pool = SandboxPool(size=1, timeout=3.0, preload=())
+    try:
+        pool.start()
+        dead = pool._workers[0]
+        spawn = pool._spawn
+
+        def failing_spawn():
+            raise OSError("cannot start worker")
+
+        monkeypatch.setattr(pool, "_spawn", failing_spawn)
+        with pytest.raises(OSError):
+            pool.execute("import os\nos._exit(1)")
+        assert not dead.alive
+        assert pool.stats() == {"workers": 0, "idle": 0, "timeouts": 0, "crashes": 1}
+
+        # The next call starts a fresh worker instead of getting the dead one
+        monkeypatch.setattr(pool, "_spawn", spawn)
+        assert pool.execute("print(5)")["output"] == "5\n"
+        assert pool.stats()["workers"] == 1
+    finally:
+        pool.close()
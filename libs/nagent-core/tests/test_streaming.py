@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from nagent_core.agent import ReActAgent
+from nagent_core.llm import LLMClient
+from nagent_core.tool import BaseTool
+
+class MockTool(BaseTool):
+    def run(self, query: str) -> str:
+        return f"Results for {query}"
+
+def make_stream(chunks, state=None):
+    async def gen():
+        try:
+            for text in chunks:
+                if state is not None:
+                    state["sent"] = state.get("sent", 0) + 1
+                chunk = MagicMock()
+                chunk.text = text
+                yield chunk
+        finally:
+            if state is not None:
+                state["closed"] = True
+    return gen()
+
+def make_client(*streams):
+    client = MagicMock()
+    client.aio.models.generate_content_stream = AsyncMock(side_effect=list(streams))
+    return client
+
+@pytest.mark.asyncio
+async def test_astream_content_yields_chunks_and_closes_early():
+    state = {}
+    llm = LLMClient(make_client(make_stream(["a", "", "b", "c", "d"], state)))
+
+    stream = llm.astream_content(model="m", contents="hi")
+    received = []
+    async for text in stream:
+        received.append(text)
+        if text == "b":
+            break
+    await stream.aclose()
+
+    assert received == ["a", "b"]
+    assert state["closed"] is True
+    assert state["sent"] == 3
+
+@pytest.mark.asyncio
+async def test_react_astream_stops_at_complete_action_line():
+    first_state = {}
+    client = make_client(
+        make_stream(["Thought: search.\nAct", "ion: retrieve(Fra", "nce)\nObservation: made up", " text\n"], first_state),
+        make_stream(["Thought: done.\n", "Final Answer: ", "Paris"]),
+    )
+    agent = ReActAgent(client=client, tools=[MockTool(name="retrieve", description="Search")], max_iterations=3)
+
+    events = [event async for event in agent.astream_query("Capital of France?")]
+
+    tokens = "".join(e["text"] for e in events if e["type"] == "token")
+    # Nothing after the action line leaks into the output
+    assert "made up" not in tokens
+    assert first_state["sent"] == 3
+    assert first_state["closed"] is True
+
+    action = next(e for e in events if e["type"] == "action")
+    assert (action["tool"], action["args"]) == ("retrieve", "France")
+    observation = next(e for e in events if e["type"] == "observation")
+    assert observation["text"] == "Results for France"
+
+    final = events[-1]
+    assert final["type"] == "final"
+    assert final["answer"] == "Paris"
+    assert final["trace"][0]["action"] == ("retrieve", "France")
+    # The second prompt contains the real observation, not the hallucinated one
+    second_contents = client.aio.models.generate_content_stream.call_args_list[1].kwargs["contents"]
+    assert [(c.role, c.parts[0].text) for c in second_contents[1:]] == [
+        ("model", "Thought: search.\nAction: retrieve(France)\n"),
+        ("user", "Observation: Results for France"),
+    ]
+
+@pytest.mark.asyncio
+async def test_react_astream_action_at_end_of_stream():
+    client = make_client(
+        make_stream(["Thought: x\nAction: retrieve(y)"]),
+        make_stream(["Final Answer: z"]),
+    )
+    agent = ReActAgent(client=client, tools=[MockTool(name="retrieve", description="Search")], max_iterations=2)
+    events = [event async for event in agent.astream_query("q")]
+    assert [e["type"] for e in events if e["type"] != "token"] == ["action", "observation", "final"]
+    assert events[-1]["answer"] == "z"
@@ -0,0 +1,40 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from nagent_core.tool import BaseTool, set_tool_executor, get_tool_executor
+
+class SleepTool(BaseTool):
+    def __init__(self):
+        super().__init__("sleep", "Blocking tool")
+        self.threads = []
+
+    def run(self, seconds: str) -> str:
+        self.threads.append(threading.current_thread().name)
+        time.sleep(float(seconds))
+        return "done"
+
+@pytest.mark.asyncio
+async def test_arun_does_not_block_the_event_loop():
+    tool = SleepTool()
+    start = time.monotonic()
+    results = await asyncio.gather(*(tool.arun("0.2") for _ in range(5)))
+    assert results == ["done"] * 5
+    # Five blocking calls overlap instead of running back to back
+    assert time.monotonic() - start < 0.8
+    assert all(name.startswith("nagent-tool") for name in tool.threads)
+
+@pytest.mark.asyncio
+async def test_set_tool_executor():
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="custom")
+    set_tool_executor(executor)
+    try:
+        assert get_tool_executor() is executor
+        tool = SleepTool()
+        assert await tool.arun("0") == "done"
+        assert tool.threads[0].startswith("custom")
+    finally:
+        set_tool_executor(None)
+        executor.shutdown()
+    assert get_tool_executor() is not executor
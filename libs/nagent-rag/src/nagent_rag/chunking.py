@@ -1,22 +1,73 @@
-from typing import List, Dict, Any, Optional
-from .document_loaders import TextLoader
-from .text_splitter import RecursiveCharacterTextSplitter
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .document_loaders import DEFAULT_READ_WORKERS, TextLoader, iter_ordered
+from .embedding_cache import text_key
+from .manifest import ChunkDelta, ChunkManifest, FileRecord
+from .text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
+
+logger = logging.getLogger(__name__)
+
+# 每个切分任务最多包含的文档数与字符数
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_BATCH_CHARS = 1_000_000
+
+# 进程池工作进程中的切分器，由 _init_split_worker 设置
+_worker_splitter: Optional[RecursiveCharacterTextSplitter] = None
+
+def _init_split_worker(splitter: RecursiveCharacterTextSplitter):
+    global _worker_splitter
+    _worker_splitter = splitter
+
+def _split_batch(docs: List[Dict[str, Any]], splitter: Optional[RecursiveCharacterTextSplitter] = None) -> List[Tuple[bool, List[Dict[str, Any]]]]:
+    """
+    逐个文档切分，返回 (文档是否自带 id, 分块列表)；没有 id 的分块由主进程统一编号。
+    """
+    splitter = splitter or _worker_splitter
+    return [("id" in doc, splitter.split_documents([doc])) for doc in docs]
+
+def _iter_doc_batches(docs: Iterable[Dict[str, Any]], batch_size: int, batch_chars: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    chars = 0
+    for doc in docs:
+        batch.append(doc)
+        chars += len(doc.get("content", ""))
+        if len(batch) >= batch_size or chars >= batch_chars:
+            yield batch
+            batch, chars = [], 0
+    if batch:
+        yield batch
 
 class ChunkingProcessor:
     """
     结合 Loader 和 Splitter，提供一键式分块处理功能。
+    length_unit="token" 时使用 TokenTextSplitter (按 token 计数，按中文标点与 Markdown 标题切分)，
+    tokenizer 为 get_tokenizer 的名称 (默认使用本地的 RegexTokenizer)。
     """
     def __init__(
         self,
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
-        supported_extensions: Optional[List[str]] = None
+        supported_extensions: Optional[List[str]] = None,
+        length_unit: str = "char",
+        tokenizer: Optional[str] = None
     ):
         self.loader = TextLoader(supported_extensions=supported_extensions)
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
-        )
+        if length_unit == "token":
+            self.splitter = TokenTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                tokenizer=tokenizer
+            )
+        elif length_unit == "char":
+            self.splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap
+            )
+        else:
+            raise ValueError(f"Unknown length_unit: {length_unit}")
 
     def process_path(self, path: str, recursive: bool = True) -> List[Dict[str, Any]]:
         """
@@ -25,6 +76,129 @@ class ChunkingProcessor:
         raw_docs = self.loader.load(path, recursive=recursive)
         return self.splitter.split_documents(raw_docs)
 
+    def iter_process_path(
+        self,
+        path: str,
+        recursive: bool = True,
+        processes: Optional[int] = None,
+        read_workers: int = DEFAULT_READ_WORKERS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_chars: int = DEFAULT_BATCH_CHARS,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        流式分块：TextLoader.iter_load 在线程池中读取文件，文档按批在进程池中切分，
+        按文件顺序逐批产出分块 (分块与 ID 与 process_path 的结果一致)。
+        同时在途的批次不超过 2 * processes 个，内存占用有界。
+        processes 默认为 CPU 数，0 表示在当前进程中切分。
+        """
+        docs = self.loader.iter_load(path, recursive=recursive, max_workers=read_workers)
+        batches = _iter_doc_batches(docs, batch_size, batch_chars)
+        if processes is None:
+            processes = os.cpu_count() or 1
+
+        next_id = 0
+        if processes == 0:
+            results = (_split_batch(batch, self.splitter) for batch in batches)
+            executor = None
+        else:
+            # spawn：读取线程仍在运行，fork 可能死锁
+            executor = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_split_worker,
+                initargs=(self.splitter,),
+            )
+            results = iter_ordered(executor, _split_batch, batches, 2 * processes)
+        try:
+            for result in results:
+                chunks = []
+                for has_id, doc_chunks in result:
+                    for chunk in doc_chunks:
+                        # 与 split_documents 一致：没有 id 的文档用全局分块序号作为 ID
+                        if not has_id:
+                            chunk["id"] = str(next_id)
+                        next_id += 1
+                    chunks.extend(doc_chunks)
+                yield chunks
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def splitter_config(self) -> Dict[str, Any]:
+        """
+        影响分块结果的配置，记录在清单中；变化时增量分块会重新切分所有文件。
+        """
+        splitter = self.splitter
+        tokenizer = splitter.tokenizer
+        return {
+            "splitter": type(splitter).__name__,
+            "chunk_size": splitter.chunk_size,
+            "chunk_overlap": splitter.chunk_overlap,
+            "separators": [getattr(sep, "pattern", sep) for sep in splitter.separators],
+            "tokenizer": getattr(tokenizer, "encoding_name", type(tokenizer).__name__ if tokenizer else None),
+            "extensions": sorted(self.loader.supported_extensions),
+        }
+
+    def process_path_incremental(
+        self,
+        path: str,
+        manifest: ChunkManifest,
+        recursive: bool = True,
+        read_workers: int = DEFAULT_READ_WORKERS,
+    ) -> ChunkDelta:
+        """
+        增量分块：只重新切分相对清单发生变化的文件，返回新增分块与需删除的分块 ID，并就地更新清单
+        (调用方应用变化后调用 manifest.save())。
+        分块 ID 为 "<相对路径>_<序号>"，文件不变时保持稳定。
+        """
+        config = self.splitter_config()
+        if manifest.files and manifest.config != config:
+            logger.info("Chunking config changed, re-chunking all files")
+        same_config = manifest.config == config
+        root = path if os.path.isdir(path) else os.path.dirname(path)
+
+        delta = ChunkDelta()
+        seen = set()
+        candidates = []
+        for file_path in self.loader.iter_paths(path, recursive=recursive):
+            key = os.path.relpath(file_path, root).replace(os.sep, "/")
+            seen.add(key)
+            stat = os.stat(file_path)
+            record = manifest.files.get(key)
+            if same_config and record and record.size == stat.st_size and record.mtime_ns == stat.st_mtime_ns:
+                delta.unchanged_files += 1
+            else:
+                candidates.append((key, file_path, stat))
+
+        with ThreadPoolExecutor(max_workers=max(1, read_workers), thread_name_prefix="nagent-loader") as executor:
+            docs = iter_ordered(executor, self.loader._load_file, [c[1] for c in candidates], 2 * max(1, read_workers))
+            for (key, _, stat), doc in zip(candidates, docs):
+                if doc is None:
+                    # 读取失败：保留旧记录与旧分块
+                    continue
+                record = manifest.files.get(key)
+                content_hash = text_key(doc["content"])
+                if same_config and record and record.content_hash == content_hash:
+                    # 只有 mtime 变化 (如 touch)
+                    record.size, record.mtime_ns = stat.st_size, stat.st_mtime_ns
+                    delta.unchanged_files += 1
+                    continue
+                doc["id"] = key
+                chunks = self.splitter.split_documents([doc])
+                if record:
+                    delta.removed_ids.extend(record.chunk_ids)
+                    delta.changed_files.append(key)
+                else:
+                    delta.new_files.append(key)
+                delta.added.extend(chunks)
+                manifest.files[key] = FileRecord(stat.st_size, stat.st_mtime_ns, content_hash, [c["id"] for c in chunks])
+
+        for key in [key for key in manifest.files if key not in seen]:
+            delta.removed_ids.extend(manifest.files.pop(key).chunk_ids)
+            delta.deleted_files.append(key)
+        manifest.config = config
+        return delta
+
     def process_texts(self, texts: List[str]) -> List[Dict[str, Any]]:
         """
         对给定的文本列表进行分块。
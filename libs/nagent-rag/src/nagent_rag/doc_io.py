@@ -0,0 +1,134 @@
+"""
+文档 / 分块文件的流式读写
+
+- JSONL (每行一个文档，扩展名 .jsonl / .ndjson) 逐行写入与读取，内存中不需要整份语料的副本
+- JSON (文档列表) 保持兼容，读取时整体加载
+- 按扩展名透明压缩：.gz 使用标准库 gzip，.zst 使用 zstd (Python 3.14+ 的 compression.zstd，
+  或已安装的 zstandard 包)
+"""
+import gzip
+import json
+import os
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+DEFAULT_ADD_BATCH_SIZE = 1000
+
+
+def _compression(path: str) -> Optional[str]:
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def _open_zstd(path: str, mode: str) -> IO[str]:
+    try:
+        from compression import zstd
+        return zstd.open(path, mode, encoding="utf-8")
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Reading or writing .zst files requires Python 3.14+ or the 'zstandard' package")
+    return zstandard.open(path, mode, encoding="utf-8")
+
+
+def open_text(path: str, mode: str = "r") -> IO[str]:
+    """按扩展名打开 (可能压缩的) 文本文件，mode 为 "r" 或 "w"。"""
+    compression = _compression(path)
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if compression == "zstd":
+        return _open_zstd(path, mode + "t")
+    return open(path, mode, encoding="utf-8")
+
+
+def is_jsonl(path: str) -> bool:
+    """去掉压缩扩展名后是否为 JSONL 文件。"""
+    if _compression(path):
+        path = os.path.splitext(path)[0]
+    return path.endswith(JSONL_EXTENSIONS)
+
+
+def iter_documents(path: str, jsonl: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+    """
+    逐个读取文档：JSONL 逐行解析 (空行跳过)；JSON 文件需为文档列表。
+    jsonl 为 None 时按扩展名判断格式。
+    """
+    if jsonl is None:
+        jsonl = is_jsonl(path)
+    with open_text(path) as f:
+        if jsonl:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_no}: invalid JSON line: {e}") from e
+            return
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: document file must contain a JSON list")
+    yield from data
+
+
+def validate_documents(path: str, jsonl: Optional[bool] = None) -> int:
+    """
+    流式检查整个文件 (每条都须为对象)，返回文档数；格式错误时抛出 ValueError。
+    用于在清空已有索引之前确认文件可用。
+    """
+    count = 0
+    for count, doc in enumerate(iter_documents(path, jsonl), 1):
+        if not isinstance(doc, dict):
+            raise ValueError(f"{path}: document #{count} is not a JSON object")
+    return count
+
+
+def read_documents(path: str, jsonl: Optional[bool] = None) -> List[Dict[str, Any]]:
+    return list(iter_documents(path, jsonl))
+
+
+def write_jsonl(f: IO[str], documents: Iterable[Dict[str, Any]]) -> int:
+    """将文档逐行写入已打开的文本流，返回写入的条数。"""
+    count = 0
+    for doc in documents:
+        f.write(json.dumps(doc, ensure_ascii=False))
+        f.write("\n")
+        count += 1
+    return count
+
+
+def write_documents(path: str, documents: Iterable[Dict[str, Any]], jsonl: Optional[bool] = None) -> int:
+    """
+    写入 JSONL 或 JSON (可压缩，jsonl 为 None 时按扩展名判断)，返回写入的条数。
+    JSONL 边迭代边写入；先写临时文件再 os.replace，因此 documents 可以来自 iter_documents(path) 本身。
+    """
+    if jsonl is None:
+        jsonl = is_jsonl(path)
+    tmp_path = f"{path}.tmp{os.path.splitext(path)[1]}"
+    try:
+        with open_text(tmp_path, "w") as f:
+            if jsonl:
+                count = write_jsonl(f, documents)
+            else:
+                documents = list(documents)
+                json.dump(documents, f, ensure_ascii=False, indent=2)
+                count = len(documents)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def iter_batches(documents: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_ADD_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """将文档流按 batch_size 分批，便于分批调用 add_documents。"""
+    iterator = iter(documents)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
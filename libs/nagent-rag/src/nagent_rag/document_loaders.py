@@ -1,9 +1,29 @@
 import os
 import logging
-from typing import List, Dict, Any, Optional
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_READ_WORKERS = 8
+
+def iter_ordered(executor: Executor, func: Callable[[T], R], items: Iterable[T], max_pending: int) -> Iterator[R]:
+    """
+    按输入顺序产出 executor 上 func(item) 的结果；与 Executor.map 不同，输入是惰性消费的，
+    同时在途的任务不超过 max_pending，内存占用有界。
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
 class TextLoader:
     """
     负责从指定路径加载文本文件内容。
@@ -18,25 +38,42 @@ class TextLoader:
         """
         加载文件或目录下的所有文本文件。
         """
-        documents = []
+        return list(self.iter_load(path, recursive=recursive))
+
+    def iter_paths(self, path: str, recursive: bool = True) -> Iterator[str]:
+        """
+        按 os.walk 的顺序惰性产出要加载的文件路径。
+        """
         if os.path.isfile(path):
-            doc = self._load_file(path)
-            if doc:
-                documents.append(doc)
+            yield path
         elif os.path.isdir(path):
             for root, _, files in os.walk(path):
                 for file in files:
                     if any(file.endswith(ext) for ext in self.supported_extensions):
-                        file_path = os.path.join(root, file)
-                        doc = self._load_file(file_path)
-                        if doc:
-                            documents.append(doc)
+                        yield os.path.join(root, file)
                 if not recursive:
                     break
         else:
             logger.warning(f"路径不存在: {path}")
 
-        return documents
+    def iter_load(self, path: str, recursive: bool = True, max_workers: int = DEFAULT_READ_WORKERS) -> Iterator[Dict[str, Any]]:
+        """
+        流式加载：在线程池中并发读取文件，按遍历顺序逐个产出文档；
+        同时在途的读取不超过 2 * max_workers 个，max_workers <= 1 时在当前线程顺序读取。
+        """
+        paths = self.iter_paths(path, recursive=recursive)
+        if max_workers <= 1:
+            docs = map(self._load_file, paths)
+            yield from (doc for doc in docs if doc)
+            return
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nagent-loader")
+        try:
+            for doc in iter_ordered(executor, self._load_file, paths, 2 * max_workers):
+                if doc:
+                    yield doc
+        finally:
+            # 提前停止消费时丢弃尚未开始的读取
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def _load_file(self, file_path: str) -> Optional[Dict[str, Any]]:
         """
@@ -0,0 +1,175 @@
+"""
+Embedding 缓存模块 - 按 (模型, sha256(文本)) 缓存向量
+
+两级存储：
+- 内存 LRU 层，命中时无需任何 I/O
+- SQLite 持久层，向量以 float32 BLOB 紧凑存储，可跨进程共享
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+_shared_caches: Dict[str, "EmbeddingCache"] = {}
+_shared_lock = threading.Lock()
+
+
+def text_key(text: str) -> str:
+    """Content hash used as the cache key of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache with an in-memory LRU tier.
+    Thread-safe; hit/miss counters are exposed via stats().
+    """
+
+    def __init__(self, cache_dir: str = ".embedding_cache", max_memory_items: int = 10000):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.db_path = os.path.join(cache_dir, "embeddings.sqlite3")
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, key TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, key))"
+        )
+        self._conn.commit()
+
+        self._memory: "OrderedDict[Tuple[str, str], array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, cache_key: Tuple[str, str], vector: array):
+        self._memory[cache_key] = vector
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings; returns None for every text not in the cache."""
+        keys = [text_key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        with self._lock:
+            pending: Dict[str, List[int]] = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get((model, key))
+                if vector is not None:
+                    self._memory.move_to_end((model, key))
+                    results[i] = vector.tolist()
+                    self.memory_hits += 1
+                else:
+                    pending.setdefault(key, []).append(i)
+
+            if pending:
+                pending_keys = list(pending)
+                # SQLite limits the number of bound parameters per statement
+                for start in range(0, len(pending_keys), 500):
+                    batch = pending_keys[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(batch))})",
+                        [model, *batch],
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = array("f")
+                        vector.frombytes(blob)
+                        self._remember((model, key), vector)
+                        for i in pending.pop(key):
+                            results[i] = vector.tolist()
+                            self.disk_hits += 1
+
+            self.misses += sum(len(indices) for indices in pending.values())
+
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """Store embeddings for the given texts."""
+        rows = []
+        with self._lock:
+            for text, values in zip(texts, vectors):
+                key = text_key(text)
+                vector = array("f", values)
+                self._remember((model, key), vector)
+                rows.append((model, key, vector.tobytes()))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, vector) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def _split_misses(self, model: str, texts: List[str]):
+        cached = self.get_many(model, texts)
+        # De-duplicate misses so repeated texts are embedded once
+        miss_texts = list(dict.fromkeys(text for text, vec in zip(texts, cached) if vec is None))
+        return cached, miss_texts
+
+    @staticmethod
+    def _merge(texts: List[str], cached: List[Optional[List[float]]], miss_texts: List[str], computed: List[List[float]]):
+        fresh = dict(zip(miss_texts, computed))
+        return [vec if vec is not None else list(fresh[text]) for text, vec in zip(texts, cached)]
+
+    def get_or_compute(
+        self,
+        model: str,
+        texts: List[str],
+        compute: Callable[[List[str]], List[List[float]]],
+    ) -> List[List[float]]:
+        """Return embeddings for texts, calling compute() only for cache misses."""
+        cached, miss_texts = self._split_misses(model, texts)
+        computed = compute(miss_texts) if miss_texts else []
+        if miss_texts:
+            self.put_many(model, miss_texts, computed)
+        return self._merge(texts, cached, miss_texts, computed)
+
+    async def aget_or_compute(
+        self,
+        model: str,
+        texts: List[str],
+        compute: Callable[[List[str]], Awaitable[List[List[float]]]],
+    ) -> List[List[float]]:
+        """Async variant of get_or_compute()."""
+        cached, miss_texts = self._split_misses(model, texts)
+        computed = await compute(miss_texts) if miss_texts else []
+        if miss_texts:
+            self.put_many(model, miss_texts, computed)
+        return self._merge(texts, cached, miss_texts, computed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and hit rate."""
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_embedding_cache(cache_dir: str = ".embedding_cache", max_memory_items: int = 10000) -> EmbeddingCache:
+    """
+    Return the process-wide cache for cache_dir, so retrievers, eval and
+    testset generation share one memory tier and one connection.
+    """
+    path = os.path.abspath(cache_dir)
+    with _shared_lock:
+        cache = _shared_caches.get(path)
+        if cache is None:
+            cache = EmbeddingCache(cache_dir=cache_dir, max_memory_items=max_memory_items)
+            _shared_caches[path] = cache
+        return cache
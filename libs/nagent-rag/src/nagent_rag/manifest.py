@@ -0,0 +1,100 @@
+"""
+增量分块清单 - 记录每个文件的大小、mtime、内容哈希与产出的分块 ID
+
+- 重跑时 (size, mtime) 未变的文件直接跳过，不读取；变化的文件读取后比较内容哈希，
+  内容确实变化才重新切分
+- 结果为 ChunkDelta：新增的分块与需要删除的分块 ID，可直接用于检索器的增量更新
+- 切分配置 (chunk_size、分隔符、分词器等) 变化时所有文件都会重新切分
+"""
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class FileRecord:
+    """清单中单个文件的记录"""
+    size: int
+    mtime_ns: int
+    content_hash: str
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ChunkDelta:
+    """一次增量分块的结果"""
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed_ids: List[str] = field(default_factory=list)
+    new_files: List[str] = field(default_factory=list)
+    changed_files: List[str] = field(default_factory=list)
+    deleted_files: List[str] = field(default_factory=list)
+    unchanged_files: int = 0
+
+    def apply(self, retriever):
+        """
+        将变化应用到检索器：先删除旧分块再添加新分块 (变化文件的新旧分块 ID 可能相同)。
+        """
+        if self.removed_ids:
+            retriever.delete_documents(self.removed_ids)
+        if self.added:
+            retriever.add_documents(self.added)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added_chunks": len(self.added),
+            "removed_chunks": len(self.removed_ids),
+            "new_files": len(self.new_files),
+            "changed_files": len(self.changed_files),
+            "deleted_files": len(self.deleted_files),
+            "unchanged_files": self.unchanged_files,
+        }
+
+
+class ChunkManifest:
+    """
+    文件 (相对路径) -> FileRecord 的清单，以 JSON 保存在 path。
+    由 ChunkingProcessor.process_path_incremental 更新；调用方在应用 ChunkDelta 后调用 save()。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.config: Dict[str, Any] = {}
+        self.files: Dict[str, FileRecord] = {}
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            logger.warning(f"Ignoring manifest with unsupported version: {self.path}")
+            return
+        self.config = data.get("config", {})
+        self.files = {key: FileRecord(**record) for key, record in data.get("files", {}).items()}
+
+    def save(self, path: Optional[str] = None):
+        """原子写入 (临时文件 + os.replace)，中途失败不会留下损坏的清单。"""
+        path = path or self.path
+        if not path:
+            raise ValueError("No manifest path given")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "config": self.config,
+            "files": {key: asdict(record) for key, record in sorted(self.files.items())},
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        self.config = {}
+        self.files = {}
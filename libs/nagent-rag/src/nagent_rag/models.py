@@ -1,10 +1,46 @@
 """
 模型工厂模块 - 提供 Ragas 所需的模型实例
 """
+import json
+import os
+from typing import Any, List
 from google import genai
 from ragas.embeddings import GoogleEmbeddings
 from ragas.cache import DiskCacheBackend
 from nagent_rag.eval import GoogleGenAIWrapper
+from nagent_rag.embedding_cache import EmbeddingCache, get_embedding_cache
+
+class CachedGoogleEmbeddings(GoogleEmbeddings):
+    """
+    带内容哈希缓存的 GoogleEmbeddings。
+    单条与批量接口都只对缓存未命中的文本调用 API（异步接口复用同步实现）。
+    """
+    def __init__(self, *args: Any, embedding_cache: EmbeddingCache, **kwargs: Any):
+        self.embedding_cache = embedding_cache
+        super().__init__(*args, **kwargs)
+
+    def _cache_model(self, **kwargs: Any) -> str:
+        # 额外参数 (如 output_dimensionality) 会改变向量，需纳入缓存键
+        merged_kwargs = {**self.kwargs, **kwargs}
+        if not merged_kwargs:
+            return self.model
+        return f"{self.model}:{json.dumps(merged_kwargs, sort_keys=True, default=str)}"
+
+    def embed_text(self, text: str, **kwargs: Any) -> List[float]:
+        parent = super(CachedGoogleEmbeddings, self)
+        return self.embedding_cache.get_or_compute(
+            self._cache_model(**kwargs),
+            [text],
+            lambda texts: [parent.embed_text(texts[0], **kwargs)],
+        )[0]
+
+    def embed_texts(self, texts: List[str], **kwargs: Any) -> List[List[float]]:
+        parent = super(CachedGoogleEmbeddings, self)
+        return self.embedding_cache.get_or_compute(
+            self._cache_model(**kwargs),
+            list(texts),
+            lambda misses: parent.embed_texts(misses, **kwargs),
+        )
 
 def get_embeddings(client: genai.Client, cache_dir: str = ".ragas_cache"):
     """
@@ -12,16 +48,16 @@ def get_embeddings(client: genai.Client, cache_dir: str = ".ragas_cache"):
 
     Args:
         client: Google GenAI 客户端实例
-        cache_dir: Ragas 缓存目录
+        cache_dir: 缓存目录 (向量缓存位于其下的 embeddings 子目录)
 
     Returns:
-        GoogleEmbeddings: 嵌入模型实例
+        CachedGoogleEmbeddings: 带向量缓存的嵌入模型实例
     """
-    ragas_cache = DiskCacheBackend(cache_dir=cache_dir)
-    return GoogleEmbeddings(
+    embedding_cache = get_embedding_cache(os.path.join(cache_dir, "embeddings"))
+    return CachedGoogleEmbeddings(
         model="gemini-embedding-001",
         client=client,
-        cache=ragas_cache
+        embedding_cache=embedding_cache
     )
 
 def get_ragas_models(client: genai.Client, model_name: str, cache_dir: str = ".ragas_cache"):
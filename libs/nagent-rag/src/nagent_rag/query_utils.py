@@ -1,6 +1,7 @@
-from typing import List, Any
+from typing import List, Any, Dict
 import logging
 from nagent_core.llm import LLMClient
+from nagent_core.tool import run_in_tool_executor
 
 logger = logging.getLogger(__name__)
 
@@ -13,25 +14,44 @@ class QueryRewriter:
         self.llm_client = LLMClient(client)
         self.model_name = model_name
 
-    def rewrite(self, query: str) -> str:
-        """
-        将原始查询改写为更适合检索的关键词或短语。
-        """
-        prompt = f"""
+    def _build_prompt(self, query: str) -> str:
+        return f"""
 你是一个搜索专家。请将以下用户查询改写为更适合在文档库中进行关键词检索的短语或问题。
 目标是提高检索的相关性。只输出改写后的文本，不要有任何解释。
 
 原始查询: {query}
 
 改写后的查询:"""
+
+    def _parse_response(self, query: str, response: Any) -> str:
+        rewritten_query = response.text.strip()
+        logger.info(f"Query rewritten: '{query}' -> '{rewritten_query}'")
+        return rewritten_query
+
+    def rewrite(self, query: str) -> str:
+        """
+        将原始查询改写为更适合检索的关键词或短语。
+        """
         try:
             response = self.llm_client.generate_content(
                 model=self.model_name,
-                contents=prompt,
+                contents=self._build_prompt(query),
+            )
+            return self._parse_response(query, response)
+        except Exception as e:
+            logger.error(f"Error rewriting query: {e}")
+            return query
+
+    async def arewrite(self, query: str) -> str:
+        """
+        rewrite 的异步版本。
+        """
+        try:
+            response = await self.llm_client.agenerate_content(
+                model=self.model_name,
+                contents=self._build_prompt(query),
             )
-            rewritten_query = response.text.strip()
-            logger.info(f"Query rewritten: '{query}' -> '{rewritten_query}'")
-            return rewritten_query
+            return self._parse_response(query, response)
         except Exception as e:
             logger.error(f"Error rewriting query: {e}")
             return query
@@ -45,29 +65,84 @@ class QueryDecomposer:
         self.llm_client = LLMClient(client)
         self.model_name = model_name
 
-    def decompose(self, query: str) -> List[str]:
-        """
-        将复杂查询拆分为子查询列表。
-        """
-        prompt = f"""
+    def _build_prompt(self, query: str) -> str:
+        return f"""
 你是一个分析专家。请将以下复杂的查询拆分为 2-3 个更简单的、可以独立检索或回答的子查询。
 每个子查询应该是一行。不要输出任何其他内容。
 
 复杂查询: {query}
 
 子查询列表:"""
+
+    def _parse_response(self, query: str, response: Any) -> List[str]:
+        sub_queries = [q.strip() for q in response.text.strip().split("\n") if q.strip()]
+        logger.info(f"Query decomposed: '{query}' -> {sub_queries}")
+        return sub_queries if sub_queries else [query]
+
+    def decompose(self, query: str) -> List[str]:
+        """
+        将复杂查询拆分为子查询列表。
+        """
         try:
             response = self.llm_client.generate_content(
                 model=self.model_name,
-                contents=prompt,
+                contents=self._build_prompt(query),
             )
-            sub_queries = [q.strip() for q in response.text.strip().split("\n") if q.strip()]
-            logger.info(f"Query decomposed: '{query}' -> {sub_queries}")
-            return sub_queries if sub_queries else [query]
+            return self._parse_response(query, response)
         except Exception as e:
             logger.error(f"Error decomposing query: {e}")
             return [query]
 
+    async def adecompose(self, query: str) -> List[str]:
+        """
+        decompose 的异步版本。
+        """
+        try:
+            response = await self.llm_client.agenerate_content(
+                model=self.model_name,
+                contents=self._build_prompt(query),
+            )
+            return self._parse_response(query, response)
+        except Exception as e:
+            logger.error(f"Error decomposing query: {e}")
+            return [query]
+
+    def retrieve_sub_queries(self, sub_queries: List[str], retriever, k: int = 3) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        通过一次批量检索 (get_top_k_batch) 获取所有子查询的结果。
+        """
+        if not sub_queries:
+            return {}
+        return dict(zip(sub_queries, retriever.get_top_k_batch(sub_queries, k=k)))
+
+    async def aretrieve_sub_queries(self, sub_queries: List[str], retriever, k: int = 3) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        retrieve_sub_queries 的异步版本：批量检索在共享执行器中运行，不阻塞事件循环。
+        """
+        return await run_in_tool_executor(self.retrieve_sub_queries, sub_queries, retriever, k)
+
+def merge_sub_query_results(results: Dict[str, List[Dict[str, Any]]], max_docs: int = None) -> List[Dict[str, Any]]:
+    """
+    合并各子查询的检索结果：按排名轮流取各子查询的文档，并按 id (无 id 时按内容) 去重。
+    """
+    merged = []
+    seen = set()
+    ranked_lists = list(results.values())
+    depth = max((len(docs) for docs in ranked_lists), default=0)
+    for rank in range(depth):
+        for docs in ranked_lists:
+            if rank >= len(docs):
+                continue
+            doc = docs[rank]
+            key = ("id", str(doc["id"])) if "id" in doc else ("content", doc.get("content", ""))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(doc)
+            if max_docs is not None and len(merged) >= max_docs:
+                return merged
+    return merged
+
 def simple_query_expansion(query: str) -> List[str]:
     """
     简单的查询扩展逻辑。目前仅返回原查询。
@@ -1,11 +1,17 @@
 from .base import BaseRetriever
 from .keyword import SimpleKeywordRetriever
+from .bm25 import BM25Retriever
 from .vector import BaseVectorRetriever
 from .chroma import ChromaRetriever
+from .numpy_vector import NumpyVectorRetriever
+from .hybrid import HybridRetriever
 
 __all__ = [
     "BaseRetriever",
     "SimpleKeywordRetriever",
+    "BM25Retriever",
     "BaseVectorRetriever",
-    "ChromaRetriever"
+    "ChromaRetriever",
+    "NumpyVectorRetriever",
+    "HybridRetriever"
 ]
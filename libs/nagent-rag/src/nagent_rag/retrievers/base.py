@@ -1,4 +1,5 @@
 from typing import List, Any, Dict
+from nagent_core.tool import run_in_tool_executor
 
 class BaseRetriever:
     """
@@ -6,12 +7,15 @@ class BaseRetriever:
     Subclasses should implement the fit, get_top_k, save_index and load_index methods.
     """
 
+    # Direction of the `_score` field in results (e.g. distances are lower-is-better)
+    higher_score_is_better = True
+
     def __init__(self):
         self.documents: List[Dict[str, Any]] = []
 
-    def fit(self, documents: List[Any]):
+    def _normalize_documents(self, documents: List[Any]) -> List[Dict[str, Any]]:
         """
-        Store the documents.
+        Normalize input documents into dicts.
         Each document should be a dict with at least 'content' key,
         or a simple string (which will be converted to a dict).
         Optional keys: 'id', 'metadata'.
@@ -25,12 +29,60 @@ class BaseRetriever:
             else:
                 # Fallback for other types
                 normalized_docs.append({"content": str(doc)})
-        self.documents = normalized_docs
+        return normalized_docs
+
+    def fit(self, documents: List[Any]):
+        """
+        Store the documents, replacing any existing ones.
+        See _normalize_documents for the accepted document formats.
+        """
+        self.documents = self._normalize_documents(documents)
+
+    def add_documents(self, documents: List[Any]):
+        """
+        Add documents to the existing index.
+        The default implementation refits on the whole corpus;
+        subclasses should override it to index only the new documents.
+        """
+        self.fit(list(self.documents) + self._normalize_documents(documents))
+
+    def delete_documents(self, ids: List[Any]):
+        """
+        Delete documents by their 'id'.
+        The default implementation refits on the remaining documents.
+        """
+        id_set = {str(doc_id) for doc_id in ids}
+        self.fit([doc for doc in self.documents if "id" not in doc or str(doc["id"]) not in id_set])
+
+    def update_documents(self, documents: List[Any]):
+        """
+        Replace documents that share an 'id' with the given ones;
+        documents with unknown or missing ids are added.
+        """
+        new_docs = self._normalize_documents(documents)
+        self.delete_documents([doc["id"] for doc in new_docs if "id" in doc])
+        self.add_documents(new_docs)
 
     def get_top_k(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
         """Retrieve top-k most relevant documents for the query."""
         raise NotImplementedError("Subclasses should implement this method.")
 
+    async def aget_top_k(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Async variant of get_top_k().
+        The default implementation runs get_top_k in the shared tool executor
+        so it does not block the event loop; subclasses with async I/O should override it.
+        """
+        return await run_in_tool_executor(self.get_top_k, query, k=k)
+
+    def get_top_k_batch(self, queries: List[str], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve top-k documents for each query, in order.
+        The default implementation loops over get_top_k;
+        subclasses should override it with a native batched implementation.
+        """
+        return [self.get_top_k(query, k=k) for query in queries]
+
     def save_index(self, file_path: str):
         """Save the index and documents to a file."""
         raise NotImplementedError("Subclasses should implement this method.")
@@ -0,0 +1,433 @@
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from typing import List, Any, Dict, Optional, Tuple
+from .keyword import SimpleKeywordRetriever
+
+# Binary index layout (all integers little-endian):
+#   header:   magic (8 bytes) + (offset, length) uint64 pair per section
+#   meta:     JSON (tokenizer, k1, b, avgdl)
+#   vocab:    term byte offsets uint64[n_terms + 1] + utf-8 term blob (sorted)
+#   postings: per-term start uint64[n_terms + 1] + doc ids uint32[] + tfs uint32[]
+#   docs:     lengths uint32[n_docs] + doc offsets uint64[n_docs + 1] + JSON blob
+_MAGIC = b"NBM25IX1"
+_SECTIONS = (
+    "meta", "term_offsets", "terms", "post_offsets",
+    "post_docs", "post_tfs", "doc_lens", "doc_offsets", "doc_blob",
+)
+_HEADER = struct.Struct("<8s" + "QQ" * len(_SECTIONS))
+
+
+class _MappedDocuments(Sequence):
+    """Read-only document sequence decoded lazily from the mapped content blob"""
+
+    def __init__(self, index: "_MappedIndex"):
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index.doc_lens)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("document index out of range")
+        return self._index.document(i)
+
+
+class _MappedIndex:
+    """
+    Memory-mapped view over a binary BM25 index file.
+    Nothing is decoded up front; pages are shared between processes
+    mapping the same file.
+    """
+
+    def __init__(self, file_path: str):
+        with open(file_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        fields = _HEADER.unpack_from(self._mm, 0)
+        if fields[0] != _MAGIC:
+            raise ValueError(f"Not a BM25 index file: {file_path}")
+        self._sections = {
+            name: (fields[1 + 2 * i], fields[2 + 2 * i])
+            for i, name in enumerate(_SECTIONS)
+        }
+
+        self.meta = json.loads(self._raw("meta"))
+        self.term_offsets = self._view("term_offsets", "Q")
+        self.post_offsets = self._view("post_offsets", "Q")
+        self.post_docs = self._view("post_docs", "I")
+        self.post_tfs = self._view("post_tfs", "I")
+        self.doc_lens = self._view("doc_lens", "I")
+        self.doc_offsets = self._view("doc_offsets", "Q")
+        self._terms_start = self._sections["terms"][0]
+        self._blob_start = self._sections["doc_blob"][0]
+        self.n_terms = len(self.term_offsets) - 1
+
+    def _raw(self, name: str) -> bytes:
+        start, length = self._sections[name]
+        return self._mm[start:start + length]
+
+    def _view(self, name: str, fmt: str) -> memoryview:
+        start, length = self._sections[name]
+        return memoryview(self._mm)[start:start + length].cast(fmt)
+
+    def _term_at(self, i: int) -> bytes:
+        base = self._terms_start
+        return self._mm[base + self.term_offsets[i]:base + self.term_offsets[i + 1]]
+
+    def postings(self, term: str) -> Optional[List[Tuple[int, int]]]:
+        """Binary-search the sorted vocabulary and return the term's postings"""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.n_terms or self._term_at(lo) != key:
+            return None
+        start, end = self.post_offsets[lo], self.post_offsets[lo + 1]
+        return list(zip(self.post_docs[start:end], self.post_tfs[start:end]))
+
+    def document(self, i: int) -> Dict[str, Any]:
+        base = self._blob_start
+        return json.loads(self._mm[base + self.doc_offsets[i]:base + self.doc_offsets[i + 1]])
+
+    def close(self):
+        """Release the array views (they pin the buffer) and unmap the file"""
+        for view in (self.term_offsets, self.post_offsets, self.post_docs,
+                     self.post_tfs, self.doc_lens, self.doc_offsets):
+            view.release()
+        self._mm.close()
+
+    def iter_postings(self):
+        """Yield (term, postings) for every term, in vocabulary order"""
+        for i in range(self.n_terms):
+            start, end = self.post_offsets[i], self.post_offsets[i + 1]
+            yield (
+                self._term_at(i).decode("utf-8"),
+                list(zip(self.post_docs[start:end], self.post_tfs[start:end])),
+            )
+
+
+def _le_bytes(values: array) -> bytes:
+    """Serialize an array in little-endian byte order"""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class BM25Retriever(SimpleKeywordRetriever):
+    """
+    Keyword retriever backed by an inverted index with BM25 scoring.
+
+    Documents are tokenized once at fit() time into postings lists
+    (term -> {doc_idx: term_freq}), so a query only touches the
+    postings of its own terms instead of scanning the whole corpus.
+    add/delete/update_documents patch the postings of the affected
+    documents only. save_index() writes a compact binary index that
+    load_index() maps into memory and serves from lazily.
+    """
+
+    def __init__(self, tokenizer: str = "split", k1: float = 1.5, b: float = 0.75):
+        super().__init__(tokenizer=tokenizer)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_lens: Sequence = []
+        self._total_len: int = 0
+        self._avgdl: float = 0.0
+        self._id_to_idx: Optional[Dict[str, int]] = None
+        self._mapped: Optional[_MappedIndex] = None
+
+    def _terms(self, text: str) -> List[str]:
+        """Tokenize text and drop whitespace-only tokens (jieba emits them)"""
+        return [t for t in self._tokenize(text) if t.strip()]
+
+    def fit(self, documents: List[Any]):
+        """Store the documents and build the inverted index"""
+        super().fit(documents)
+        self._build_index()
+
+    def _build_index(self):
+        """Tokenize every document once and build postings lists"""
+        self._close_mapped()
+        self._postings = {}
+        self._doc_lens = []
+        self._total_len = 0
+        self._id_to_idx = None
+        for doc_idx, doc in enumerate(self.documents):
+            self._index_document(doc_idx, doc)
+        self._update_avgdl()
+
+    def _update_avgdl(self):
+        n = len(self._doc_lens)
+        self._avgdl = self._total_len / n if n else 0.0
+
+    def _index_document(self, doc_idx: int, doc: Dict[str, Any]):
+        """Add postings for the document stored (or appended) at doc_idx"""
+        terms = self._terms(doc.get("content", ""))
+        if doc_idx == len(self._doc_lens):
+            self._doc_lens.append(len(terms))
+        else:
+            self._doc_lens[doc_idx] = len(terms)
+        self._total_len += len(terms)
+        for term, tf in Counter(terms).items():
+            self._postings.setdefault(term, {})[doc_idx] = tf
+        if self._id_to_idx is not None and "id" in doc:
+            self._id_to_idx[str(doc["id"])] = doc_idx
+
+    def _unindex_document(self, doc_idx: int):
+        """Remove the postings of the document at doc_idx"""
+        doc = self.documents[doc_idx]
+        for term in set(self._terms(doc.get("content", ""))):
+            postings = self._postings[term]
+            del postings[doc_idx]
+            if not postings:
+                del self._postings[term]
+        self._total_len -= self._doc_lens[doc_idx]
+        if self._id_to_idx is not None and "id" in doc:
+            self._id_to_idx.pop(str(doc["id"]), None)
+
+    def _move_document(self, src: int, dst: int):
+        """Relocate the document at src into the free slot dst"""
+        doc = self.documents[src]
+        for term in set(self._terms(doc.get("content", ""))):
+            postings = self._postings[term]
+            postings[dst] = postings.pop(src)
+        self.documents[dst] = doc
+        self._doc_lens[dst] = self._doc_lens[src]
+        if self._id_to_idx is not None and "id" in doc:
+            self._id_to_idx[str(doc["id"])] = dst
+
+    def _id_index(self) -> Dict[str, int]:
+        """Map document ids to positions, built on first use"""
+        if self._id_to_idx is None:
+            self._id_to_idx = {
+                str(doc["id"]): idx for idx, doc in enumerate(self.documents) if "id" in doc
+            }
+        return self._id_to_idx
+
+    def add_documents(self, documents: List[Any]):
+        """
+        Index only the new documents. Ids that are already indexed are
+        replaced in place (upsert, like Chroma) rather than indexed twice.
+        """
+        self.update_documents(documents)
+
+    def delete_documents(self, ids: List[Any]):
+        """
+        Remove documents by id. The last document is moved into each freed
+        slot, so only the postings of the deleted and moved documents change.
+        """
+        self._materialize()
+        id_index = self._id_index()
+        for doc_id in ids:
+            doc_idx = id_index.get(str(doc_id))
+            if doc_idx is None:
+                continue
+            self._unindex_document(doc_idx)
+            last = len(self.documents) - 1
+            if doc_idx != last:
+                self._move_document(last, doc_idx)
+            self.documents.pop()
+            self._doc_lens.pop()
+        self._update_avgdl()
+
+    def update_documents(self, documents: List[Any]):
+        """Re-index documents in place by id; unknown ids are added"""
+        self._materialize()
+        id_index = self._id_index()
+        for doc in self._normalize_documents(documents):
+            doc_idx = id_index.get(str(doc["id"])) if "id" in doc else None
+            if doc_idx is None:
+                self.documents.append(doc)
+                doc_idx = len(self.documents) - 1
+            else:
+                self._unindex_document(doc_idx)
+                self.documents[doc_idx] = doc
+            self._index_document(doc_idx, doc)
+        self._update_avgdl()
+
+    def _get_postings(self, term: str):
+        """Return the (doc_idx, tf) pairs of a term, or None"""
+        if self._mapped is not None:
+            return self._mapped.postings(term)
+        postings = self._postings.get(term)
+        return postings.items() if postings else None
+
+    def _idf(self, df: int) -> float:
+        """BM25 inverse document frequency (always positive)"""
+        n = len(self._doc_lens)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def _term_scores(self, term: str) -> List[Tuple[int, float]]:
+        """BM25 contribution of a term to every document in its postings"""
+        postings = self._get_postings(term)
+        if not postings:
+            return []
+
+        k1, b = self.k1, self.b
+        avgdl = self._avgdl or 1.0
+        doc_lens = self._doc_lens
+        idf = self._idf(len(postings))
+        contributions = []
+        for doc_idx, tf in postings:
+            norm = k1 * (1.0 - b + b * doc_lens[doc_idx] / avgdl)
+            contributions.append((doc_idx, idf * tf * (k1 + 1.0) / (tf + norm)))
+        return contributions
+
+    def get_top_k(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Get top k documents by BM25 score"""
+        return self.get_top_k_batch([query], k=k)[0]
+
+    def get_top_k_batch(self, queries: List[str], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Get top k documents for several queries. Each distinct term's
+        postings are looked up and scored once for the whole batch.
+        """
+        query_terms = [set(self._terms(query)) for query in queries]
+        term_scores: Dict[str, List[Tuple[int, float]]] = {}
+        if self._doc_lens:
+            for terms in query_terms:
+                for term in terms:
+                    if term not in term_scores:
+                        term_scores[term] = self._term_scores(term)
+
+        results = []
+        for terms in query_terms:
+            scores: Dict[int, float] = defaultdict(float)
+            for term in terms:
+                for doc_idx, score in term_scores.get(term, ()):
+                    scores[doc_idx] += score
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+            docs = []
+            for doc_idx, score in top:
+                doc_with_score = self.documents[doc_idx].copy()
+                doc_with_score["_score"] = score
+                docs.append(doc_with_score)
+            results.append(docs)
+        return results
+
+    def _materialize(self):
+        """Copy a memory-mapped index into in-memory structures"""
+        if self._mapped is None:
+            return
+        mapped = self._mapped
+        self.documents = list(self.documents)
+        self._postings = {term: dict(pairs) for term, pairs in mapped.iter_postings()}
+        self._doc_lens = list(mapped.doc_lens)
+        self._total_len = sum(self._doc_lens)
+        self._id_to_idx = None
+        self._close_mapped()
+
+    def _close_mapped(self):
+        """Unmap the current binary index, if any"""
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def save_index(self, file_path: str):
+        """Save documents and the inverted index in the binary format"""
+        self._materialize()
+
+        terms = sorted(self._postings, key=lambda t: t.encode("utf-8"))
+        term_offsets, post_offsets = array("Q", [0]), array("Q", [0])
+        post_docs, post_tfs = array("I"), array("I")
+        term_blob = bytearray()
+        for term in terms:
+            term_blob += term.encode("utf-8")
+            term_offsets.append(len(term_blob))
+            for doc_idx, tf in self._postings[term].items():
+                post_docs.append(doc_idx)
+                post_tfs.append(tf)
+            post_offsets.append(len(post_docs))
+
+        doc_offsets = array("Q", [0])
+        doc_blob = bytearray()
+        for doc in self.documents:
+            doc_blob += json.dumps(doc, ensure_ascii=False).encode("utf-8")
+            doc_offsets.append(len(doc_blob))
+
+        meta = {"tokenizer": self.tokenizer, "k1": self.k1, "b": self.b, "avgdl": self._avgdl}
+        payloads = {
+            "meta": json.dumps(meta).encode("utf-8"),
+            "term_offsets": _le_bytes(term_offsets),
+            "terms": bytes(term_blob),
+            "post_offsets": _le_bytes(post_offsets),
+            "post_docs": _le_bytes(post_docs),
+            "post_tfs": _le_bytes(post_tfs),
+            "doc_lens": _le_bytes(array("I", self._doc_lens)),
+            "doc_offsets": _le_bytes(doc_offsets),
+            "doc_blob": bytes(doc_blob),
+        }
+
+        # Sections are 8-byte aligned so they can be cast in place after mmap
+        layout = []
+        pos = _HEADER.size
+        for name in _SECTIONS:
+            pos += -pos % 8
+            layout.append((pos, len(payloads[name])))
+            pos += len(payloads[name])
+
+        # Write to a temp file and rename, so processes still mapping the
+        # old file keep a consistent view
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, *[v for pair in layout for v in pair]))
+            for name, (offset, _) in zip(_SECTIONS, layout):
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(payloads[name])
+        os.replace(tmp_path, file_path)
+
+    def load_index(self, file_path: str):
+        """
+        Memory-map a binary index; documents are decoded only when returned.
+        Falls back to the JSON document format of SimpleKeywordRetriever.
+        """
+        with open(file_path, "rb") as f:
+            magic = f.read(len(_MAGIC))
+
+        if magic != _MAGIC:
+            super().load_index(file_path)
+            self._build_index()
+            return
+
+        if sys.byteorder != "little":
+            raise ValueError("Memory-mapped BM25 indexes require a little-endian host.")
+
+        mapped = _MappedIndex(file_path)
+        self._close_mapped()
+        self.tokenizer = mapped.meta["tokenizer"]
+        self.k1 = mapped.meta["k1"]
+        self.b = mapped.meta["b"]
+        self._avgdl = mapped.meta["avgdl"]
+        self._postings = {}
+        self._id_to_idx = None
+        self._doc_lens = mapped.doc_lens
+        self._mapped = mapped
+        self.documents = _MappedDocuments(mapped)
+
+    def clear(self):
+        """Clear documents and the inverted index"""
+        super().clear()
+        self._postings = {}
+        self._doc_lens = []
+        self._total_len = 0
+        self._avgdl = 0.0
+        self._id_to_idx = None
+        self._close_mapped()
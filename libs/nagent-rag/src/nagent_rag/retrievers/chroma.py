@@ -1,7 +1,14 @@
 import os
+import time
 import uuid
+import asyncio
+import inspect
+import logging
 from typing import List, Any, Dict, Optional
+from nagent_core.tool import run_in_tool_executor
+from nagent_core.utils import run_sync
 from .vector import BaseVectorRetriever
+from ..embedding_cache import EmbeddingCache
 
 try:
     import chromadb
@@ -13,12 +20,17 @@ except ImportError:
     Documents = Any
     Embeddings = Any
 
+logger = logging.getLogger(__name__)
+
 class RagasEmbeddingWrapper:
     """
     Wrapper to use Ragas embeddings with ChromaDB.
+    If an EmbeddingCache is given, only texts missing from the cache are embedded.
     """
-    def __init__(self, ragas_embeddings: Any):
+    def __init__(self, ragas_embeddings: Any, cache: Optional[EmbeddingCache] = None):
         self.ragas_embeddings = ragas_embeddings
+        self.cache = cache
+        self.model = getattr(ragas_embeddings, "model", type(ragas_embeddings).__name__)
 
     def name(self) -> str:
         return "ragas_embedding_wrapper"
@@ -27,6 +39,11 @@ class RagasEmbeddingWrapper:
         return self.embed_documents(input)
 
     def embed_documents(self, input: Documents) -> Embeddings:
+        if self.cache is not None:
+            return self.cache.get_or_compute(self.model, list(input), self._embed_documents)
+        return self._embed_documents(input)
+
+    def _embed_documents(self, input: Documents) -> Embeddings:
         # GoogleEmbeddings uses embed_texts for list of documents
         if hasattr(self.ragas_embeddings, "embed_texts"):
             return self.ragas_embeddings.embed_texts(input)
@@ -36,6 +53,11 @@ class RagasEmbeddingWrapper:
             raise AttributeError(f"Embedding object {type(self.ragas_embeddings)} has no embed_texts or embed_documents method")
 
     def embed_query(self, input: Documents) -> Embeddings:
+        if self.cache is not None:
+            return self.cache.get_or_compute(self.model, list(input), self._embed_query)
+        return self._embed_query(input)
+
+    def _embed_query(self, input: Documents) -> Embeddings:
         # ChromaDB query_texts can pass a list of query strings (even for a single query)
         if hasattr(self.ragas_embeddings, "embed_texts"):
             # Ragas GoogleEmbeddings expects a list of texts for embed_texts
@@ -46,16 +68,42 @@ class RagasEmbeddingWrapper:
         else:
             raise AttributeError(f"Embedding object {type(self.ragas_embeddings)} has no embed_text or embed_query method")
 
+    async def aembed_query(self, input: Documents) -> Embeddings:
+        """Async variant of embed_query()."""
+        if self.cache is not None:
+            return await self.cache.aget_or_compute(self.model, list(input), self._aembed_query)
+        return await self._aembed_query(input)
+
+    async def _aembed_query(self, input: Documents) -> Embeddings:
+        # Prefer the embeddings' native async API; otherwise run the sync call in the shared tool executor
+        aembed_texts = getattr(self.ragas_embeddings, "aembed_texts", None)
+        aembed_query = getattr(self.ragas_embeddings, "aembed_query", None)
+        if hasattr(self.ragas_embeddings, "embed_texts") and inspect.iscoroutinefunction(aembed_texts):
+            return await aembed_texts(list(input))
+        if not hasattr(self.ragas_embeddings, "embed_texts") and inspect.iscoroutinefunction(aembed_query):
+            return list(await asyncio.gather(*(aembed_query(q) for q in input)))
+        return await run_in_tool_executor(self._embed_query, input)
+
 class ChromaRetriever(BaseVectorRetriever):
     """
     Retriever implementation using ChromaDB.
+
+    Ingestion is split into batches of `batch_size`; with a custom embedding
+    function, batches are embedded concurrently (at most `max_concurrency`
+    requests in flight) and written to Chroma as their embeddings land.
     """
 
+    # Chroma returns distances in `_score`
+    higher_score_is_better = False
+
     def __init__(
         self,
         collection_name: str = "default_collection",
         persist_directory: str = "./chroma_db",
-        embedding_function: Optional[Any] = None
+        embedding_function: Optional[Any] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        batch_size: int = 100,
+        max_concurrency: int = 4
     ):
         super().__init__()
         if chromadb is None:
@@ -63,6 +111,9 @@ class ChromaRetriever(BaseVectorRetriever):
 
         self.persist_directory = persist_directory
         self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.last_ingest_stats: Dict[str, float] = {}
 
         # Ensure directory exists
         if not os.path.exists(persist_directory):
@@ -72,9 +123,11 @@ class ChromaRetriever(BaseVectorRetriever):
 
         # Use custom embedding function if provided
         self.embedding_function = embedding_function
+        self.embedding_cache = embedding_cache
         chroma_ef = None
         if embedding_function:
-            chroma_ef = RagasEmbeddingWrapper(embedding_function)
+            chroma_ef = RagasEmbeddingWrapper(embedding_function, cache=embedding_cache)
+        self._chroma_ef = chroma_ef
 
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
@@ -86,21 +139,49 @@ class ChromaRetriever(BaseVectorRetriever):
         Store the documents into Chroma.
         """
         super().fit(documents)
-        
-        if not self.documents:
+        self._upsert(self.documents)
+
+    def _upsert(self, documents: List[Dict[str, Any]]):
+        """
+        Upsert the given (normalized) documents into the collection in batches.
+        Documents without an id get a generated one.
+        """
+        if not documents:
             return
-            
+
+        batches = []
+        for start in range(0, len(documents), self.batch_size):
+            batches.append(self._prepare_batch(documents[start:start + self.batch_size]))
+
+        started = time.perf_counter()
+        if self._chroma_ef is None:
+            # Chroma embeds with its own default function
+            for ids, texts, metadatas in batches:
+                self.collection.upsert(ids=ids, documents=texts, metadatas=metadatas)
+        else:
+            run_sync(self._aupsert_batches(batches, started))
+
+        elapsed = time.perf_counter() - started
+        self.last_ingest_stats = {
+            "documents": len(documents),
+            "batches": len(batches),
+            "seconds": elapsed,
+            "docs_per_second": len(documents) / elapsed if elapsed > 0 else float("inf"),
+        }
+
+    def _prepare_batch(self, documents: List[Dict[str, Any]]):
+        """Build (ids, texts, metadatas) for a batch of documents."""
         ids = []
         texts = []
         metadatas = []
-        
-        for idx, doc in enumerate(self.documents):
+
+        for doc in documents:
             doc_id = doc.get("id", str(uuid.uuid4()))
             doc["id"] = doc_id  # Update original doc with generated ID
-            
+
             ids.append(doc_id)
             texts.append(doc.get("content", ""))
-            
+
             # Extract metadata and convert nested dicts or non-primitive types if needed
             meta = doc.get("metadata", {})
             # Chroma requires metadata values to be str, int, float or bool
@@ -112,11 +193,82 @@ class ChromaRetriever(BaseVectorRetriever):
                     safe_meta[k] = str(v)
             metadatas.append(safe_meta if safe_meta else None)
 
-        self.collection.upsert(
-            ids=ids,
-            documents=texts,
-            metadatas=metadatas
-        )
+        return ids, texts, metadatas
+
+    async def _aupsert_batches(self, batches: List[tuple], started: float):
+        """
+        Embed batches with a bounded worker pool and upsert them as they finish.
+        The bounded hand-off queue applies backpressure when writes fall behind.
+        """
+        pending: asyncio.Queue = asyncio.Queue()
+        for batch in batches:
+            pending.put_nowait(batch)
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency)
+        total = sum(len(ids) for ids, _, _ in batches)
+
+        async def embed_worker():
+            while True:
+                try:
+                    ids, texts, metadatas = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                embeddings = await asyncio.to_thread(self._chroma_ef.embed_documents, texts)
+                await embedded.put((ids, texts, metadatas, embeddings))
+
+        async def writer():
+            written = 0
+            for _ in range(len(batches)):
+                ids, texts, metadatas, embeddings = await embedded.get()
+                await asyncio.to_thread(
+                    self.collection.upsert,
+                    ids=ids,
+                    documents=texts,
+                    metadatas=metadatas,
+                    embeddings=embeddings,
+                )
+                written += len(ids)
+                elapsed = time.perf_counter() - started
+                rate = written / elapsed if elapsed > 0 else float("inf")
+                logger.info(f"Ingested {written}/{total} documents ({rate:.1f} docs/s)")
+
+        tasks = [asyncio.create_task(embed_worker()) for _ in range(min(self.max_concurrency, len(batches)))]
+        tasks.append(asyncio.create_task(writer()))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def add_documents(self, documents: List[Any]):
+        """
+        Upsert (and embed) only the new documents. Ids that already exist
+        replace the stored document instead of being listed twice.
+        """
+        self.update_documents(documents)
+
+    def delete_documents(self, ids: List[Any]):
+        """
+        Delete documents by id from the collection.
+        """
+        id_list = [str(doc_id) for doc_id in ids]
+        if not id_list:
+            return
+        self.collection.delete(ids=id_list)
+
+        id_set = set(id_list)
+        self.documents = [doc for doc in self.documents if str(doc.get("id")) not in id_set]
+
+    def update_documents(self, documents: List[Any]):
+        """
+        Re-embed and overwrite documents by id (Chroma upsert semantics).
+        """
+        new_docs = self._normalize_documents(documents)
+        self._upsert(new_docs)
+
+        updated = {str(doc["id"]): doc for doc in new_docs}
+        remaining = [doc for doc in self.documents if str(doc.get("id")) not in updated]
+        self.documents = remaining + new_docs
 
     def embed_query(self, query: str) -> List[float]:
         """
@@ -145,37 +297,65 @@ class ChromaRetriever(BaseVectorRetriever):
         raise ValueError("No embedding function provided to ChromaRetriever. Cannot embed documents.")
 
     def similarity_search_by_vector(self, embedding: List[float], k: int = 3) -> List[Dict[str, Any]]:
+        return self.similarity_search_by_vectors([embedding], k=k)[0]
+
+    def similarity_search_by_vectors(self, embeddings: List[List[float]], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """Search by several vectors with a single Chroma query."""
         results = self.collection.query(
-            query_embeddings=[embedding],
+            query_embeddings=embeddings,
             n_results=k
         )
-        return self._format_results(results)
+        return [self._format_results(results, i) for i in range(len(embeddings))]
 
     def get_top_k(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
         """
         Use Chroma's built-in text querying.
         If an embedding function was provided at init, Chroma will use it automatically.
         """
+        return self.get_top_k_batch([query], k=k)[0]
+
+    async def aembed_query(self, query: str) -> List[float]:
+        if self._chroma_ef is not None:
+            return (await self._chroma_ef.aembed_query([query]))[0]
+        return await super().aembed_query(query)
+
+    async def aget_top_k(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        With a custom embedding function, the query is embedded asynchronously
+        (through the embedding cache) and only the Chroma lookup runs in the
+        shared tool executor. Otherwise the whole query runs in the executor,
+        since Chroma embeds it with its own default function.
+        """
+        if self._chroma_ef is None:
+            return await run_in_tool_executor(self.get_top_k, query, k=k)
+        return await super().aget_top_k(query, k=k)
+
+    def get_top_k_batch(self, queries: List[str], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Query Chroma once for all queries; the embedding function
+        is called once with the whole batch.
+        """
+        if not queries:
+            return []
         results = self.collection.query(
-            query_texts=[query],
+            query_texts=list(queries),
             n_results=k
         )
-        return self._format_results(results)
-        
-    def _format_results(self, results: Dict) -> List[Dict[str, Any]]:
-        """Format Chroma query results into standard dict format."""
+        return [self._format_results(results, i) for i in range(len(queries))]
+
+    def _format_results(self, results: Dict, i: int = 0) -> List[Dict[str, Any]]:
+        """Format the i-th query of Chroma query results into standard dict format."""
         formatted_docs = []
-        
-        if not results.get("documents") or not results["documents"][0]:
+
+        # Chroma returns lists of lists (one list per query)
+        if not results.get("documents") or len(results["documents"]) <= i or not results["documents"][i]:
             return formatted_docs
-            
-        # Chroma returns lists of lists (for batched queries)
-        # We assume single query
-        docs = results["documents"][0]
-        ids = results["ids"][0]
-        metadatas = results["metadatas"][0] if results.get("metadatas") else [None] * len(docs)
-        distances = results["distances"][0] if results.get("distances") else [None] * len(docs)
-        
+
+        docs = results["documents"][i]
+        ids = results["ids"][i]
+        metadatas = results["metadatas"][i] if results.get("metadatas") else [None] * len(docs)
+        distances = results["distances"][i] if results.get("distances") else [None] * len(docs)
+
         for doc, id_, meta, dist in zip(docs, ids, metadatas, distances):
             formatted_doc = {
                 "id": id_,
@@ -185,7 +365,7 @@ class ChromaRetriever(BaseVectorRetriever):
             if meta:
                 formatted_doc["metadata"] = meta
             formatted_docs.append(formatted_doc)
-            
+
         return formatted_docs
 
     def clear(self):
@@ -204,7 +384,8 @@ class ChromaRetriever(BaseVectorRetriever):
         # Recreate an empty collection
         chroma_ef = None
         if self.embedding_function:
-            chroma_ef = RagasEmbeddingWrapper(self.embedding_function)
+            chroma_ef = RagasEmbeddingWrapper(self.embedding_function, cache=self.embedding_cache)
+        self._chroma_ef = chroma_ef
 
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name,
@@ -0,0 +1,163 @@
+import asyncio
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Any, Dict, Optional, Sequence
+from .base import BaseRetriever
+
+class HybridRetriever(BaseRetriever):
+    """
+    Combines a keyword and a vector retriever.
+
+    Both retrievers are queried concurrently for `candidate_k` results each,
+    then fused and de-duplicated by document id (content when there is no id):
+    - "rrf": reciprocal-rank fusion, sum(weight / (rrf_k + rank)); ignores raw scores.
+    - "weighted": min-max normalized scores, combined by weight. Score direction
+      is taken from each retriever's `higher_score_is_better`.
+    The fused value is returned in `_score` (higher is better).
+
+    `documents` is a view of the keyword retriever's documents (not a copy,
+    so a memory-mapped BM25 index stays lazy). Call close() to stop the
+    worker threads.
+    """
+
+    def __init__(
+        self,
+        keyword_retriever: BaseRetriever,
+        vector_retriever: BaseRetriever,
+        fusion: str = "rrf",
+        weights: Sequence[float] = (1.0, 1.0),
+        rrf_k: int = 60,
+        candidate_k: Optional[int] = None
+    ):
+        super().__init__()
+        if fusion not in ("rrf", "weighted"):
+            raise ValueError(f"Unknown fusion method: {fusion}. Use 'rrf' or 'weighted'.")
+        self.retrievers = [keyword_retriever, vector_retriever]
+        self.fusion = fusion
+        self.weights = list(weights)
+        self.rrf_k = rrf_k
+        self.candidate_k = candidate_k
+        self._executor = ThreadPoolExecutor(max_workers=len(self.retrievers), thread_name_prefix="hybrid-retriever")
+        self._finalizer = weakref.finalize(self, self._executor.shutdown, wait=False)
+
+    @property
+    def documents(self) -> List[Dict[str, Any]]:
+        return self.keyword_retriever.documents
+
+    @documents.setter
+    def documents(self, value):
+        # Documents are owned by the sub-retrievers; BaseRetriever.__init__/clear assignments are ignored
+        pass
+
+    @property
+    def keyword_retriever(self) -> BaseRetriever:
+        return self.retrievers[0]
+
+    @property
+    def vector_retriever(self) -> BaseRetriever:
+        return self.retrievers[1]
+
+    def _each(self, method: str, *args, **kwargs) -> List[Any]:
+        """Call the same method on both retrievers concurrently."""
+        futures = [self._executor.submit(getattr(r, method), *args, **kwargs) for r in self.retrievers]
+        return [future.result() for future in futures]
+
+    def _each_documents(self, method: str, documents: List[Any]):
+        """
+        Normalize once, give documents without an id a shared one, then hand
+        each retriever its own copies (retrievers may mutate the dicts).
+        """
+        docs = [
+            doc if "id" in doc else {**doc, "id": str(uuid.uuid4())}
+            for doc in self._normalize_documents(documents)
+        ]
+        futures = [
+            self._executor.submit(getattr(r, method), [dict(doc) for doc in docs])
+            for r in self.retrievers
+        ]
+        for future in futures:
+            future.result()
+
+    def fit(self, documents: List[Any]):
+        self._each_documents("fit", documents)
+
+    def add_documents(self, documents: List[Any]):
+        self._each_documents("add_documents", documents)
+
+    def delete_documents(self, ids: List[Any]):
+        self._each("delete_documents", ids)
+
+    def update_documents(self, documents: List[Any]):
+        self._each_documents("update_documents", documents)
+
+    @staticmethod
+    def _doc_key(doc: Dict[str, Any]) -> str:
+        return f"id:{doc['id']}" if "id" in doc else f"content:{doc.get('content', '')}"
+
+    def _normalized_scores(self, retriever: BaseRetriever, results: List[Dict[str, Any]]) -> List[float]:
+        scores = [float(doc.get("_score", 0.0)) for doc in results]
+        if not scores:
+            return []
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0] * len(scores)
+        if getattr(retriever, "higher_score_is_better", True):
+            return [(s - low) / (high - low) for s in scores]
+        return [(high - s) / (high - low) for s in scores]
+
+    def _fuse(self, result_lists: List[List[Dict[str, Any]]], k: int) -> List[Dict[str, Any]]:
+        fused: Dict[str, float] = {}
+        docs: Dict[str, Dict[str, Any]] = {}
+        for retriever, weight, results in zip(self.retrievers, self.weights, result_lists):
+            if self.fusion == "rrf":
+                contributions = [weight / (self.rrf_k + rank) for rank in range(1, len(results) + 1)]
+            else:
+                contributions = [weight * s for s in self._normalized_scores(retriever, results)]
+            for doc, contribution in zip(results, contributions):
+                key = self._doc_key(doc)
+                fused[key] = fused.get(key, 0.0) + contribution
+                docs.setdefault(key, doc)
+
+        ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+        results = []
+        for key, score in ranked:
+            doc_with_score = docs[key].copy()
+            doc_with_score["_score"] = score
+            results.append(doc_with_score)
+        return results
+
+    def get_top_k(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        return self.get_top_k_batch([query], k=k)[0]
+
+    async def aget_top_k(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Await both retrievers' async searches concurrently, then fuse."""
+        candidate_k = self.candidate_k or k * 2
+        keyword_results, vector_results = await asyncio.gather(
+            *(retriever.aget_top_k(query, k=candidate_k) for retriever in self.retrievers)
+        )
+        return self._fuse([keyword_results, vector_results], k)
+
+    def get_top_k_batch(self, queries: List[str], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """Run each retriever's batched search concurrently, then fuse per query."""
+        if not queries:
+            return []
+        candidate_k = self.candidate_k or k * 2
+        keyword_batch, vector_batch = self._each("get_top_k_batch", list(queries), k=candidate_k)
+        return [self._fuse([keyword_results, vector_results], k) for keyword_results, vector_results in zip(keyword_batch, vector_batch)]
+
+    def save_index(self, file_path: str):
+        """Save the keyword index to file_path and the vector index to `<file_path>.vector`."""
+        self.keyword_retriever.save_index(file_path)
+        self.vector_retriever.save_index(f"{file_path}.vector")
+
+    def load_index(self, file_path: str):
+        self.keyword_retriever.load_index(file_path)
+        self.vector_retriever.load_index(f"{file_path}.vector")
+
+    def clear(self):
+        self._each("clear")
+
+    def close(self):
+        """Shut down the worker threads."""
+        self._finalizer()
@@ -45,6 +45,26 @@ class SimpleKeywordRetriever(BaseRetriever):
         scored_docs.sort(key=lambda x: x["_score"], reverse=True)
         return scored_docs[:k]
 
+    def get_top_k_batch(self, queries: List[str], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """Get top k documents for several queries, tokenizing each document once"""
+        query_words = [self._tokenize(query) for query in queries]
+        scored: List[List[Dict[str, Any]]] = [[] for _ in queries]
+
+        for doc in self.documents:
+            document_words = set(self._tokenize(doc.get("content", "")))
+            for i, words in enumerate(query_words):
+                match_count = sum(1 for word in words if word in document_words)
+                if match_count > 0:
+                    doc_with_score = doc.copy()
+                    doc_with_score["_score"] = match_count
+                    scored[i].append(doc_with_score)
+
+        results = []
+        for scored_docs in scored:
+            scored_docs.sort(key=lambda x: x["_score"], reverse=True)
+            results.append(scored_docs[:k])
+        return results
+
     def save_index(self, file_path: str):
         """Save documents to a JSON file"""
         with open(file_path, "w", encoding="utf-8") as f:
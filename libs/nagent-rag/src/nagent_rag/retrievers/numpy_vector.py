@@ -0,0 +1,246 @@
+import json
+import os
+from typing import List, Any, Dict, Optional
+import numpy as np
+from .vector import BaseVectorRetriever
+from .chroma import RagasEmbeddingWrapper
+from ..embedding_cache import EmbeddingCache
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so that dot product equals cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first (argpartition + small sort)."""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+class NumpyVectorRetriever(BaseVectorRetriever):
+    """
+    In-process vector retriever on a contiguous float32 matrix.
+
+    Embeddings are L2-normalized, so `_score` is the cosine similarity
+    (higher is better). Search is brute force by default; with `n_lists > 0`
+    a k-means coarse quantizer (IVF) is trained at fit() time and only the
+    `n_probe` closest lists are scanned. save_index() writes the matrix as
+    `<path>.npy`, which load_index() memory-maps.
+    """
+
+    def __init__(
+        self,
+        embedding_function: Optional[Any] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        n_lists: int = 0,
+        n_probe: int = 8,
+        kmeans_iterations: int = 10,
+        seed: int = 0,
+    ):
+        super().__init__()
+        self.embedding_function = embedding_function
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self._embedder = RagasEmbeddingWrapper(embedding_function, cache=embedding_cache) if embedding_function else None
+
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+        self._ivf_lists: List[np.ndarray] = []
+
+    def embed_query(self, query: str) -> List[float]:
+        return self._require_embedder().embed_query([query])[0]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._require_embedder().embed_documents(texts)
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        return self._require_embedder().embed_query(list(queries))
+
+    async def aembed_query(self, query: str) -> List[float]:
+        return (await self._require_embedder().aembed_query([query]))[0]
+
+    def _require_embedder(self) -> RagasEmbeddingWrapper:
+        if self._embedder is None:
+            raise ValueError("No embedding function provided to NumpyVectorRetriever. Cannot embed texts.")
+        return self._embedder
+
+    def _embed_matrix(self, documents: List[Dict[str, Any]]) -> np.ndarray:
+        texts = [doc.get("content", "") for doc in documents]
+        vectors = np.asarray(self.embed_documents(texts), dtype=np.float32)
+        return _normalize_rows(vectors.reshape(len(texts), -1))
+
+    def fit(self, documents: List[Any]):
+        """Embed the documents into the matrix and (optionally) train the IVF index."""
+        super().fit(documents)
+        if self.documents:
+            self._matrix = np.ascontiguousarray(self._embed_matrix(self.documents))
+        else:
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._centroids = None
+        self._assignments = None
+        self._ivf_lists = []
+        if self.n_lists > 0 and len(self.documents) >= self.n_lists:
+            self.build_ivf(self.n_lists)
+
+    # --- IVF ---
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest centroid of each vector, computed in blocks to bound memory."""
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), 65536):
+            block = vectors[start:start + 65536]
+            assignments[start:start + len(block)] = np.argmax(block @ self._centroids.T, axis=1)
+        return assignments
+
+    def build_ivf(self, n_lists: int):
+        """Train a spherical k-means coarse quantizer and build the inverted lists."""
+        data = np.asarray(self._matrix)
+        if n_lists <= 0 or len(data) < n_lists:
+            raise ValueError(f"Need at least n_lists={n_lists} vectors to build an IVF index, got {len(data)}.")
+
+        rng = np.random.default_rng(self.seed)
+        self._centroids = data[rng.choice(len(data), n_lists, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assignments = self._assign(data)
+            sums = np.zeros_like(self._centroids)
+            np.add.at(sums, assignments, data)
+            counts = np.bincount(assignments, minlength=n_lists)
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty lists with random vectors
+                sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+            self._centroids = _normalize_rows(sums).astype(np.float32)
+
+        self.n_lists = n_lists
+        self._assignments = self._assign(data)
+        self._rebuild_lists()
+
+    def _rebuild_lists(self):
+        order = np.argsort(self._assignments, kind="stable")
+        bounds = np.searchsorted(self._assignments[order], np.arange(len(self._centroids) + 1))
+        self._ivf_lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+
+    # --- Search ---
+
+    def _to_results(self, indices: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        results = []
+        for idx, score in zip(indices.tolist(), scores.tolist()):
+            doc_with_score = self.documents[idx].copy()
+            doc_with_score["_score"] = score
+            results.append(doc_with_score)
+        return results
+
+    def _search_ivf(self, query: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        probes = _top_k_indices(self._centroids @ query, min(self.n_probe, len(self._centroids)))
+        candidates = np.concatenate([self._ivf_lists[c] for c in probes])
+        scores = self._matrix[candidates] @ query
+        top = _top_k_indices(scores, k)
+        return self._to_results(candidates[top], scores[top])
+
+    def similarity_search_by_vectors(self, embeddings: List[List[float]], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """Cosine top-k for several query vectors."""
+        if not len(self.documents) or not len(embeddings):
+            return [[] for _ in embeddings]
+        queries = _normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1))
+
+        if self._centroids is not None:
+            return [self._search_ivf(query, k) for query in queries]
+
+        scores = queries @ self._matrix.T
+        results = []
+        for row in scores:
+            top = _top_k_indices(row, k)
+            results.append(self._to_results(top, row[top]))
+        return results
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 3) -> List[Dict[str, Any]]:
+        return self.similarity_search_by_vectors([embedding], k=k)[0]
+
+    # --- Incremental updates ---
+
+    def add_documents(self, documents: List[Any]):
+        """
+        Embed and append only the new documents; they join their nearest IVF list.
+        Ids that are already indexed are replaced rather than stored twice.
+        """
+        new_docs = self._normalize_documents(documents)
+        if not new_docs:
+            return
+        new_ids = {str(doc["id"]) for doc in new_docs if "id" in doc}
+        if new_ids and any("id" in doc and str(doc["id"]) in new_ids for doc in self.documents):
+            self.delete_documents(list(new_ids))
+        vectors = self._embed_matrix(new_docs)
+        if len(self.documents):
+            self._matrix = np.ascontiguousarray(np.vstack([self._matrix, vectors]))
+        else:
+            self._matrix = np.ascontiguousarray(vectors)
+        self.documents = list(self.documents) + new_docs
+
+        if self._centroids is not None:
+            self._assignments = np.concatenate([self._assignments, self._assign(vectors)])
+            self._rebuild_lists()
+        elif self.n_lists > 0 and len(self.documents) >= self.n_lists:
+            self.build_ivf(self.n_lists)
+
+    def delete_documents(self, ids: List[Any]):
+        """Drop rows by document id without re-embedding anything."""
+        id_set = {str(doc_id) for doc_id in ids}
+        keep = np.array([not ("id" in doc and str(doc["id"]) in id_set) for doc in self.documents], dtype=bool)
+        if keep.all():
+            return
+        self.documents = [doc for doc, kept in zip(self.documents, keep) if kept]
+        self._matrix = np.ascontiguousarray(self._matrix[keep])
+        if self._centroids is not None:
+            self._assignments = self._assignments[keep]
+            self._rebuild_lists()
+
+    def update_documents(self, documents: List[Any]):
+        """Re-embed documents by id; unknown ids are added."""
+        self.add_documents(documents)
+
+    # --- Persistence ---
+
+    def save_index(self, file_path: str):
+        """Save documents (JSON), the matrix (`.npy`) and the IVF index (`.ivf.npz`)."""
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(list(self.documents), f, ensure_ascii=False)
+        np.save(f"{file_path}.npy", np.asarray(self._matrix, dtype=np.float32))
+
+        ivf_path = f"{file_path}.ivf.npz"
+        if self._centroids is not None:
+            np.savez(ivf_path, centroids=self._centroids, assignments=self._assignments)
+        elif os.path.exists(ivf_path):
+            os.remove(ivf_path)
+
+    def load_index(self, file_path: str):
+        """Load documents and memory-map the embedding matrix."""
+        with open(file_path, "r", encoding="utf-8") as f:
+            self.documents = json.load(f)
+        self._matrix = np.load(f"{file_path}.npy", mmap_mode="r")
+
+        ivf_path = f"{file_path}.ivf.npz"
+        if os.path.exists(ivf_path):
+            with np.load(ivf_path) as ivf:
+                self._centroids = ivf["centroids"]
+                self._assignments = ivf["assignments"]
+            self.n_lists = len(self._centroids)
+            self._rebuild_lists()
+        else:
+            self._centroids = None
+            self._assignments = None
+            self._ivf_lists = []
+
+    def clear(self):
+        super().clear()
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._centroids = None
+        self._assignments = None
+        self._ivf_lists = []
@@ -1,4 +1,5 @@
 from typing import List, Any, Dict
+from nagent_core.tool import run_in_tool_executor
 from .base import BaseRetriever
 
 class BaseVectorRetriever(BaseRetriever):
@@ -18,10 +19,30 @@ class BaseVectorRetriever(BaseRetriever):
         """Convert a list of document strings to vector embeddings."""
         raise NotImplementedError("Subclasses should implement this method.")
 
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Convert several query strings to vector embeddings.
+        The default implementation calls embed_query per query (query and
+        document embeddings may differ); subclasses with a batched query
+        embedder should override it.
+        """
+        return [self.embed_query(query) for query in queries]
+
+    async def aembed_query(self, query: str) -> List[float]:
+        """
+        Async variant of embed_query().
+        The default implementation runs embed_query in the shared tool executor.
+        """
+        return await run_in_tool_executor(self.embed_query, query)
+
     def similarity_search_by_vector(self, embedding: List[float], k: int = 3) -> List[Dict[str, Any]]:
         """Search documents by providing a raw vector embedding."""
         raise NotImplementedError("Subclasses should implement this method.")
 
+    def similarity_search_by_vectors(self, embeddings: List[List[float]], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """Search documents for several raw vector embeddings at once."""
+        return [self.similarity_search_by_vector(embedding, k=k) for embedding in embeddings]
+
     def get_top_k(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
         """
         Default implementation for vector retrievers:
@@ -30,3 +51,20 @@ class BaseVectorRetriever(BaseRetriever):
         """
         query_embedding = self.embed_query(query)
         return self.similarity_search_by_vector(query_embedding, k=k)
+
+    async def aget_top_k(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Async variant of get_top_k(): awaits the query embedding,
+        then runs the similarity search in the shared tool executor.
+        """
+        query_embedding = await self.aembed_query(query)
+        return await run_in_tool_executor(self.similarity_search_by_vector, query_embedding, k=k)
+
+    def get_top_k_batch(self, queries: List[str], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Default batched implementation for vector retrievers:
+        embed all queries (see embed_queries), then search by all vectors.
+        """
+        if not queries:
+            return []
+        return self.similarity_search_by_vectors(self.embed_queries(queries), k=k)
@@ -1,87 +1,266 @@
-from typing import List, Dict, Any, Optional
+import functools
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Pattern, Tuple, Union
+
+_CJK = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+# CJK 字符各 1 个 token；其余字母数字每 4 个字符 1 个 token；其余非空白字符各 1 个；空白不计
+_TOKEN_RE = re.compile(rf"[{_CJK}]|(?:(?![{_CJK}])\w){{1,4}}|[^\w\s]")
+
+Separator = Union[str, Pattern[str]]
+
+# 中文 / Markdown 文本的分隔符：先按标题分节 (标题行留在下一块的开头)，再按段落、行、
+# 句末标点 (标点留在句内)、逗号、空格，最后定长切分
+CJK_MARKDOWN_SEPARATORS: List[Separator] = [
+    re.compile(r"\n(?=#{1,6} )"),
+    "\n\n",
+    "\n",
+    re.compile(r"(?<=[。！？；])"),
+    re.compile(r"(?<=[，、：])"),
+    " ",
+    "",
+]
+
+
+class BaseTokenizer(ABC):
+    """
+    切分器使用的分词器：count 统计 token 数，spans 返回每个 token 的字符偏移。
+    不超过 max_cached_chars 的文本 (句子、标题、分隔符等常重复出现的片段) 的计数按文本缓存。
+    """
+
+    def __init__(self, cache_size: int = 8192, max_cached_chars: int = 512):
+        self.max_cached_chars = max_cached_chars
+        self._cached_count = functools.lru_cache(maxsize=cache_size)(self._count)
+
+    def count(self, text: str) -> int:
+        if len(text) <= self.max_cached_chars:
+            return self._cached_count(text)
+        return self._count(text)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 缓存不随对象序列化 (进程池中的切分器各自重建)
+        state = self.__dict__.copy()
+        state["_cache_size"] = self._cached_count.cache_parameters()["maxsize"]
+        del state["_cached_count"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        cache_size = state.pop("_cache_size")
+        self.__dict__.update(state)
+        self._cached_count = functools.lru_cache(maxsize=cache_size)(self._count)
+
+    @abstractmethod
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        pass
+
+    def _count(self, text: str) -> int:
+        return len(self.spans(text))
+
+
+class RegexTokenizer(BaseTokenizer):
+    """
+    快速的本地近似分词器 (无需模型文件)：CJK 字符各算 1 个 token，字母数字按 4 个字符 1 个 token，
+    标点各 1 个，空白不计。
+    """
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        return [match.span() for match in _TOKEN_RE.finditer(text)]
+
+    def _count(self, text: str) -> int:
+        return sum(1 for _ in _TOKEN_RE.finditer(text))
+
+
+class TiktokenTokenizer(BaseTokenizer):
+    """
+    基于 tiktoken 编码的精确分词器 (需要安装 tiktoken)。
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base", cache_size: int = 8192):
+        import tiktoken
+        super().__init__(cache_size)
+        self.encoding_name = encoding_name
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        del state["encoding"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        import tiktoken
+        super().__setstate__(state)
+        self.encoding = tiktoken.get_encoding(self.encoding_name)
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        ends = offsets[1:] + [len(text)]
+        return [(start, end) for start, end in zip(offsets, ends) if end > start]
+
+    def _count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(name: Optional[str] = None) -> BaseTokenizer:
+    """
+    返回共享的分词器实例：None / "regex" 为 RegexTokenizer，其余视为 tiktoken 编码名
+    (未安装 tiktoken 时退化为 RegexTokenizer)。
+    """
+    if name is None or name == "regex":
+        return RegexTokenizer()
+    try:
+        return TiktokenTokenizer(name)
+    except ImportError:
+        import warnings
+        warnings.warn("tiktoken not installed, falling back to regex tokenizer")
+        return RegexTokenizer()
+
 
 class RecursiveCharacterTextSplitter:
     """
     递归字符切分器。
     优先在自然边界（换行、空格等）切分，以尽可能保持语义完整性。
+    基于原文偏移单遍合并片段，整体为线性时间；split_documents 在元数据中记录每块的
+    start_index / end_index (原文中的字符偏移)。
+
+    separators 可以是字符串或正则 (re.compile)，正则可用零宽断言控制分隔符留在哪一侧。
+    指定 tokenizer (BaseTokenizer 或 get_tokenizer 的名称) 时 chunk_size / chunk_overlap 按 token 计。
     """
     def __init__(
         self,
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
-        separators: Optional[List[str]] = None
+        separators: Optional[List[Separator]] = None,
+        tokenizer: Optional[Union[str, BaseTokenizer]] = None,
     ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.separators = separators or ["\n\n", "\n", " ", ""]
+        self.tokenizer = get_tokenizer(tokenizer) if isinstance(tokenizer, str) else tokenizer
+
+    def _length(self, text: str, start: int, end: int) -> int:
+        if self.tokenizer is None:
+            return end - start
+        return self.tokenizer.count(text[start:end]) if end > start else 0
 
     def split_text(self, text: str) -> List[str]:
         """
         将文本切分为块。
         """
-        return self._recursive_split(text, self.separators)
+        return [text[start:end] for start, end in self.split_text_with_offsets(text)]
 
-    def _recursive_split(self, text: str, separators: List[str]) -> List[str]:
+    def split_text_with_offsets(self, text: str) -> List[Tuple[int, int]]:
         """
-        核心递归切分逻辑。
+        将文本切分为块，返回每块在原文中的 (start, end) 字符偏移。
         """
-        final_chunks = []
+        if self._length(text, 0, len(text)) <= self.chunk_size:
+            return [(0, len(text))]
+        return self._split_span(text, 0, len(text), self.separators)
 
-        # 如果文本已经足够小，直接返回
-        if len(text) <= self.chunk_size:
-            return [text]
+    @staticmethod
+    def _has_separator(text: str, start: int, end: int, separator: Separator) -> bool:
+        if isinstance(separator, str):
+            return separator == "" or text.find(separator, start, end) != -1
+        return separator.search(text, start, end) is not None
 
-        # 选择当前的切分符
-        separator = separators[-1]
-        new_separators = []
+    def _split_span(self, text: str, start: int, end: int, separators: List[Separator]) -> List[Tuple[int, int]]:
+        """
+        核心递归切分逻辑：全程只处理原文中的偏移，不复制子串。
+        块的长度为片段长度与片段之间分隔符长度之和 (字符模式下即切片长度)，块内容就是原文切片。
+        """
+        # 选择当前的切分符：第一个在区间内出现的分隔符
+        separator: Separator = ""
+        new_separators: List[Separator] = []
         for i, s in enumerate(separators):
-            if s in text:
+            if self._has_separator(text, start, end, s):
                 separator = s
-                new_separators = separators[i+1:]
+                new_separators = separators[i + 1:]
                 break
 
-        # 按当前切分符切分
-        if separator:
-            splits = text.split(separator)
-        else:
-            # 如果没有切分符（即空字符串分隔），则按字符切分
-            splits = list(text)
+        if separator == "":
+            return self._split_fixed(text, start, end)
 
-        # 重新组合这些片段，尽量填满 chunk_size
-        current_doc = []
-        total_len = 0
+        chunks: List[Tuple[int, int]] = []
+        # 当前块包含的片段 (start, end, 长度, 与前一片段之间的分隔符长度)；重叠处理时从左侧弹出，O(1)
+        current: Deque[Tuple[int, int, int, int]] = deque()
+        total = 0
+        for piece_start, piece_end in self._iter_pieces(text, start, end, separator):
+            size = self._length(text, piece_start, piece_end)
+            if size > self.chunk_size:
+                # 单个片段就超标：先输出当前块，再用更细的分隔符递归切分该片段
+                if current:
+                    chunks.append((current[0][0], current[-1][1]))
+                    current.clear()
+                    total = 0
+                chunks.extend(self._split_span(text, piece_start, piece_end, new_separators))
+                continue
+            gap = self._length(text, current[-1][1], piece_start) if current else 0
+            if current and total + gap + size > self.chunk_size:
+                chunks.append((current[0][0], current[-1][1]))
+                # 保留尾部不超过 chunk_overlap 的片段作为重叠，且保证能放下新片段
+                while current and (total > self.chunk_overlap or total + gap + size > self.chunk_size):
+                    total -= current.popleft()[2]
+                    if current:
+                        total -= current[0][3]
+                gap = self._length(text, current[-1][1], piece_start) if current else 0
+            current.append((piece_start, piece_end, size, gap))
+            total += gap + size
 
-        for s in splits:
-            if total_len + len(s) + (len(separator) if current_doc else 0) <= self.chunk_size:
-                current_doc.append(s)
-                total_len += len(s) + (len(separator) if current_doc else 0)
-            else:
-                if current_doc:
-                    doc_content = separator.join(current_doc)
-                    if len(doc_content) > self.chunk_size:
-                        # 如果单个片段就超标了，递归深入切分
-                        final_chunks.extend(self._recursive_split(doc_content, new_separators))
-                    else:
-                        final_chunks.append(doc_content)
-
-                    # 处理重叠 (overlap)
-                    # 简单实现：保留尾部内容作为重叠部分
-                    # 这里的 overlap 处理可以更精细，这里采用基础策略
-                    while current_doc and total_len > self.chunk_overlap:
-                        removed = current_doc.pop(0)
-                        total_len -= len(removed) + len(separator)
-
-                current_doc.append(s)
-                total_len += len(s) + (len(separator) if len(current_doc) > 1 else 0)
-
-        if current_doc:
-            doc_content = separator.join(current_doc)
-            if len(doc_content) > self.chunk_size:
-                final_chunks.extend(self._recursive_split(doc_content, new_separators))
-            else:
-                final_chunks.append(doc_content)
+        if current:
+            chunks.append((current[0][0], current[-1][1]))
+        return chunks
 
-        return final_chunks
+    @staticmethod
+    def _iter_pieces(text: str, start: int, end: int, separator: Separator) -> Iterator[Tuple[int, int]]:
+        """
+        按分隔符切出的非空片段的偏移。
+        """
+        if isinstance(separator, str):
+            step = len(separator)
+            pos = start
+            while pos <= end:
+                idx = text.find(separator, pos, end)
+                if idx == -1:
+                    idx = end
+                if idx > pos:
+                    yield pos, idx
+                pos = idx + step
+            return
+        pos = start
+        for match in separator.finditer(text, start, end):
+            if match.start() > pos:
+                yield pos, match.start()
+            pos = max(pos, match.end())
+        if end > pos:
+            yield pos, end
+
+    def _split_fixed(self, text: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        没有可用的分隔符 (如不含空格与换行的中文长文本)：直接按 chunk_size 定长切分，
+        相邻块重叠 chunk_overlap 个单位 (字符，或指定 tokenizer 时为 token)。
+        """
+        step = max(1, self.chunk_size - self.chunk_overlap)
+        if self.tokenizer is None:
+            bounds = None
+            length = end - start
+        else:
+            bounds = [(s + start, e + start) for s, e in self.tokenizer.spans(text[start:end])]
+            length = len(bounds)
+            if not bounds:
+                return []
+        chunks = []
+        pos = 0
+        while True:
+            stop = min(pos + self.chunk_size, length)
+            if bounds is None:
+                chunks.append((start + pos, start + stop))
+            else:
+                chunks.append((bounds[pos][0], bounds[stop - 1][1]))
+            if stop >= length:
+                return chunks
+            pos += step
 
     def split_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -92,17 +271,40 @@ class RecursiveCharacterTextSplitter:
             content = doc.get("content", "")
             metadata = doc.get("metadata", {}).copy()
 
-            chunks = self.split_text(content)
-            for i, chunk in enumerate(chunks):
+            spans = self.split_text_with_offsets(content)
+            for i, (start, end) in enumerate(spans):
                 chunk_metadata = metadata.copy()
                 chunk_metadata["chunk_index"] = i
+                chunk_metadata["start_index"] = start
+                chunk_metadata["end_index"] = end
                 # 生成全局唯一的 ID，如果原文档有 ID 则作为前缀，否则直接用索引
                 doc_id = doc.get("id", "doc")
                 final_id = f"{doc_id}_{i}" if "id" in doc else str(len(chunked_docs))
 
                 chunked_docs.append({
                     "id": final_id,
-                    "content": chunk,
+                    "content": content[start:end],
                     "metadata": chunk_metadata
                 })
         return chunked_docs
+
+
+class TokenTextSplitter(RecursiveCharacterTextSplitter):
+    """
+    按 token 计数的中文 / Markdown 切分模式：默认使用 CJK_MARKDOWN_SEPARATORS
+    (标题、段落、句末标点 。！？；) 和共享的 RegexTokenizer，使每块的 token 数贴近 chunk_size，
+    检索 k 块时上下文长度约为 k * chunk_size 个 token。
+    """
+    def __init__(
+        self,
+        chunk_size: int = 512,
+        chunk_overlap: int = 64,
+        separators: Optional[List[Separator]] = None,
+        tokenizer: Optional[Union[str, BaseTokenizer]] = None,
+    ):
+        super().__init__(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=separators or CJK_MARKDOWN_SEPARATORS,
+            tokenizer=tokenizer if tokenizer is not None else get_tokenizer(),
+        )
@@ -1,11 +1,13 @@
-from typing import Any, Dict
-from nagent_core.tool import BaseTool
+from typing import Any, Dict, List
+from nagent_core.tool import BaseTool, string_parameters
 from .retrievers.base import BaseRetriever
 
 class RetrieverTool(BaseTool):
     """
     包装 Retriever 的工具，供 Agent 调用。
     """
+    parameters = string_parameters(query="检索查询")
+
     def __init__(self, retriever: BaseRetriever, name: str = "retrieve", description: str = "从文档库中检索相关信息"):
         super().__init__(name, description)
         self.retriever = retriever
@@ -14,8 +16,15 @@ class RetrieverTool(BaseTool):
         """
         根据查询语句检索相关文档。
         """
-        top_k_docs = self.retriever.get_top_k(query)
+        return self._format_results(self.retriever.get_top_k(query))
+
+    async def arun(self, query: str) -> str:
+        """
+        异步检索：使用检索器的 aget_top_k，不阻塞事件循环。
+        """
+        return self._format_results(await self.retriever.aget_top_k(query))
 
+    def _format_results(self, top_k_docs: List[Dict[str, Any]]) -> str:
         if not top_k_docs:
             return "没有找到相关文档。"
 
@@ -18,6 +18,8 @@ from typing import List, Dict, Any, Optional, Callable
 from enum import Enum
 import logging
 
+from .doc_io import read_documents
+
 # 配置日志 - 输出到 outputs/logs 目录
 _output_dir = Path("outputs")
 _log_dir = _output_dir / "logs"
@@ -161,12 +163,19 @@ class ValidationConfig:
             TestCase.from_dict(tc) for tc in test_cases_data
         ]
 
+        # rag_data 可以是文档列表，也可以是文档文件路径 (JSON / JSONL，可压缩；相对于配置文件目录)
+        rag_data = data.get("rag_data", [])
+        if isinstance(rag_data, str):
+            rag_data_path = path.parent / rag_data
+            logger.info(f"📂 从文件加载 RAG 数据: {rag_data_path}")
+            rag_data = read_documents(str(rag_data_path))
+
         config = cls(
             name=data.get("name", "验证程序"),
             description=data.get("description", ""),
             version=data.get("version", "1.0"),
             rag_config=data.get("rag_config", {}),
-            rag_data=data.get("rag_data", []),
+            rag_data=rag_data,
             test_cases=test_cases,
             model_config=data.get("model_config", {}),
             metadata=data.get("metadata", {}),
@@ -266,6 +275,10 @@ class ValidationRunner(ABC):
         """
         pass
 
+    async def prepare(self) -> None:
+        """执行测试用例前的准备工作（子类可重写，例如批量预检索）"""
+        pass
+
     async def run(self, max_concurrency: int = 1) -> ValidationSummary:
         """执行完整的验证流程
 
@@ -287,6 +300,8 @@ class ValidationRunner(ABC):
         logger.info(f"并发限制: {max_concurrency}")
         logger.info("=" * 80)
 
+        await self.prepare()
+
         if max_concurrency <= 1:
             # 串行执行
             for i, test_case in enumerate(self.config.test_cases, 1):
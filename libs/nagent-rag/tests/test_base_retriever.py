@@ -44,3 +44,26 @@ def test_base_retriever_not_implemented():
 
     with pytest.raises(NotImplementedError):
         base.load_index("path")
+
+def test_base_retriever_incremental_defaults():
+    retriever = ConcreteRetriever()
+    retriever.fit([{"id": "1", "content": "a"}, {"id": 2, "content": "b"}, "no id"])
+
+    retriever.add_documents(["c"])
+    assert [d["content"] for d in retriever.documents] == ["a", "b", "no id", "c"]
+
+    retriever.delete_documents(["2"])
+    assert [d["content"] for d in retriever.documents] == ["a", "no id", "c"]
+
+    retriever.update_documents([{"id": "1", "content": "a2"}, {"id": "3", "content": "d"}])
+    assert [d["content"] for d in retriever.documents] == ["no id", "c", "a2", "d"]
+
+def test_merge_sub_query_results_interleaves_and_deduplicates():
+    from nagent_rag.query_utils import merge_sub_query_results
+    results = {
+        "q1": [{"id": "a", "content": "A"}, {"id": "b", "content": "B"}],
+        "q2": [{"id": "b", "content": "B"}, {"content": "C"}, {"content": "C"}],
+    }
+    merged = merge_sub_query_results(results)
+    assert [d.get("id", d["content"]) for d in merged] == ["a", "b", "C"]
+    assert len(merge_sub_query_results(results, max_docs=2)) == 2
@@ -0,0 +1,203 @@
+import os
+from unittest.mock import MagicMock, patch
+from nagent_rag.retrievers.bm25 import BM25Retriever
+
+def test_bm25_ranks_by_relevance():
+    retriever = BM25Retriever()
+    docs = [
+        {"id": "a", "content": "Python is a great programming language"},
+        {"id": "b", "content": "Machine learning is a subset of AI"},
+        {"id": "c", "content": "Python python python snakes"},
+    ]
+    retriever.fit(docs)
+
+    results = retriever.get_top_k("python", k=3)
+    assert [r["id"] for r in results] == ["c", "a"]
+    assert results[0]["_score"] > results[1]["_score"] > 0
+
+    # Rare terms outweigh common ones
+    results = retriever.get_top_k("is machine", k=1)
+    assert results[0]["id"] == "b"
+
+def test_bm25_no_match_and_empty():
+    retriever = BM25Retriever()
+    assert retriever.get_top_k("anything") == []
+
+    retriever.fit(["hello world"])
+    assert retriever.get_top_k("missing") == []
+
+def test_bm25_top_k_limit_and_copies():
+    retriever = BM25Retriever()
+    retriever.fit([f"doc number {i}" for i in range(10)])
+
+    results = retriever.get_top_k("doc", k=3)
+    assert len(results) == 3
+    # Stored documents must not be mutated with scores
+    assert all("_score" not in d for d in retriever.documents)
+
+def test_bm25_jieba_tokenizer():
+    mock_jieba = MagicMock()
+    mock_jieba.cut.side_effect = lambda text: {"你好世界": ["你好", "世界"], "你好": ["你好"]}.get(text, [text])
+
+    with patch.dict("sys.modules", {"jieba": mock_jieba}):
+        retriever = BM25Retriever(tokenizer="jieba")
+        retriever.fit(["你好世界"])
+        results = retriever.get_top_k("你好", k=1)
+
+    assert len(results) == 1
+    assert results[0]["_score"] > 0
+
+def test_bm25_save_load_and_clear(tmp_path):
+    retriever = BM25Retriever()
+    retriever.fit([{"id": "1", "content": "The capital of France is Paris."}])
+
+    index_file = os.path.join(tmp_path, "index.json")
+    retriever.save_index(index_file)
+
+    new_retriever = BM25Retriever()
+    new_retriever.load_index(index_file)
+    results = new_retriever.get_top_k("paris.")
+    assert results[0]["id"] == "1"
+
+    new_retriever.clear()
+    assert new_retriever.get_top_k("paris.") == []
+
+def test_bm25_binary_index_roundtrip(tmp_path):
+    docs = [
+        {"id": "1", "content": "Python is a programming language.", "metadata": {"category": "tech"}},
+        {"id": "2", "content": "北京 是 中国 的 首都", "metadata": {"category": "geo"}},
+        {"id": "3", "content": "python tooling and python packaging"},
+    ]
+    retriever = BM25Retriever(k1=1.2, b=0.5)
+    retriever.fit(docs)
+    expected = retriever.get_top_k("python 首都", k=3)
+
+    index_file = os.path.join(tmp_path, "index.bm25")
+    retriever.save_index(index_file)
+    with open(index_file, "rb") as f:
+        assert f.read(8) == b"NBM25IX1"
+
+    loaded = BM25Retriever()
+    loaded.load_index(index_file)
+    assert (loaded.k1, loaded.b) == (1.2, 0.5)
+    assert len(loaded.documents) == 3
+    assert loaded.documents[1]["metadata"]["category"] == "geo"
+    assert loaded.documents[-1]["id"] == "3"
+
+    results = loaded.get_top_k("python 首都", k=3)
+    assert [r["id"] for r in results] == [r["id"] for r in expected]
+    assert [r["_score"] for r in results] == [r["_score"] for r in expected]
+    assert loaded.get_top_k("missing") == []
+
+def test_bm25_resave_mapped_index(tmp_path):
+    retriever = BM25Retriever()
+    retriever.fit(["alpha beta", "beta gamma"])
+    index_file = os.path.join(tmp_path, "index.bm25")
+    retriever.save_index(index_file)
+
+    loaded = BM25Retriever()
+    loaded.load_index(index_file)
+    # Overwriting the file that is currently mapped must stay consistent
+    loaded.save_index(index_file)
+    assert [r["content"] for r in loaded.get_top_k("gamma")] == ["beta gamma"]
+
+    reloaded = BM25Retriever()
+    reloaded.load_index(index_file)
+    assert len(reloaded.get_top_k("beta", k=5)) == 2
+
+def test_bm25_closes_mapping_on_reload_clear_and_save(tmp_path):
+    retriever = BM25Retriever()
+    retriever.fit(["alpha beta", "beta gamma"])
+    index_file = os.path.join(tmp_path, "index.bm25")
+    retriever.save_index(index_file)
+
+    loaded = BM25Retriever()
+    loaded.load_index(index_file)
+    first = loaded._mapped
+    loaded.load_index(index_file)
+    assert first._mm.closed
+    assert len(loaded.get_top_k("beta", k=5)) == 2
+
+    second = loaded._mapped
+    loaded.clear()
+    assert second._mm.closed and loaded._mapped is None
+    assert loaded.get_top_k("beta") == []
+
+    loaded.load_index(index_file)
+    third = loaded._mapped
+    loaded.save_index(index_file)
+    assert third._mm.closed
+    assert [r["content"] for r in loaded.get_top_k("gamma")] == ["beta gamma"]
+
+def test_bm25_loads_legacy_json_index(tmp_path):
+    from nagent_rag.retrievers.keyword import SimpleKeywordRetriever
+
+    legacy = SimpleKeywordRetriever()
+    legacy.fit([{"id": "x", "content": "legacy json index"}])
+    index_file = os.path.join(tmp_path, "index.json")
+    legacy.save_index(index_file)
+
+    retriever = BM25Retriever()
+    retriever.load_index(index_file)
+    assert retriever.get_top_k("legacy")[0]["id"] == "x"
+
+def _ranking(retriever, query):
+    return [(r["id"], round(r["_score"], 9)) for r in retriever.get_top_k(query, k=10)]
+
+def test_bm25_incremental_matches_full_refit():
+    docs = [{"id": str(i), "content": f"doc {i} shared {'even' if i % 2 else 'odd'} word{i}"} for i in range(8)]
+
+    incremental = BM25Retriever()
+    incremental.fit(docs[:5])
+    incremental.add_documents(docs[5:])
+    incremental.delete_documents(["1", "6", "missing"])
+    incremental.update_documents([
+        {"id": "2", "content": "replaced shared text"},
+        {"id": "9", "content": "brand new even doc"},
+    ])
+
+    expected_docs = [d for d in docs if d["id"] not in ("1", "2", "6")]
+    expected_docs += [{"id": "2", "content": "replaced shared text"}, {"id": "9", "content": "brand new even doc"}]
+    full = BM25Retriever()
+    full.fit(expected_docs)
+
+    assert sorted(d["id"] for d in incremental.documents) == sorted(d["id"] for d in full.documents)
+    for query in ["shared", "even", "odd word3", "replaced", "word6", "new"]:
+        assert sorted(_ranking(incremental, query)) == sorted(_ranking(full, query))
+    assert incremental.get_top_k("word1") == []
+
+def test_bm25_incremental_on_mapped_index(tmp_path):
+    retriever = BM25Retriever()
+    retriever.fit([{"id": "a", "content": "alpha"}, {"id": "b", "content": "beta"}])
+    index_file = os.path.join(tmp_path, "index.bm25")
+    retriever.save_index(index_file)
+
+    loaded = BM25Retriever()
+    loaded.load_index(index_file)
+    loaded.add_documents([{"id": "c", "content": "gamma alpha"}])
+    loaded.delete_documents(["a"])
+
+    assert [r["id"] for r in loaded.get_top_k("alpha")] == ["c"]
+    assert len(loaded.documents) == 2
+
+def test_bm25_get_top_k_batch_matches_single_queries():
+    retriever = BM25Retriever()
+    retriever.fit([{"id": str(i), "content": f"common term{i % 3} word{i}"} for i in range(9)])
+
+    queries = ["common", "term1 word4", "missing", "term2 common"]
+    batch = retriever.get_top_k_batch(queries, k=4)
+    assert len(batch) == len(queries)
+    for query, results in zip(queries, batch):
+        assert results == retriever.get_top_k(query, k=4)
+    assert batch[2] == []
+
+def test_bm25_add_existing_id_replaces_document():
+    retriever = BM25Retriever()
+    retriever.fit([{"id": "1", "content": "paris france"}, {"id": "2", "content": "berlin germany"}])
+    retriever.add_documents([{"id": "1", "content": "paris capital"}, {"content": "no id"}])
+
+    assert [d["id"] for d in retriever.documents if "id" in d] == ["1", "2"]
+    assert len(retriever.documents) == 3
+    results = retriever.get_top_k("paris", k=3)
+    assert [r["id"] for r in results] == ["1"]
+    assert results[0]["content"] == "paris capital"
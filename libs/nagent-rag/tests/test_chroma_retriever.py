@@ -224,3 +224,108 @@ def test_chroma_not_installed():
 
         with pytest.raises(ImportError, match="chromadb is not installed"):
             ChromaRetriever()
+
+def test_chroma_retriever_incremental(mock_chromadb):
+    mock_chroma, mock_client, mock_collection, ChromaRetriever = mock_chromadb
+    with patch("os.makedirs"), patch("os.path.exists", return_value=True):
+        retriever = ChromaRetriever()
+        retriever.fit([{"id": "1", "content": "Doc 1"}, {"id": "2", "content": "Doc 2"}])
+        mock_collection.reset_mock()
+
+        # Only the delta is upserted (and embedded)
+        retriever.add_documents([{"id": "3", "content": "Doc 3"}])
+        mock_collection.upsert.assert_called_once()
+        assert mock_collection.upsert.call_args.kwargs["ids"] == ["3"]
+        assert len(retriever.documents) == 3
+
+        # Re-adding an existing id upserts it instead of listing it twice
+        retriever.add_documents([{"id": "3", "content": "Doc 3 again"}])
+        assert [d["id"] for d in retriever.documents].count("3") == 1
+
+        retriever.delete_documents(["1"])
+        mock_collection.delete.assert_called_once_with(ids=["1"])
+        assert [d["id"] for d in retriever.documents] == ["2", "3"]
+
+        mock_collection.reset_mock()
+        retriever.update_documents([{"id": "2", "content": "Doc 2 v2"}])
+        assert mock_collection.upsert.call_args.kwargs["documents"] == ["Doc 2 v2"]
+        assert sorted(d["content"] for d in retriever.documents) == ["Doc 2 v2", "Doc 3 again"]
+
+def test_chroma_retriever_batched_fit_without_embedding_function(mock_chromadb):
+    mock_chroma, mock_client, mock_collection, ChromaRetriever = mock_chromadb
+    with patch("os.makedirs"), patch("os.path.exists", return_value=True):
+        retriever = ChromaRetriever(batch_size=2)
+        retriever.fit([f"Doc {i}" for i in range(5)])
+
+        assert mock_collection.upsert.call_count == 3
+        assert [len(c.kwargs["ids"]) for c in mock_collection.upsert.call_args_list] == [2, 2, 1]
+        assert retriever.last_ingest_stats["documents"] == 5
+
+def test_chroma_retriever_concurrent_embedding_pipeline(mock_chromadb):
+    import threading
+    import time as _time
+    mock_chroma, mock_client, mock_collection, ChromaRetriever = mock_chromadb
+
+    in_flight = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    class SlowEmbeddings:
+        model = "slow"
+
+        def embed_texts(self, texts):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            _time.sleep(0.02)
+            with lock:
+                in_flight["now"] -= 1
+            return [[float(len(t))] for t in texts]
+
+    with patch("os.makedirs"), patch("os.path.exists", return_value=True):
+        retriever = ChromaRetriever(embedding_function=SlowEmbeddings(), batch_size=3, max_concurrency=2)
+        docs = [{"id": f"id{i}", "content": "x" * i} for i in range(10)]
+        retriever.fit(docs)
+
+    assert in_flight["max"] == 2
+    calls = mock_collection.upsert.call_args_list
+    assert len(calls) == 4
+    written = {}
+    for c in calls:
+        for doc_id, emb in zip(c.kwargs["ids"], c.kwargs["embeddings"]):
+            written[doc_id] = emb
+    assert written == {f"id{i}": [float(i)] for i in range(10)}
+
+def test_chroma_retriever_fit_inside_event_loop(mock_chromadb):
+    import asyncio
+    mock_chroma, mock_client, mock_collection, ChromaRetriever = mock_chromadb
+
+    embeddings = MagicMock()
+    embeddings.embed_texts.side_effect = lambda texts: [[1.0] for _ in texts]
+
+    async def ingest():
+        with patch("os.makedirs"), patch("os.path.exists", return_value=True):
+            retriever = ChromaRetriever(embedding_function=embeddings)
+            retriever.fit(["a", "b"])
+
+    asyncio.run(ingest())
+    assert mock_collection.upsert.call_args.kwargs["embeddings"] == [[1.0], [1.0]]
+
+def test_chroma_retriever_get_top_k_batch(mock_chromadb):
+    mock_chroma, mock_client, mock_collection, ChromaRetriever = mock_chromadb
+
+    mock_collection.query.return_value = {
+        "ids": [["a1"], ["b1", "b2"]],
+        "documents": [["Doc A"], ["Doc B1", "Doc B2"]],
+        "metadatas": [[None], [None, {"k": "v"}]],
+        "distances": [[0.1], [0.2, 0.3]]
+    }
+
+    with patch("os.makedirs"), patch("os.path.exists", return_value=True):
+        retriever = ChromaRetriever()
+        results = retriever.get_top_k_batch(["qa", "qb"], k=2)
+
+    # One Chroma call for all queries
+    mock_collection.query.assert_called_once_with(query_texts=["qa", "qb"], n_results=2)
+    assert [d["id"] for d in results[0]] == ["a1"]
+    assert [d["id"] for d in results[1]] == ["b1", "b2"]
+    assert results[1][1]["metadata"] == {"k": "v"}
@@ -0,0 +1,72 @@
+import os
+from unittest.mock import MagicMock
+from nagent_rag.chunking import ChunkingProcessor
+from nagent_rag.manifest import ChunkDelta, ChunkManifest
+from nagent_rag.retrievers.keyword import SimpleKeywordRetriever
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def test_rerun_only_rechunks_changed_files(tmp_path):
+    root = str(tmp_path / "docs")
+    write(os.path.join(root, "a.txt"), "alpha " * 100)
+    write(os.path.join(root, "sub", "b.md"), "beta " * 100)
+    write(os.path.join(root, "c.txt"), "gamma " * 100)
+    manifest_path = str(tmp_path / "manifest.json")
+    processor = ChunkingProcessor(chunk_size=200, chunk_overlap=20)
+
+    manifest = ChunkManifest(manifest_path)
+    first = processor.process_path_incremental(root, manifest)
+    manifest.save()
+    assert sorted(first.new_files) == ["a.txt", "c.txt", "sub/b.md"]
+    assert first.removed_ids == []
+    assert {doc["id"] for doc in first.added} >= {"a.txt_0", "sub/b.md_0"}
+
+    retriever = SimpleKeywordRetriever()
+    first.apply(retriever)
+
+    # 修改 a，删除 c，touch b (内容不变)，新增 d
+    write(os.path.join(root, "a.txt"), "delta " * 10)
+    os.remove(os.path.join(root, "c.txt"))
+    stat = os.stat(os.path.join(root, "sub", "b.md"))
+    os.utime(os.path.join(root, "sub", "b.md"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    write(os.path.join(root, "d.txt"), "epsilon")
+
+    manifest = ChunkManifest(manifest_path)
+    second = processor.process_path_incremental(root, manifest)
+    assert second.changed_files == ["a.txt"]
+    assert second.new_files == ["d.txt"]
+    assert second.deleted_files == ["c.txt"]
+    assert second.unchanged_files == 1
+    assert set(second.removed_ids) == {doc["id"] for doc in first.added if doc["id"].rsplit("_", 1)[0] in ("a.txt", "c.txt")}
+    assert sorted(doc["id"] for doc in second.added) == ["a.txt_0", "d.txt_0"]
+
+    second.apply(retriever)
+    full = processor.process_path_incremental(root, ChunkManifest()).added
+    assert sorted(doc["id"] for doc in retriever.documents) == sorted(doc["id"] for doc in full)
+    assert "gamma" not in " ".join(doc["content"] for doc in retriever.documents)
+
+    # 保存后再次运行：没有任何变化
+    manifest.save()
+    third = processor.process_path_incremental(root, ChunkManifest(manifest_path))
+    assert third.added == [] and third.removed_ids == []
+    assert third.unchanged_files == 3
+
+def test_config_change_rechunks_everything(tmp_path):
+    root = str(tmp_path)
+    write(os.path.join(root, "a.txt"), "alpha " * 100)
+    manifest = ChunkManifest()
+    ChunkingProcessor(chunk_size=200, chunk_overlap=20).process_path_incremental(root, manifest)
+
+    delta = ChunkingProcessor(chunk_size=100, chunk_overlap=10).process_path_incremental(root, manifest)
+
+    assert delta.changed_files == ["a.txt"]
+    assert delta.unchanged_files == 0
+    assert len(delta.added) > len(delta.removed_ids)
+
+def test_apply_deletes_before_adding():
+    retriever = MagicMock()
+    ChunkDelta(added=[{"id": "a_0", "content": "x"}], removed_ids=["a_0"]).apply(retriever)
+    assert [c[0] for c in retriever.method_calls] == ["delete_documents", "add_documents"]
@@ -32,3 +32,32 @@ def test_rag_chunking_integration():
         assert len(results[0]["content"]) < len(long_text)
     finally:
         os.remove(temp_path)
+
+def make_tree(root, files=12):
+    for i in range(files):
+        sub = os.path.join(root, f"dir{i % 3}")
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"file{i}.md"), "w", encoding="utf-8") as f:
+            f.write(f"文件 {i}。" + "Some text here. " * (20 + i))
+
+def test_iter_process_path_matches_process_path():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        make_tree(temp_dir)
+        processor = ChunkingProcessor(chunk_size=100, chunk_overlap=20)
+        expected = processor.process_path(temp_dir)
+
+        for processes in (0, 2):
+            batches = list(processor.iter_process_path(temp_dir, processes=processes, batch_size=5))
+            assert len(batches) == 3
+            assert [chunk for batch in batches for chunk in batch] == expected
+
+def test_iter_load_streams_in_walk_order():
+    from nagent_rag.document_loaders import TextLoader
+    with tempfile.TemporaryDirectory() as temp_dir:
+        make_tree(temp_dir)
+        loader = TextLoader()
+        paths = list(loader.iter_paths(temp_dir))
+        docs = loader.iter_load(temp_dir, max_workers=4)
+        assert next(docs)["metadata"]["source"] == paths[0]
+        docs.close()
+        assert [d["metadata"]["source"] for d in loader.iter_load(temp_dir, max_workers=4)] == paths
@@ -0,0 +1,61 @@
+import gzip
+import json
+import pytest
+from nagent_rag.doc_io import is_jsonl, iter_batches, iter_documents, read_documents, validate_documents, write_documents
+
+DOCS = [{"id": str(i), "content": f"文档 {i}\n第二行", "metadata": {"i": i}} for i in range(5)]
+
+@pytest.mark.parametrize("name", ["docs.jsonl", "docs.jsonl.gz", "docs.json", "docs.json.gz"])
+def test_write_then_read_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+
+    assert write_documents(path, iter(DOCS)) == 5
+
+    assert read_documents(path) == DOCS
+    assert [p.name for p in tmp_path.iterdir()] == [name]
+
+def test_jsonl_is_one_document_per_line(tmp_path):
+    path = str(tmp_path / "docs.jsonl.gz")
+    write_documents(path, DOCS)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    assert [json.loads(line) for line in lines] == DOCS
+
+def test_iter_documents_is_lazy_and_reports_bad_lines(tmp_path):
+    path = tmp_path / "docs.ndjson"
+    path.write_text('{"id": "a"}\n\n{"id": \n', encoding="utf-8")
+
+    documents = iter_documents(str(path))
+    assert next(documents) == {"id": "a"}
+    with pytest.raises(ValueError, match=":3:"):
+        next(documents)
+
+def test_rewrite_in_place_from_own_stream(tmp_path):
+    path = str(tmp_path / "docs.jsonl")
+    write_documents(path, DOCS)
+
+    write_documents(path, (doc for doc in iter_documents(path) if doc["id"] != "2"))
+
+    assert [doc["id"] for doc in read_documents(path)] == ["0", "1", "3", "4"]
+
+def test_json_requires_a_list(tmp_path):
+    path = tmp_path / "docs.json"
+    path.write_text('{"id": "a"}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_documents(str(path))
+
+def test_is_jsonl_and_batches():
+    assert is_jsonl("a.jsonl") and is_jsonl("a.jsonl.zst") and is_jsonl("a.ndjson.gz")
+    assert not is_jsonl("a.json") and not is_jsonl("a.json.gz")
+    assert [len(batch) for batch in iter_batches(DOCS, 2)] == [2, 2, 1]
+
+def test_validate_documents_checks_every_entry(tmp_path):
+    path = tmp_path / "docs.jsonl"
+    path.write_text('{"id": "a"}\n{"id": "b"}\n', encoding="utf-8")
+    assert validate_documents(str(path)) == 2
+
+    path.write_text('{"id": "a"}\n["not", "a", "doc"]\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="#2"):
+        validate_documents(str(path))
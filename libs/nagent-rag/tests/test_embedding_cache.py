@@ -0,0 +1,68 @@
+import asyncio
+from unittest.mock import MagicMock
+from nagent_rag.embedding_cache import EmbeddingCache, get_embedding_cache
+from nagent_rag.retrievers.chroma import RagasEmbeddingWrapper
+
+def fake_embed(texts):
+    return [[float(len(t)), 0.5] for t in texts]
+
+def test_get_or_compute_only_embeds_misses(tmp_path):
+    cache = EmbeddingCache(cache_dir=str(tmp_path))
+    compute = MagicMock(side_effect=fake_embed)
+
+    first = cache.get_or_compute("m", ["a", "bb", "a"], compute)
+    assert first == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+    # Duplicate texts are embedded once
+    compute.assert_called_once_with(["a", "bb"])
+
+    second = cache.get_or_compute("m", ["bb", "ccc"], compute)
+    assert second == [[2.0, 0.5], [3.0, 0.5]]
+    assert compute.call_args.args[0] == ["ccc"]
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 4
+
+def test_cache_is_keyed_by_model(tmp_path):
+    cache = EmbeddingCache(cache_dir=str(tmp_path))
+    cache.put_many("m1", ["x"], [[1.0]])
+    assert cache.get_many("m2", ["x"]) == [None]
+    assert cache.get_many("m1", ["x"]) == [[1.0]]
+
+def test_disk_tier_survives_restart_and_lru_eviction(tmp_path):
+    cache = EmbeddingCache(cache_dir=str(tmp_path), max_memory_items=2)
+    cache.put_many("m", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+    assert cache.stats()["memory_items"] == 2
+    cache.close()
+
+    reopened = EmbeddingCache(cache_dir=str(tmp_path))
+    compute = MagicMock(side_effect=fake_embed)
+    assert reopened.get_or_compute("m", ["a", "b", "c"], compute) == [[1.0], [2.0], [3.0]]
+    compute.assert_not_called()
+    assert reopened.stats()["disk_hits"] == 3
+    assert reopened.stats()["hit_rate"] == 1.0
+
+def test_aget_or_compute(tmp_path):
+    cache = EmbeddingCache(cache_dir=str(tmp_path))
+
+    async def acompute(texts):
+        return fake_embed(texts)
+
+    result = asyncio.run(cache.aget_or_compute("m", ["hi"], acompute))
+    assert result == [[2.0, 0.5]]
+    assert cache.get_many("m", ["hi"]) == [[2.0, 0.5]]
+
+def test_shared_cache_instance(tmp_path):
+    assert get_embedding_cache(str(tmp_path)) is get_embedding_cache(str(tmp_path))
+
+def test_ragas_wrapper_uses_cache(tmp_path):
+    embeddings = MagicMock()
+    embeddings.model = "fake-model"
+    embeddings.embed_texts.side_effect = fake_embed
+    wrapper = RagasEmbeddingWrapper(embeddings, cache=EmbeddingCache(cache_dir=str(tmp_path)))
+
+    wrapper(["doc one", "doc two"])
+    wrapper(["doc one", "doc two"])
+    wrapper.embed_query(["doc one"])
+
+    embeddings.embed_texts.assert_called_once_with(["doc one", "doc two"])
@@ -0,0 +1,115 @@
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from nagent_rag.retrievers.base import BaseRetriever
+from nagent_rag.retrievers.bm25 import BM25Retriever
+from nagent_rag.retrievers.hybrid import HybridRetriever
+
+def fake_retriever(results, higher_score_is_better=True):
+    retriever = MagicMock(spec=BaseRetriever)
+    retriever.higher_score_is_better = higher_score_is_better
+    retriever.get_top_k_batch.side_effect = lambda queries, k=3: [results[:k] for _ in queries]
+    return retriever
+
+def test_rrf_fuses_and_deduplicates_by_id():
+    keyword = fake_retriever([{"id": "a", "content": "A", "_score": 9.0}, {"id": "b", "content": "B", "_score": 5.0}])
+    vector = fake_retriever([{"id": "b", "content": "B", "_score": 0.1}, {"id": "c", "content": "C", "_score": 0.2}], higher_score_is_better=False)
+    hybrid = HybridRetriever(keyword, vector)
+
+    results = hybrid.get_top_k("q", k=3)
+    # "b" is ranked by both retrievers, so it wins
+    assert [r["id"] for r in results] == ["b", "a", "c"]
+    assert results[0]["_score"] == 1 / 62 + 1 / 61
+    keyword.get_top_k_batch.assert_called_once_with(["q"], k=6)
+
+def test_weighted_fusion_respects_score_direction():
+    keyword = fake_retriever([{"id": "a", "_score": 10.0}, {"id": "b", "_score": 0.0}])
+    # Distances: "b" is the closest
+    vector = fake_retriever([{"id": "b", "_score": 0.1}, {"id": "a", "_score": 0.9}], higher_score_is_better=False)
+
+    hybrid = HybridRetriever(keyword, vector, fusion="weighted", weights=(1.0, 2.0))
+    results = hybrid.get_top_k("q", k=2)
+    assert [r["id"] for r in results] == ["b", "a"]
+    assert [r["_score"] for r in results] == [2.0, 1.0]
+
+def test_retrievers_are_queried_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wait_for_other(queries, k=3):
+        # Deadlocks (and times out) unless both calls run at the same time
+        barrier.wait()
+        return [[] for _ in queries]
+
+    keyword, vector = fake_retriever([]), fake_retriever([])
+    keyword.get_top_k_batch.side_effect = wait_for_other
+    vector.get_top_k_batch.side_effect = wait_for_other
+    assert HybridRetriever(keyword, vector).get_top_k_batch(["x", "y"]) == [[], []]
+
+def test_incremental_updates_are_forwarded():
+    keyword, vector = BM25Retriever(), BM25Retriever(tokenizer="split")
+    hybrid = HybridRetriever(keyword, vector)
+    hybrid.fit([{"id": "1", "content": "alpha"}, {"id": "2", "content": "beta"}])
+    hybrid.add_documents([{"id": "3", "content": "gamma alpha"}])
+    hybrid.delete_documents(["1"])
+    hybrid.update_documents([{"id": "2", "content": "delta"}])
+
+    assert [d["id"] for d in hybrid.documents] == ["3", "2"]
+    assert [d["id"] for d in keyword.documents] == [d["id"] for d in vector.documents]
+    assert [r["id"] for r in hybrid.get_top_k("alpha")] == ["3"]
+    assert hybrid.get_top_k("beta") == []
+
+def test_save_load_and_clear(tmp_path):
+    hybrid = HybridRetriever(BM25Retriever(), BM25Retriever())
+    hybrid.fit([{"id": "1", "content": "paris france"}])
+    index_file = str(tmp_path / "index.bm25")
+    hybrid.save_index(index_file)
+    assert (tmp_path / "index.bm25.vector").exists()
+
+    loaded = HybridRetriever(BM25Retriever(), BM25Retriever())
+    loaded.load_index(index_file)
+    assert loaded.get_top_k("paris")[0]["id"] == "1"
+
+    loaded.clear()
+    assert loaded.documents == [] and loaded.get_top_k("paris") == []
+
+@pytest.mark.asyncio
+async def test_aget_top_k_awaits_both_retrievers():
+    keyword = fake_retriever([])
+    vector = fake_retriever([], higher_score_is_better=False)
+    keyword.aget_top_k = AsyncMock(return_value=[{"id": "a", "_score": 3.0}])
+    vector.aget_top_k = AsyncMock(return_value=[{"id": "b", "_score": 0.1}, {"id": "a", "_score": 0.2}])
+
+    results = await HybridRetriever(keyword, vector).aget_top_k("q", k=2)
+    assert [r["id"] for r in results] == ["a", "b"]
+    keyword.aget_top_k.assert_awaited_once_with("q", k=4)
+    keyword.get_top_k_batch.assert_not_called()
+
+def test_retrievers_get_their_own_document_copies():
+    keyword, vector = BM25Retriever(), BM25Retriever()
+    hybrid = HybridRetriever(keyword, vector)
+    source = [{"content": "alpha"}]
+    hybrid.fit(source)
+
+    assert "id" not in source[0]
+    assert keyword.documents[0]["id"] == vector.documents[0]["id"]
+    assert keyword.documents[0] is not vector.documents[0]
+    vector.documents[0]["id"] = "changed"
+    assert keyword.documents[0]["id"] != "changed"
+
+def test_loaded_documents_stay_memory_mapped(tmp_path):
+    hybrid = HybridRetriever(BM25Retriever(), BM25Retriever())
+    hybrid.fit([{"id": "1", "content": "paris france"}])
+    index_file = str(tmp_path / "index.bm25")
+    hybrid.save_index(index_file)
+
+    loaded = HybridRetriever(BM25Retriever(), BM25Retriever())
+    loaded.load_index(index_file)
+    assert loaded.documents is loaded.keyword_retriever.documents
+    assert not isinstance(loaded.documents, list)
+    assert loaded.documents[0]["id"] == "1"
+
+def test_close_shuts_down_the_executor():
+    hybrid = HybridRetriever(fake_retriever([]), fake_retriever([]))
+    hybrid.close()
+    with pytest.raises(RuntimeError):
+        hybrid.get_top_k("q")
@@ -90,3 +90,12 @@ def test_keyword_retriever_save_and_load_index():
         assert len(results) == 2
         assert results[0]["_score"] == 1
         assert results[1]["_score"] == 1
+
+def test_keyword_get_top_k_batch():
+    retriever = SimpleKeywordRetriever()
+    retriever.fit(["Python is great", "Java is verbose", "Python and Java"])
+
+    queries = ["python", "java is", "rust"]
+    batch = retriever.get_top_k_batch(queries, k=2)
+    assert batch == [retriever.get_top_k(q, k=2) for q in queries]
+    assert batch[2] == []
@@ -0,0 +1,138 @@
+import os
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from nagent_rag.embedding_cache import EmbeddingCache
+from nagent_rag.retrievers.numpy_vector import NumpyVectorRetriever
+
+def letter_embed(texts):
+    # Bag-of-letters vectors: texts sharing letters are similar
+    vectors = []
+    for text in texts:
+        vec = [0.0] * 26
+        for ch in text.lower():
+            if "a" <= ch <= "z":
+                vec[ord(ch) - ord("a")] += 1.0
+        vectors.append(vec)
+    return vectors
+
+def make_embeddings():
+    embeddings = MagicMock()
+    embeddings.model = "letters"
+    embeddings.embed_texts.side_effect = letter_embed
+    return embeddings
+
+DOCS = [
+    {"id": "a", "content": "aaaa"},
+    {"id": "b", "content": "bbbb"},
+    {"id": "ab", "content": "aabb"},
+    {"id": "c", "content": "cccc"},
+]
+
+def test_numpy_brute_force_ranking():
+    retriever = NumpyVectorRetriever(embedding_function=make_embeddings())
+    retriever.fit(DOCS)
+
+    results = retriever.get_top_k("aaa", k=2)
+    assert [r["id"] for r in results] == ["a", "ab"]
+    assert abs(results[0]["_score"] - 1.0) < 1e-6
+    assert results[0]["_score"] > results[1]["_score"]
+    assert all("_score" not in d for d in retriever.documents)
+    assert len(retriever.get_top_k("a", k=10)) == 4
+
+def test_numpy_empty_and_missing_embedding_function():
+    assert NumpyVectorRetriever(embedding_function=make_embeddings()).get_top_k("x") == []
+    try:
+        NumpyVectorRetriever().fit(["hello"])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_numpy_get_top_k_batch_embeds_once():
+    embeddings = make_embeddings()
+    retriever = NumpyVectorRetriever(embedding_function=embeddings)
+    retriever.fit(DOCS)
+    embeddings.embed_texts.reset_mock()
+
+    batch = retriever.get_top_k_batch(["bbb", "ccc"], k=1)
+    assert [[r["id"] for r in results] for results in batch] == [["b"], ["c"]]
+    embeddings.embed_texts.assert_called_once_with(["bbb", "ccc"])
+
+def test_numpy_ivf_full_probe_matches_brute_force():
+    rng = np.random.default_rng(1)
+    docs = ["".join(rng.choice(list("abcdefgh"), size=12)) for _ in range(200)]
+
+    brute = NumpyVectorRetriever(embedding_function=make_embeddings())
+    brute.fit(docs)
+    ivf = NumpyVectorRetriever(embedding_function=make_embeddings(), n_lists=8, n_probe=8)
+    ivf.fit(docs)
+    assert ivf._centroids.shape == (8, 26)
+    assert sum(len(l) for l in ivf._ivf_lists) == 200
+
+    for query in ["aabbcc", "hhhg", "defdef"]:
+        expected = [r["_score"] for r in brute.get_top_k(query, k=5)]
+        actual = [r["_score"] for r in ivf.get_top_k(query, k=5)]
+        assert np.allclose(actual, expected)
+
+    # Probing a single list still returns results
+    ivf.n_probe = 1
+    assert len(ivf.get_top_k("aabbcc", k=3)) > 0
+
+def test_numpy_incremental_updates_embed_only_new_docs():
+    embeddings = make_embeddings()
+    retriever = NumpyVectorRetriever(embedding_function=embeddings)
+    retriever.fit(DOCS[:2])
+    retriever.add_documents([DOCS[3]])
+    assert embeddings.embed_texts.call_args.args[0] == ["cccc"]
+
+    retriever.delete_documents(["a"])
+    retriever.update_documents([{"id": "b", "content": "zzzz"}])
+    assert sorted(d["id"] for d in retriever.documents) == ["b", "c"]
+    assert retriever.get_top_k("zz", k=1)[0]["id"] == "b"
+    assert retriever._matrix.shape == (2, 26)
+
+    retriever.add_documents([{"id": "c", "content": "yyyy"}])
+    assert sorted(d["id"] for d in retriever.documents) == ["b", "c"]
+    assert retriever._matrix.shape == (2, 26)
+    assert retriever.get_top_k("yy", k=1)[0]["id"] == "c"
+
+def test_numpy_save_load_mmap(tmp_path):
+    retriever = NumpyVectorRetriever(embedding_function=make_embeddings(), n_lists=2)
+    retriever.fit(DOCS)
+    index_file = os.path.join(tmp_path, "index.json")
+    retriever.save_index(index_file)
+    assert os.path.exists(index_file + ".npy")
+
+    loaded = NumpyVectorRetriever(embedding_function=make_embeddings())
+    loaded.load_index(index_file)
+    assert isinstance(loaded._matrix, np.memmap)
+    assert loaded.n_lists == 2
+    assert [r["id"] for r in loaded.get_top_k("cc", k=1)] == ["c"]
+
+    loaded.add_documents([{"id": "d", "content": "dddd"}])
+    assert loaded.get_top_k("dd", k=1)[0]["id"] == "d"
+
+    loaded.clear()
+    assert loaded.get_top_k("cc") == []
+
+def test_numpy_uses_embedding_cache(tmp_path):
+    embeddings = make_embeddings()
+    cache = EmbeddingCache(cache_dir=str(tmp_path))
+    NumpyVectorRetriever(embedding_function=embeddings, embedding_cache=cache).fit(DOCS)
+    NumpyVectorRetriever(embedding_function=embeddings, embedding_cache=cache).fit(DOCS)
+    embeddings.embed_texts.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_numpy_aget_top_k_uses_async_embeddings_and_cache(tmp_path):
+    embeddings = make_embeddings()
+    embeddings.aembed_texts = AsyncMock(side_effect=letter_embed)
+    cache = EmbeddingCache(cache_dir=str(tmp_path / "emb"))
+    retriever = NumpyVectorRetriever(embedding_function=embeddings, embedding_cache=cache)
+    retriever.fit(DOCS)
+
+    results = await retriever.aget_top_k("aaa", k=2)
+    assert [r["id"] for r in results] == ["a", "ab"]
+    await retriever.aget_top_k("aaa", k=2)
+    # The query was embedded once through the async API, then served from the cache
+    embeddings.aembed_texts.assert_awaited_once_with(["aaa"])
+    assert retriever.get_top_k("aaa", k=2) == results
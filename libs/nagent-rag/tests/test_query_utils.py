@@ -0,0 +1,18 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from nagent_rag.query_utils import QueryRewriter, QueryDecomposer
+
+def make_client(text=None, error=None):
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text=text), side_effect=error)
+    return client
+
+@pytest.mark.asyncio
+async def test_arewrite_and_adecompose():
+    assert await QueryRewriter(make_client(" paris capital ")).arewrite("q") == "paris capital"
+    assert await QueryDecomposer(make_client("a\n\n b \n")).adecompose("q") == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_async_variants_fall_back_to_the_original_query():
+    assert await QueryRewriter(make_client(error=KeyError("boom"))).arewrite("q") == "q"
+    assert await QueryDecomposer(make_client(error=KeyError("boom"))).adecompose("q") == ["q"]
@@ -1,3 +1,5 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
 from nagent_rag.retrievers.keyword import SimpleKeywordRetriever
 from nagent_rag.tools import RetrieverTool
 
@@ -21,3 +23,21 @@ def test_retriever_tool_no_results():
     result = tool.run("Nonexistent")
 
     assert result == "没有找到相关文档。"
+
+@pytest.mark.asyncio
+async def test_retriever_tool_arun_uses_async_retrieval():
+    retriever = MagicMock()
+    retriever.aget_top_k = AsyncMock(return_value=[{"id": "1", "content": "Apple is red"}])
+
+    result = await RetrieverTool(retriever).arun("red")
+
+    assert "【结果 1】(ID: 1)" in result and "Apple is red" in result
+    retriever.aget_top_k.assert_awaited_once_with("red")
+    retriever.get_top_k.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_keyword_retriever_aget_top_k_offloads_to_executor():
+    retriever = SimpleKeywordRetriever()
+    retriever.fit(["Apple is red", "Banana is yellow"])
+    results = await retriever.aget_top_k("red", k=1)
+    assert results[0]["content"] == "Apple is red"
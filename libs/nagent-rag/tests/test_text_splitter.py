@@ -24,3 +24,66 @@ def test_split_documents():
     assert chunked_docs[0]["metadata"]["chunk_index"] == 0
     assert chunked_docs[1]["metadata"]["chunk_index"] == 1
     assert chunked_docs[0]["metadata"]["source"] == "test"
+
+def test_offsets_match_chunks_and_overlap():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=10, chunk_overlap=4)
+    text = "aa bb cc dd ee ff\n\nkkkkkkkkkkkkkkkkkkkkkkk ll"
+    spans = splitter.split_text_with_offsets(text)
+    assert [text[s:e] for s, e in spans] == splitter.split_text(text)
+    assert spans[:3] == [(0, 8), (6, 14), (12, 17)]
+    assert all(e - s <= 10 for s, e in spans)
+    # The long run without separators is cut into fixed windows that overlap by 4
+    assert spans[3:6] == [(19, 29), (25, 35), (31, 41)]
+
+def test_long_cjk_text_without_separators():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    text = "数据仓库维度建模" * 250_000  # 2M chars, no spaces or newlines
+    spans = splitter.split_text_with_offsets(text)
+    assert spans[0] == (0, 1000)
+    assert spans[1] == (800, 1800)
+    assert spans[-1][1] == len(text)
+    assert all(e - s <= 1000 for s, e in spans)
+
+def test_split_documents_records_offsets():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=15, chunk_overlap=0)
+    content = "Hello World\n\nThis is a test."
+    chunks = splitter.split_documents([{"id": "d", "content": content}])
+    for chunk in chunks:
+        metadata = chunk["metadata"]
+        assert content[metadata["start_index"]:metadata["end_index"]] == chunk["content"]
+    assert [c["metadata"]["start_index"] for c in chunks] == [0, 13]
+
+def test_regex_tokenizer_counts_cjk_characters_and_word_pieces():
+    from nagent_rag.text_splitter import RegexTokenizer
+    tokenizer = RegexTokenizer()
+    assert tokenizer.count("维度建模 is great!") == 4 + 1 + 2 + 1
+    assert tokenizer.spans("ab中文") == [(0, 2), (2, 3), (3, 4)]
+
+def test_token_splitter_uses_cjk_punctuation_and_headings():
+    from nagent_rag.text_splitter import TokenTextSplitter
+    splitter = TokenTextSplitter(chunk_size=30, chunk_overlap=0)
+    text = (
+        "# 第一章 维度建模\n\n维度建模是一种数据仓库设计方法。它强调事实表与维度表的分离！为什么？因为便于查询；也便于理解。"
+        "\n## 1.1 事实表\n事实表存储业务过程的度量。"
+    )
+    chunks = splitter.split_text(text)
+    assert all(splitter.tokenizer.count(chunk) <= 30 for chunk in chunks)
+    # Sentences end with their punctuation and headings start a chunk
+    assert "维度建模是一种数据仓库设计方法。它强调事实表与维度表的分离！" in chunks
+    assert any(chunk.startswith("## 1.1 事实表") for chunk in chunks)
+
+def test_token_splitter_fixed_windows_are_measured_in_tokens():
+    from nagent_rag.text_splitter import TokenTextSplitter
+    splitter = TokenTextSplitter(chunk_size=100, chunk_overlap=10)
+    text = "数" * 1000
+    spans = splitter.split_text_with_offsets(text)
+    assert spans[:2] == [(0, 100), (90, 190)]
+    assert spans[-1][1] == 1000
+
+def test_chunking_processor_token_mode():
+    from nagent_rag.chunking import ChunkingProcessor
+    from nagent_rag.text_splitter import TokenTextSplitter
+    processor = ChunkingProcessor(chunk_size=50, chunk_overlap=0, length_unit="token")
+    assert isinstance(processor.splitter, TokenTextSplitter)
+    chunks = processor.process_texts(["第一句。" * 40])
+    assert len(chunks) > 1
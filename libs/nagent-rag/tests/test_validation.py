@@ -44,6 +44,19 @@ def test_validation_config_load(sample_config_data, tmp_path):
     assert len(config.test_cases) == 1
     assert config.test_cases[0].id == "tc_1"
 
+def test_validation_config_loads_rag_data_file(sample_config_data, tmp_path):
+    docs = sample_config_data.pop("rag_data")
+    with open(tmp_path / "docs.jsonl", "w", encoding="utf-8") as f:
+        f.write("\n".join(json.dumps(doc) for doc in docs) + "\n")
+    sample_config_data["rag_data"] = "docs.jsonl"
+    config_file = tmp_path / "test_config.json"
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump(sample_config_data, f)
+
+    config = ValidationConfig.from_json(config_file)
+
+    assert config.rag_data == docs
+
 def test_validation_config_save(sample_config_data, tmp_path):
     config = ValidationConfig(
         name="Save Test",
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import MagicMock
 from nagent_rag.retrievers.vector import BaseVectorRetriever
 
 class ConcreteVectorRetriever(BaseVectorRetriever):
@@ -36,3 +37,47 @@ def test_base_vector_retriever_not_implemented():
 
     with pytest.raises(NotImplementedError):
         base_vector.similarity_search_by_vector([0.1, 0.2])
+
+def test_base_vector_retriever_get_top_k_batch():
+    retriever = ConcreteVectorRetriever()
+    results = retriever.get_top_k_batch(["q1", "q2"], k=1)
+
+    assert len(results) == 2
+    assert results[1][0]["content"] == "Matched vector doc"
+
+def test_get_top_k_batch_embeds_all_queries_in_one_call():
+    retriever = ConcreteVectorRetriever()
+    retriever.embed_query = MagicMock()
+    retriever.embed_queries = MagicMock(return_value=[[0.1], [0.2], [0.3]])
+
+    assert len(retriever.get_top_k_batch(["q1", "q2", "q3"], k=1)) == 3
+    retriever.embed_queries.assert_called_once_with(["q1", "q2", "q3"])
+    retriever.embed_query.assert_not_called()
+    assert retriever.get_top_k_batch([]) == []
+
+class AsymmetricVectorRetriever(BaseVectorRetriever):
+    """Query and document embeddings differ, like task-typed embedding models."""
+    vectors = {"a": [1.0, 0.0], "b": [0.0, 1.0]}
+
+    def __init__(self):
+        super().__init__()
+        self.documents = [{"id": "a", "content": "A"}, {"id": "b", "content": "B"}]
+
+    def embed_query(self, query: str):
+        return [1.0, 0.0] if query == "first" else [0.0, 1.0]
+
+    def embed_documents(self, texts: list[str]):
+        return [[0.0, 1.0] if text == "first" else [1.0, 0.0] for text in texts]
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 3):
+        scored = [
+            {**doc, "_score": sum(x * y for x, y in zip(embedding, self.vectors[doc["id"]]))}
+            for doc in self.documents
+        ]
+        return sorted(scored, key=lambda doc: doc["_score"], reverse=True)[:k]
+
+def test_get_top_k_batch_matches_get_top_k_with_asymmetric_embeddings():
+    retriever = AsymmetricVectorRetriever()
+    queries = ["first", "second"]
+    assert retriever.get_top_k_batch(queries, k=1) == [retriever.get_top_k(q, k=1) for q in queries]
+    assert [r[0]["id"] for r in retriever.get_top_k_batch(queries, k=1)] == ["a", "b"]
@@ -0,0 +1,104 @@
+"""
+RecursiveCharacterTextSplitter 基准测试：比较当前的偏移实现与旧的 join/pop(0) 实现。
+
+用法: python scripts/bench_text_splitter.py [--sizes 10000 100000 1000000] [--chunk-size 1000] [--chunk-overlap 200]
+旧实现在大输入上为二次复杂度，超过 --legacy-max-chars 的输入跳过旧实现。
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from nagent_rag.text_splitter import RecursiveCharacterTextSplitter
+
+
+def legacy_split(text: str, chunk_size: int, chunk_overlap: int, separators: List[str]) -> List[str]:
+    """旧实现 (逐字符 list(text)、separator.join 重建、pop(0) 处理重叠)，仅用于对比。"""
+    if len(text) <= chunk_size:
+        return [text]
+    separator = separators[-1]
+    new_separators = []
+    for i, s in enumerate(separators):
+        if s in text:
+            separator = s
+            new_separators = separators[i + 1:]
+            break
+    splits = text.split(separator) if separator else list(text)
+    final_chunks = []
+    current_doc = []
+    total_len = 0
+    for s in splits:
+        if total_len + len(s) + (len(separator) if current_doc else 0) <= chunk_size:
+            current_doc.append(s)
+            total_len += len(s) + (len(separator) if current_doc else 0)
+        else:
+            if current_doc:
+                doc_content = separator.join(current_doc)
+                if len(doc_content) > chunk_size:
+                    final_chunks.extend(legacy_split(doc_content, chunk_size, chunk_overlap, new_separators))
+                else:
+                    final_chunks.append(doc_content)
+                while current_doc and total_len > chunk_overlap:
+                    removed = current_doc.pop(0)
+                    total_len -= len(removed) + len(separator)
+            current_doc.append(s)
+            total_len += len(s) + (len(separator) if len(current_doc) > 1 else 0)
+    if current_doc:
+        doc_content = separator.join(current_doc)
+        if len(doc_content) > chunk_size:
+            final_chunks.extend(legacy_split(doc_content, chunk_size, chunk_overlap, new_separators))
+        else:
+            final_chunks.append(doc_content)
+    return final_chunks
+
+
+def make_cjk_text(size: int, seed: int = 0) -> str:
+    """不含空格与换行的中文文本 (旧实现的最坏情况)。"""
+    rng = random.Random(seed)
+    return "".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(size))
+
+
+def make_prose_text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["retrieval", "agent", "chunk", "vector", "index", "query", "context", "token"]
+    parts = []
+    total = 0
+    while total < size:
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(5, 20))) + "."
+        parts.append(sentence + ("\n\n" if rng.random() < 0.2 else "\n"))
+        total += len(parts[-1])
+    return "".join(parts)[:size]
+
+
+def timed(func: Callable[[], List]) -> tuple:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RecursiveCharacterTextSplitter")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--legacy-max-chars", type=int, default=200_000, help="Skip the legacy splitter above this input size")
+    args = parser.parse_args()
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    print(f"{'text':<6} {'chars':>10} {'new (s)':>10} {'chunks':>8} {'legacy (s)':>11} {'chunks':>8}")
+    for kind, make_text in (("cjk", make_cjk_text), ("prose", make_prose_text)):
+        for size in args.sizes:
+            text = make_text(size)
+            new_time, new_chunks = timed(lambda: splitter.split_text(text))
+            if size <= args.legacy_max_chars:
+                legacy_time, legacy_chunks = timed(
+                    lambda: legacy_split(text, args.chunk_size, args.chunk_overlap, splitter.separators)
+                )
+                legacy = f"{legacy_time:>11.3f} {legacy_chunks:>8}"
+            else:
+                legacy = f"{'skipped':>11} {'-':>8}"
+            print(f"{kind:<6} {size:>10} {new_time:>10.3f} {new_chunks:>8} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
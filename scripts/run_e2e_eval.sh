@@ -45,7 +45,7 @@ mkdir -p "$OUTPUT_DIR"
 # ==========================================
 echo ""
 echo "[1/5] 📄 正在进行文档切片 (Chunking)..."
-uv run python -m agentic_rag.chunk_cli "$INPUT_FILE" --output "$DOCS_JSON"
+uv run python -m agentic_rag.chunk_cli "$INPUT_FILE" --output "$DOCS_JSON" --manifest "$OUTPUT_DIR/chunk_manifest.json"
 
 # ==========================================
 # 步骤 2: 生成测试集 (Generate Dataset)